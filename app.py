@@ -1,12 +1,12 @@
 from __future__ import annotations
 import streamlit as st
-from db.session import init_db
+from db.session import ensure_db
 from core.session import current_user
 
 
 def main() -> None:
-    # Initialize database
-    init_db()
+    # Initialize database (once per process; reruns skip it)
+    ensure_db()
 
     # Default route: Login if no session, else Dashboard
     user = current_user()
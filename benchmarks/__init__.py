@@ -0,0 +1 @@
+# Benchmarks de desempenho (fora da suíte padrão: python -m pytest benchmarks)
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Compara dois arquivos de resultados dos benchmarks (mediana de cada caso).
+
+    python -m benchmarks.compare antes.json depois.json [--threshold 0.10]
+
+Sai com código 1 se algum caso ficou mais lento que o limite.
+"""
+from __future__ import annotations
+import argparse
+import json
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown (0.10 = 10%%)")
+    args = parser.parse_args()
+
+    with open(args.before, encoding="utf-8") as f:
+        before = json.load(f)
+    with open(args.after, encoding="utf-8") as f:
+        after = json.load(f)
+
+    print(f"{before['meta'].get('commit')} -> {after['meta'].get('commit')}")
+    regressions = 0
+    for name in sorted(set(before["results"]) | set(after["results"])):
+        old = before["results"].get(name)
+        new = after["results"].get(name)
+        if old is None or new is None:
+            print(f"{name:45s} {'only in ' + ('after' if old is None else 'before'):>30s}")
+            continue
+        change = (new["median"] - old["median"]) / old["median"] if old["median"] else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  SLOWER"
+            regressions += 1
+        elif change < -args.threshold:
+            flag = "  faster"
+        print(f"{name:45s} {old['median'] * 1000:10.2f} ms {new['median'] * 1000:10.2f} ms {change:+8.1%}{flag}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,80 @@
+from __future__ import annotations
+import json
+import os
+import platform
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks.generator import DatasetSpec, generate
+from benchmarks.timing import measure
+
+# Tamanho do banco sintético (por usuário); ex.: BENCH_TRANSACTIONS=1000000
+SPEC = DatasetSpec(
+    users=int(os.getenv("BENCH_USERS", "1")),
+    transactions=int(os.getenv("BENCH_TRANSACTIONS", "10000")),
+    debts=int(os.getenv("BENCH_DEBTS", "1000")),
+    seed=int(os.getenv("BENCH_SEED", "42")),
+)
+OUTPUT = os.getenv("BENCH_OUTPUT", str(ROOT / "bench_results.json"))
+
+_results = {}
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=str(ROOT), capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+@pytest.fixture(scope="session")
+def dataset(tmp_path_factory):
+    # DB_PATH precisa estar definido antes do primeiro import de db.session
+    os.environ["DB_PATH"] = str(tmp_path_factory.mktemp("bench") / "bench.db")
+    from db.session import ensure_db
+    ensure_db()
+    return generate(SPEC)
+
+
+@pytest.fixture()
+def bench(request):
+    """bench(fn, repeat=..., setup=..., ops=...) mede e registra o resultado
+    com o nome do teste (ou `name=`, para vários resultados no mesmo teste).
+    """
+    def run(fn, *, name=None, **kwargs):
+        stats = measure(fn, **kwargs)
+        _results[name or request.node.name] = stats
+        return stats
+    return run
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if not _results:
+        return
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "users": SPEC.users,
+            "transactions_per_user": SPEC.transactions,
+            "debts_per_user": SPEC.debts,
+            "seed": SPEC.seed,
+        },
+        "results": dict(sorted(_results.items())),
+    }
+    with open(OUTPUT, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nBenchmark results written to {OUTPUT}")
@@ -0,0 +1,167 @@
+from __future__ import annotations
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List
+
+from sqlalchemy import insert
+
+
+# Gerador determinístico de dados sintéticos para os benchmarks.
+# Grava direto pelas tabelas (insert executemany em blocos), sem passar pelos
+# repositórios, e depois recalcula os resumos mensais. Mesma semente e mesmo
+# tamanho produzem exatamente o mesmo banco.
+
+CHUNK = 10_000
+PASSWORD = "senha-benchmark"
+
+_WORDS = (
+    "mercado farmácia aluguel luz água internet padaria posto uber restaurante "
+    "cinema livraria academia condomínio escola plano saúde celular streaming pet"
+).split()
+_CATEGORIES = ["Alimentação", "Moradia", "Transporte", "Saúde", "Lazer", "Educação", "Salário", "Outros"]
+_ORIGINS = ["Cartão", "Banco", "Loja", "Financiamento"]
+_RESPONSIBLES = ["Cônjuge", "Filho(a)"]
+# parcelas típicas: maioria à vista, algumas longas
+_INSTALLMENTS = [1, 1, 1, 1, 2, 3, 3, 4, 6, 10, 12, 12, 18, 24]
+
+
+@dataclass
+class DatasetSpec:
+    users: int = 1
+    transactions: int = 10_000  # por usuário
+    debts: int = 1_000  # por usuário
+    seed: int = 42
+    start: date = date(2023, 1, 1)
+    days: int = 730
+
+
+@dataclass
+class Dataset:
+    spec: DatasetSpec
+    user_ids: List[int] = field(default_factory=list)
+    cpfs: Dict[int, str] = field(default_factory=dict)
+    categories: Dict[int, List[int]] = field(default_factory=dict)
+    origins: Dict[int, List[int]] = field(default_factory=dict)
+    responsibles: Dict[int, List[int]] = field(default_factory=dict)
+    transactions: int = 0
+    debts: int = 0
+    installments: int = 0
+
+
+def _insert(conn, table, rows: Iterable[dict]) -> int:
+    batch, total = [], 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= CHUNK:
+            conn.execute(insert(table), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        conn.execute(insert(table), batch)
+        total += len(batch)
+    return total
+
+
+def _text(rng: random.Random) -> str:
+    return " ".join(rng.sample(_WORDS, 2)).capitalize()
+
+
+def generate(spec: DatasetSpec) -> Dataset:
+    """Popula o banco de DB_PATH (esquema já criado por init_db) e descreve o que gerou."""
+    from core.auth import hash_password
+    from db.session import engine
+    from db.models import (
+        Category, Debt, DebtInstallment, DebtOrigin, Responsible, Transaction, User,
+    )
+    from repository.rollups import rebuild_rollups
+    from services.debts import add_months
+
+    rng = random.Random(spec.seed)
+    ds = Dataset(spec=spec)
+    password_hash = hash_password(PASSWORD)
+    now = datetime.now(timezone.utc)
+    ids = {"category": 0, "origin": 0, "responsible": 0, "transaction": 0, "debt": 0, "installment": 0}
+
+    def next_id(kind: str) -> int:
+        ids[kind] += 1
+        return ids[kind]
+
+    with engine.begin() as conn:
+        users = []
+        for uid in range(1, spec.users + 1):
+            cpf = f"{uid:011d}"
+            ds.user_ids.append(uid)
+            ds.cpfs[uid] = cpf
+            users.append({
+                "id": uid, "name": f"Usuário {uid}", "cpf": cpf, "password_hash": password_hash,
+                "created_at": now, "updated_at": now,
+            })
+        _insert(conn, User.__table__, users)
+
+        for uid in ds.user_ids:
+            ds.categories[uid] = [next_id("category") for _ in _CATEGORIES]
+            ds.origins[uid] = [next_id("origin") for _ in _ORIGINS]
+            ds.responsibles[uid] = [next_id("responsible") for _ in _RESPONSIBLES]
+        _insert(conn, Category.__table__, (
+            {"id": cid, "user_id": uid, "name": name}
+            for uid in ds.user_ids for cid, name in zip(ds.categories[uid], _CATEGORIES)
+        ))
+        _insert(conn, DebtOrigin.__table__, (
+            {"id": oid, "user_id": uid, "name": name}
+            for uid in ds.user_ids for oid, name in zip(ds.origins[uid], _ORIGINS)
+        ))
+        _insert(conn, Responsible.__table__, (
+            {"id": rid, "user_id": uid, "name": name, "related_user_id": None}
+            for uid in ds.user_ids for rid, name in zip(ds.responsibles[uid], _RESPONSIBLES)
+        ))
+
+        def transactions():
+            for uid in ds.user_ids:
+                for _ in range(spec.transactions):
+                    day = spec.start + timedelta(days=rng.randrange(spec.days))
+                    fixed = rng.random() < 0.05
+                    income = rng.random() < 0.15
+                    yield {
+                        "id": next_id("transaction"),
+                        "user_id": uid,
+                        "category_id": rng.choice(ds.categories[uid] + [None]),
+                        "amount_cents": rng.randint(500, 500_000 if income else 80_000),
+                        "type": "income" if income else "expense",
+                        "fixed": fixed,
+                        "periodicity": "monthly" if fixed else "none",
+                        "next_execution": add_months(day, 1) if fixed else None,
+                        "description": _text(rng),
+                        "notes": _text(rng) if rng.random() < 0.2 else None,
+                        "occurred_at": datetime.combine(day, time(0, 0), tzinfo=timezone.utc),
+                        "installment_id": None,
+                    }
+
+        ds.transactions = _insert(conn, Transaction.__table__, transactions())
+
+        debt_rows, installment_rows = [], []
+        for uid in ds.user_ids:
+            for _ in range(spec.debts):
+                debt_id = next_id("debt")
+                debt_date = spec.start + timedelta(days=rng.randrange(spec.days))
+                count = rng.choice(_INSTALLMENTS)
+                total = rng.randint(2_000, 1_000_000)
+                paid = rng.random() < 0.3
+                debt_rows.append({
+                    "id": debt_id, "user_id": uid, "origin_id": rng.choice(ds.origins[uid]),
+                    "category_id": rng.choice(ds.categories[uid] + [None]),
+                    "responsible_id": rng.choice(ds.responsibles[uid] + [None, None]),
+                    "debt_date": debt_date, "description": _text(rng), "total_amount_cents": total,
+                    "installments": count, "notes": None, "paid": paid,
+                })
+                for number in range(1, count + 1):
+                    installment_rows.append({
+                        "id": next_id("installment"), "debt_id": debt_id, "number": number,
+                        "amount_cents": total, "due_on": add_months(debt_date, number - 1),
+                        "paid": paid, "paid_at": now if paid else None,
+                    })
+        ds.debts = _insert(conn, Debt.__table__, debt_rows)
+        ds.installments = _insert(conn, DebtInstallment.__table__, installment_rows)
+
+    rebuild_rollups()
+    return ds
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+from benchmarks.generator import PASSWORD
+
+
+def test_verify_password(dataset, bench):
+    from core.auth import hash_password, verify_password
+    stored = hash_password(PASSWORD)
+    bench(lambda: verify_password(PASSWORD, stored), repeat=5)
+
+
+def test_login(dataset, bench):
+    from core.auth import login
+    cpf = dataset.cpfs[dataset.user_ids[0]]
+    bench(lambda: login(cpf, PASSWORD), repeat=5)
@@ -0,0 +1,100 @@
+from __future__ import annotations
+from datetime import datetime, timezone
+
+
+def _tx(user_id: int, i: int):
+    from services.transactions import Transaction
+    return Transaction(
+        user_id=user_id, amount=10.0 + i % 100, type="expense", description=f"Bench {i}",
+        occurred_at=datetime(2024, 6, 1 + i % 28, tzinfo=timezone.utc),
+    )
+
+
+def test_list_by_filters(dataset, bench):
+    from repository.transactions import TransactionRepository
+    uid = dataset.user_ids[0]
+    bench(lambda: TransactionRepository.list_by_filters(uid, fixed=False, limit=100), repeat=20, ops=100)
+
+
+def test_list_by_filters_type_and_range(dataset, bench):
+    from repository.transactions import TransactionRepository
+    uid = dataset.user_ids[0]
+    start = datetime(2023, 6, 1, tzinfo=timezone.utc)
+    end = datetime(2023, 9, 1, tzinfo=timezone.utc)
+    bench(
+        lambda: TransactionRepository.list_by_filters(uid, type="expense", start=start, end=end, limit=100),
+        repeat=20, ops=100,
+    )
+
+
+def test_list_page_by_filters_ten_pages(dataset, bench):
+    from repository.transactions import TransactionRepository
+    uid = dataset.user_ids[0]
+
+    def walk():
+        cursor = None
+        for _ in range(10):
+            _, cursor = TransactionRepository.list_page_by_filters(uid, fixed=False, limit=200, cursor=cursor)
+            if cursor is None:
+                break
+
+    bench(walk, repeat=5, ops=10)
+
+
+def test_debt_list_by_filters(dataset, bench):
+    from repository.debts import DebtRepository
+    uid = dataset.user_ids[0]
+    bench(lambda: DebtRepository.list_by_filters(uid, paid=False, limit=100), repeat=20, ops=100)
+
+
+def test_search(dataset, bench):
+    from repository.transactions import TransactionRepository
+    uid = dataset.user_ids[0]
+    bench(lambda: TransactionRepository.search(uid, "livraria cinema", limit=50), repeat=10)
+
+
+def test_monthly_totals(dataset, bench):
+    from repository.reports import ReportRepository
+    uid = dataset.user_ids[0]
+    bench(lambda: ReportRepository.monthly_totals(uid, datetime(2023, 1, 1).date(), datetime(2024, 12, 31).date()), repeat=10)
+
+
+def test_create_one_by_one(dataset, bench):
+    from repository.transactions import TransactionRepository
+    uid = dataset.user_ids[0]
+    counter = iter(range(10**9))
+    bench(lambda: TransactionRepository.create(_tx(uid, next(counter))), repeat=50)
+
+
+def test_bulk_create(dataset, bench):
+    from repository.transactions import TransactionRepository
+    uid = dataset.user_ids[0]
+    bench(
+        lambda txs: TransactionRepository.bulk_create(txs),
+        setup=lambda: [_tx(uid, i) for i in range(1000)],
+        repeat=3, ops=1000,
+    )
+
+
+def test_bulk_update(dataset, bench):
+    from repository.transactions import TransactionRepository
+    uid = dataset.user_ids[0]
+
+    def setup():
+        txs = TransactionRepository.list_by_filters(uid, fixed=False, limit=1000)
+        for tx in txs:
+            tx.set_amount_cents(tx.get_amount_cents() + 1)
+        return txs
+
+    bench(lambda txs: TransactionRepository.bulk_update(txs), setup=setup, repeat=3, ops=1000)
+
+
+def test_bulk_delete(dataset, bench):
+    from repository.transactions import TransactionRepository
+    uid = dataset.user_ids[0]
+
+    def setup():
+        created = TransactionRepository.bulk_create([_tx(uid, i) for i in range(1000)])
+        return [tx.get_id() for tx in created.results if tx is not None]
+
+    bench(lambda ids: TransactionRepository.bulk_delete(ids), setup=setup, repeat=3, ops=1000)
@@ -0,0 +1,75 @@
+from __future__ import annotations
+import itertools
+
+
+def test_sync_debt_installments(dataset, bench):
+    # pages/debitos._sync_debt_installments é um invólucro de InstallmentScheduler.reconcile
+    from repository.debts import DebtRepository
+    from services.installment_scheduler import InstallmentScheduler
+    uid = dataset.user_ids[0]
+    debts = [d for d in DebtRepository.list_by_filters(uid, limit=500) if d.get_installments() >= 6][:20]
+    cycle = itertools.cycle(debts)
+
+    def setup():
+        debt = next(cycle)
+        # alterna entre encurtar e alongar o parcelamento
+        delta = -1 if debt.get_installments() % 2 == 0 else 1
+        debt.set_installments(debt.get_installments() + delta)
+        return DebtRepository.update(debt)
+
+    bench(InstallmentScheduler.reconcile, setup=setup, repeat=20)
+
+
+def test_transactions_table_save(dataset, bench):
+    # Caminho do botão "Salvar alterações" em Transações: diff da tabela + bulk_update
+    import pandas as pd
+    from repository.transactions import TransactionRepository
+    from ui.table_diff import diff_frames
+    uid = dataset.user_ids[0]
+    columns = {"tipo": "text", "descricao": "text", "valor": "money", "data": "date"}
+    rows = 5000
+
+    def setup():
+        txs = TransactionRepository.list_by_filters(uid, fixed=False, limit=rows)
+        df = pd.DataFrame([
+            {
+                "id": t.get_id(),
+                "tipo": "Entrada" if t.get_type() == "income" else "Saída",
+                "descricao": t.get_description() or "",
+                "valor": t.get_amount(),
+                "data": t.get_occurred_at().date(),
+            }
+            for t in txs
+        ]).set_index("id", drop=True)
+        edited = df.copy()
+        edited.loc[edited.index[::10], "valor"] = edited["valor"].iloc[::10] + 1
+        return txs, df, edited
+
+    def save(args):
+        txs, df, edited = args
+        diff = diff_frames(df, edited, columns)
+        by_id = {t.get_id(): t for t in txs}
+        changed = []
+        for tid, patch in diff.patches.items():
+            by_id[tid].set_amount_cents(patch["valor"])
+            changed.append(by_id[tid])
+        TransactionRepository.bulk_update(changed)
+
+    bench(save, setup=setup, repeat=3, ops=rows)
+
+
+def test_table_diff(bench):
+    # Só o diff da tabela editada (ui/table_diff.py), sem gravar: 5000 linhas, 10% alteradas
+    from datetime import date
+    import pandas as pd
+    from ui.table_diff import diff_frames
+    rows = 5000
+    columns = {"tipo": "text", "descricao": "text", "valor": "money", "data": "date", "parcelas": "int", "pago": "bool"}
+    base = pd.DataFrame([
+        {"id": i, "tipo": "Saída", "descricao": f"item {i}", "valor": i / 100, "data": date(2025, 1, 1), "parcelas": 1, "pago": False}
+        for i in range(1, rows + 1)
+    ]).set_index("id", drop=True)
+    edited = base.copy()
+    edited.loc[edited.index % 10 == 0, "valor"] = 1.0
+
+    bench(lambda: diff_frames(base, edited, columns), repeat=5, ops=rows)
@@ -0,0 +1,37 @@
+from __future__ import annotations
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+
+def measure(
+    fn: Callable[..., Any],
+    *,
+    repeat: int = 5,
+    setup: Optional[Callable[[], Any]] = None,
+    ops: int = 1,
+) -> Dict[str, float]:
+    """Executa `fn` `repeat` vezes e resume os tempos (segundos).
+    Com `setup`, o valor que ele retorna é passado para `fn` e o preparo fica
+    fora da medição. `ops` é quantas operações cada chamada representa
+    (ex.: linhas gravadas), usado para calcular ops/s.
+    """
+    times: List[float] = []
+    for _ in range(max(1, int(repeat))):
+        arg = setup() if setup is not None else None
+        start = time.perf_counter()
+        if setup is not None:
+            fn(arg)
+        else:
+            fn()
+        times.append(time.perf_counter() - start)
+    median = statistics.median(times)
+    return {
+        "repeat": len(times),
+        "ops": ops,
+        "min": min(times),
+        "median": median,
+        "mean": statistics.fmean(times),
+        "max": max(times),
+        "ops_per_sec": ops / median if median > 0 else float("inf"),
+    }
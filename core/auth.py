@@ -3,13 +3,21 @@ import base64
 import hashlib
 import hmac
 import json
+import logging
 import os
 import secrets
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 from core import config
+from core import kdf
+from core import ratelimit
+
+
+logger = logging.getLogger("pinanca.auth")
 
 
 class AuthError(ValueError):
@@ -27,12 +35,16 @@ def _b64url_decode(data: str) -> bytes:
     return base64.urlsafe_b64decode((data + padding).encode("ascii"))
 
 
-def hash_password(password: str, *, salt: Optional[bytes] = None, iterations: int = 480_000) -> bytes:
+# O PBKDF2 roda no pool de core/kdf.py, não na thread de quem chama.
+
+def hash_password(password: str, *, salt: Optional[bytes] = None, iterations: Optional[int] = None) -> bytes:
     if not isinstance(password, str) or password == "":
         raise ValueError("Senha inválida")
     if salt is None:
         salt = os.urandom(16)
-    dk = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations, dklen=32)
+    if iterations is None:
+        iterations = config.KDF_ITERATIONS
+    dk = kdf.derive(password.encode("utf-8"), salt, iterations)
     enc = f"pbkdf2_sha256${iterations}${_b64url_encode(salt)}${_b64url_encode(dk)}"
     return enc.encode("ascii")
 
@@ -52,13 +64,23 @@ def verify_password(password: str, stored: bytes) -> bool:
             expected = _b64url_decode(dk_b64)
         except Exception:
             return False
-        calc = hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations, dklen=32)
+        calc = kdf.derive(password.encode("utf-8"), salt, iterations)
         return hmac.compare_digest(calc, expected)
 
     # Legacy fallback: direct compare (insecure, compatibility only)
     return secrets.compare_digest(text.encode("utf-8"), password.encode("utf-8"))
 
 
+def needs_rehash(stored: bytes) -> bool:
+    """True se o hash não é PBKDF2 com o número de iterações configurado
+    (inclui os formatos legados)."""
+    try:
+        alg, iter_s, _rest = stored.decode("ascii").split("$", 2)
+        return alg != "pbkdf2_sha256" or int(iter_s) != config.KDF_ITERATIONS
+    except Exception:
+        return True
+
+
 # ---------------- Stateless sessions (JWT-like HS256) ----------------
 
 def _sign(data: bytes, secret: str) -> bytes:
@@ -83,7 +105,11 @@ def issue_session(user_id: int, *, expires_in: Optional[int] = None, now: Option
     return f"{header_b64}.{payload_b64}.{signature}"
 
 
-def verify_session(token: str) -> Dict[str, Any]:
+def _now() -> int:
+    return int(datetime.now(timezone.utc).timestamp())
+
+
+def _verify_signed(token: str, now_ts: int) -> Dict[str, Any]:
     try:
         header_b64, payload_b64, signature_b64 = token.split(".")
         signing_input = f"{header_b64}.{payload_b64}".encode("ascii")
@@ -100,7 +126,6 @@ def verify_session(token: str) -> Dict[str, Any]:
     except Exception as e:
         raise AuthError("Payload inválido") from e
 
-    now_ts = int(datetime.now(timezone.utc).timestamp())
     if int(payload.get("exp", 0)) < now_ts:
         raise AuthError("Sessão expirada")
     if int(payload.get("sub", 0)) <= 0:
@@ -108,19 +133,90 @@ def verify_session(token: str) -> Dict[str, Any]:
     return payload
 
 
+# Cache de tokens já verificados: digest BLAKE2b do token -> (payload, exp).
+# Um acerto pula o split, o base64, o HMAC e o JSON, mas o exp é sempre
+# conferido de novo com o relógio; só tokens válidos entram, e a assinatura
+# é verificada em toda falta. LRU limitado a AUTH_TOKEN_CACHE_SIZE entradas
+# (0 desliga); o logout remove o token (forget_token).
+_verified: "OrderedDict[bytes, Tuple[Dict[str, Any], int]]" = OrderedDict()
+_verified_lock = threading.Lock()
+_verified_stats = {"hits": 0, "misses": 0}
+
+
+def _token_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode("utf-8"), digest_size=32).digest()
+
+
+def verify_session(token: str) -> Dict[str, Any]:
+    try:
+        key = _token_key(token)
+    except Exception as e:
+        raise AuthError("Token inválido") from e
+    now_ts = _now()
+    with _verified_lock:
+        cached = _verified.get(key)
+        if cached is not None:
+            if cached[1] >= now_ts:
+                _verified.move_to_end(key)
+                _verified_stats["hits"] += 1
+                return dict(cached[0])
+            del _verified[key]  # expirado: a verificação completa recusa
+        _verified_stats["misses"] += 1
+
+    payload = _verify_signed(token, now_ts)
+    if config.TOKEN_CACHE_SIZE > 0:
+        with _verified_lock:
+            _verified[key] = (dict(payload), int(payload["exp"]))
+            _verified.move_to_end(key)
+            while len(_verified) > config.TOKEN_CACHE_SIZE:
+                _verified.popitem(last=False)
+    return payload
+
+
+def forget_token(token: str) -> None:
+    """Tira o token do cache de verificação (logout)."""
+    with _verified_lock:
+        _verified.pop(_token_key(token), None)
+
+
+def clear_token_cache() -> None:
+    with _verified_lock:
+        _verified.clear()
+        _verified_stats["hits"] = 0
+        _verified_stats["misses"] = 0
+
+
+def token_cache_stats() -> Dict[str, Any]:
+    """Acertos, faltas, tamanho e taxa de acerto do cache de verify_session()."""
+    with _verified_lock:
+        hits, misses = _verified_stats["hits"], _verified_stats["misses"]
+        size = len(_verified)
+    return {"hits": hits, "misses": misses, "size": size, "hit_rate": hits / (hits + misses) if hits + misses else 0.0}
+
+
 # ---------------- Login helper ----------------
 
-def login(cpf: str, password: str, *, expires_in: Optional[int] = None) -> str:
+def login(cpf: str, password: str, *, expires_in: Optional[int] = None, client: Optional[str] = None) -> str:
     """Autentica com CPF e senha e retorna um token de sessão assinado.
-    Lança AuthError em caso de credenciais inválidas.
+    Lança AuthError em caso de credenciais inválidas e
+    ratelimit.ThrottledError (antes de consultar o banco) se o CPF ou o
+    `client` excedeu as tentativas.
     """
     from repository.users import UserRepository
-    user = UserRepository.get_by_cpf((cpf or "").strip())
-    if not user:
+    cpf = (cpf or "").strip()
+    ratelimit.check_login(cpf, client)
+    user = UserRepository.get_by_cpf(cpf)
+    if not user or not verify_password(password, user.get_password_hash()):
+        ratelimit.login_failed(cpf, client)
         raise AuthError("Credenciais inválidas")
+    ratelimit.login_succeeded(cpf)
 
-    if not verify_password(password, user.get_password_hash()):
-        raise AuthError("Credenciais inválidas")
+    if needs_rehash(user.get_password_hash()):
+        # a senha acabou de ser conferida: regrava com o custo configurado
+        try:
+            UserRepository.update_password_hash(user.get_id(), hash_password(password))
+        except Exception:
+            logger.warning("Falha ao atualizar o hash da senha do usuário %s", user.get_id(), exc_info=True)
 
     return issue_session(user.get_id(), expires_in=expires_in)
 
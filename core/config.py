@@ -7,5 +7,51 @@ AUTH_SECRET: str = os.getenv("AUTH_SECRET", "dev-secret-change-me")
 # Default token TTL in seconds (1 week by default)
 TOKEN_TTL_SECONDS: int = int(os.getenv("AUTH_TOKEN_TTL", str(7 * 24 * 60 * 60)))
 
-# Session file path for local apps (front+back together)
-SESSION_FILE: str = os.getenv("SESSION_FILE", os.path.expanduser("~/.pinanca/session.json"))
+# Verified tokens cached by verify_session() (0 disables the cache)
+TOKEN_CACHE_SIZE: int = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "1024"))
+
+# PBKDF2-SHA256 cost for new password hashes (scripts/calibrate_kdf.py
+# suggests a value); stored hashes with another count are redone on login
+KDF_ITERATIONS: int = int(os.getenv("AUTH_KDF_ITERATIONS", "480000"))
+
+# Worker pool for hashing/verifying passwords (core/kdf.py): "thread" or
+# "process"; 0 workers runs the KDF in the calling thread
+KDF_POOL: str = os.getenv("AUTH_KDF_POOL", "thread")
+KDF_WORKERS: int = int(os.getenv("AUTH_KDF_WORKERS", str(min(2, os.cpu_count() or 1))))
+
+# Max KDF jobs running + waiting; beyond that logins are refused right away
+KDF_MAX_PENDING: int = int(os.getenv("AUTH_KDF_MAX_PENDING", "16"))
+
+# Seconds a login waits for its KDF job
+KDF_TIMEOUT: float = float(os.getenv("AUTH_KDF_TIMEOUT", "10"))
+
+# Login throttling (core/ratelimit.py): failed logins allowed per sliding
+# window, per CPF and per client; then the key is blocked for BACKOFF
+# seconds, doubling on each further block up to BACKOFF_MAX
+RATE_LIMIT_CPF: int = int(os.getenv("AUTH_RATE_LIMIT_CPF", "5"))
+RATE_LIMIT_CLIENT: int = int(os.getenv("AUTH_RATE_LIMIT_CLIENT", "20"))
+RATE_WINDOW_SECONDS: float = float(os.getenv("AUTH_RATE_WINDOW", "300"))
+RATE_BACKOFF_SECONDS: float = float(os.getenv("AUTH_RATE_BACKOFF", "30"))
+RATE_BACKOFF_MAX_SECONDS: float = float(os.getenv("AUTH_RATE_BACKOFF_MAX", "900"))
+RATE_MAX_KEYS: int = int(os.getenv("AUTH_RATE_MAX_KEYS", "100000"))
+# "memory" (per process) or "sqlite" (shared through the `loginthrottle` table)
+RATE_STORE: str = os.getenv("AUTH_RATE_STORE", "memory")
+# Header with the client IP set by a trusted reverse proxy (e.g.
+# "X-Forwarded-For"); empty uses the connection IP. Only set it when every
+# request goes through that proxy, since clients can send the header too
+TRUSTED_PROXY_HEADER: str = os.getenv("AUTH_TRUSTED_PROXY_HEADER", "")
+
+# Login sessions (core/session.py): "memory" keeps them only in this process;
+# "sqlite" also writes them to the `session` table (survive restarts, revocable)
+SESSION_STORE: str = os.getenv("SESSION_STORE", "memory")
+
+# Max sessions kept in memory (least recently used are dropped first)
+SESSION_MAX_ENTRIES: int = int(os.getenv("SESSION_MAX_ENTRIES", "10000"))
+
+# Optional cookie that identifies the browser (e.g. set by a reverse proxy)
+SESSION_COOKIE: str = os.getenv("SESSION_COOKIE", "")
+
+# Without the cookie, a random session id kept in this URL query parameter
+# so the login survives a page reload (the URL then works as a credential);
+# empty keys the login on the Streamlit session, lost on every reload
+SESSION_QUERY_PARAM: str = os.getenv("SESSION_QUERY_PARAM", "sid")
@@ -0,0 +1,81 @@
+from __future__ import annotations
+import hashlib
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Optional, Tuple
+
+from core import config
+
+
+# Execução do PBKDF2 fora da thread do script do Streamlit. Cada login custa
+# centenas de milissegundos de CPU; aqui no máximo KDF_WORKERS derivações
+# rodam ao mesmo tempo, até KDF_MAX_PENDING esperam na fila e as demais são
+# recusadas na hora (KdfBusyError), em vez de uma rajada de logins ocupar
+# todos os núcleos e atrasar os reruns das outras sessões.
+#
+# O padrão é um pool de threads: o hashlib libera o GIL durante o PBKDF2,
+# então as threads rodam em paralelo sem os custos de iniciar processos
+# dentro do servidor. AUTH_KDF_POOL=process usa processos (spawn).
+
+class KdfBusyError(ValueError):
+    pass
+
+
+class KdfTimeoutError(ValueError):
+    pass
+
+
+_lock = threading.Lock()
+_executor: Optional[Executor] = None
+_slots: Optional[threading.BoundedSemaphore] = None
+
+
+def pbkdf2_sha256(password: bytes, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password, salt, iterations, dklen=32)
+
+
+def _pool() -> Tuple[Executor, threading.BoundedSemaphore]:
+    global _executor, _slots
+    with _lock:
+        if _executor is None:
+            workers = max(1, config.KDF_WORKERS)
+            if config.KDF_POOL == "process":
+                import multiprocessing
+                _executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+            else:
+                _executor = ThreadPoolExecutor(workers, thread_name_prefix="kdf")
+            _slots = threading.BoundedSemaphore(max(workers, config.KDF_MAX_PENDING))
+        return _executor, _slots
+
+
+def derive(password: bytes, salt: bytes, iterations: int, timeout: Optional[float] = None) -> bytes:
+    """PBKDF2-SHA256 (32 bytes) calculado no pool. KdfBusyError se a fila
+    estiver cheia; KdfTimeoutError se o resultado não vier em `timeout`
+    segundos (padrão KDF_TIMEOUT).
+    """
+    if config.KDF_WORKERS <= 0:
+        return pbkdf2_sha256(password, salt, iterations)
+    pool, slots = _pool()
+    if not slots.acquire(blocking=False):
+        raise KdfBusyError("Muitos logins ao mesmo tempo; tente novamente em instantes")
+    try:
+        future = pool.submit(pbkdf2_sha256, password, salt, iterations)
+    except BaseException:
+        slots.release()
+        raise
+    # a vaga só é liberada quando o cálculo termina, mesmo após um timeout
+    future.add_done_callback(lambda _f: slots.release())
+    try:
+        return future.result(timeout=config.KDF_TIMEOUT if timeout is None else timeout)
+    except FutureTimeout as e:
+        future.cancel()
+        raise KdfTimeoutError("Tempo esgotado ao verificar a senha; tente novamente") from e
+
+
+def shutdown() -> None:
+    """Encerra o pool (o próximo derive() cria outro)."""
+    global _executor, _slots
+    with _lock:
+        executor, _executor, _slots = _executor, None, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
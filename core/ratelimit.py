@@ -0,0 +1,203 @@
+from __future__ import annotations
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from core import config
+
+
+# Limite de tentativas de login. Cada falha custa um PBKDF2 inteiro, então
+# falhas repetidas para um CPF (ou de um mesmo cliente) bloqueiam a chave
+# por um tempo, e as tentativas bloqueadas voltam antes da consulta do
+# usuário e do KDF.
+#
+# A contagem usa janela deslizante aproximada: dois contadores (janela
+# anterior e atual) e o da anterior pesa pela fração que ainda cai dentro
+# da janela. São cinco números por chave, num LRU limitado
+# (AUTH_RATE_MAX_KEYS) que descarta chaves expiradas. Ao atingir o limite a
+# chave fica bloqueada por AUTH_RATE_BACKOFF segundos, dobrando a cada novo
+# bloqueio até AUTH_RATE_BACKOFF_MAX.
+#
+# Com AUTH_RATE_STORE=sqlite o estado também vai para a tabela
+# `loginthrottle` e é relido a cada verificação, para vários processos
+# contarem juntos (a contagem entre processos é aproximada: incrementos
+# simultâneos podem se perder).
+
+SWEEP_INTERVAL = 60.0
+
+# [window_start, prev_count, curr_count, strikes, blocked_until]
+State = List[float]
+
+
+class ThrottledError(ValueError):
+    def __init__(self, retry_after: float) -> None:
+        self.retry_after = retry_after
+        super().__init__(f"Muitas tentativas de login; tente novamente em {math.ceil(retry_after)} s")
+
+
+class SlidingWindowLimiter:
+    def __init__(
+        self,
+        limit: int,
+        window: float,
+        backoff: float,
+        backoff_max: float,
+        maxsize: int = 100_000,
+        clock: Callable[[], float] = time.time,
+        persist: bool = False,
+    ) -> None:
+        self.limit = max(1, int(limit))
+        self.window = float(window)
+        self.backoff = float(backoff)
+        self.backoff_max = float(backoff_max)
+        self.maxsize = max(1, int(maxsize))
+        self.persist = persist
+        self._clock = clock
+        self._data: "OrderedDict[str, State]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+
+    # ---------- estado ----------
+    def _expires_at(self, state: State) -> float:
+        return max(state[0] + 2 * self.window, state[4])
+
+    def _rotate(self, state: State, now: float) -> None:
+        steps = int((now - state[0]) // self.window)
+        if steps >= 1:
+            state[1] = state[2] if steps == 1 else 0
+            state[2] = 0
+            state[0] += steps * self.window
+
+    def _estimate(self, state: State, now: float) -> float:
+        weight = max(0.0, 1.0 - (now - state[0]) / self.window)
+        return state[1] * weight + state[2]
+
+    def _load(self, key: str, now: float) -> Optional[State]:
+        if self.persist:
+            from repository.throttle import LoginThrottleRepository
+            state = LoginThrottleRepository.get(_db_key(key))
+            with self._lock:
+                if state is None:
+                    self._data.pop(key, None)
+                else:
+                    self._data[key] = state
+        with self._lock:
+            state = self._data.get(key)
+            if state is None:
+                return None
+            if self._expires_at(state) <= now:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return state
+
+    def _store(self, key: str, state: State, now: float) -> None:
+        with self._lock:
+            self._data[key] = state
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            sweep = now >= self._next_sweep
+            if sweep:
+                self._next_sweep = now + SWEEP_INTERVAL
+                for k in [k for k, s in self._data.items() if self._expires_at(s) <= now]:
+                    del self._data[k]
+        if self.persist:
+            from repository.throttle import LoginThrottleRepository
+            LoginThrottleRepository.save(_db_key(key), state, self._expires_at(state))
+            if sweep:
+                LoginThrottleRepository.purge_expired(now)
+
+    # ---------- API ----------
+    def retry_after(self, key: str) -> float:
+        """Segundos até `key` poder tentar de novo (0 se liberada)."""
+        now = self._clock()
+        state = self._load(key, now)
+        return max(0.0, state[4] - now) if state is not None else 0.0
+
+    def hit(self, key: str) -> float:
+        """Registra uma falha; retorna o tempo de bloqueio aplicado (0 se nenhum)."""
+        now = self._clock()
+        state = self._load(key, now) or [now, 0, 0, 0, 0.0]
+        state = list(state)
+        self._rotate(state, now)
+        state[2] += 1
+        blocked = 0.0
+        if self._estimate(state, now) >= self.limit:
+            state[3] += 1
+            blocked = min(self.backoff * 2 ** (state[3] - 1), self.backoff_max)
+            state[4] = now + blocked
+        self._store(key, state, now)
+        return blocked
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            known = self._data.pop(key, None) is not None
+        # retry_after() acabou de carregar a chave: se não está aqui, não está na tabela
+        if known and self.persist:
+            from repository.throttle import LoginThrottleRepository
+            LoginThrottleRepository.delete(_db_key(key))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def _db_key(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+_limiters: Dict[str, SlidingWindowLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def limiter(kind: str) -> SlidingWindowLimiter:
+    """Limitador de "cpf" ou "client", criado com a configuração atual."""
+    with _limiters_lock:
+        lim = _limiters.get(kind)
+        if lim is None:
+            lim = SlidingWindowLimiter(
+                config.RATE_LIMIT_CPF if kind == "cpf" else config.RATE_LIMIT_CLIENT,
+                config.RATE_WINDOW_SECONDS,
+                config.RATE_BACKOFF_SECONDS,
+                config.RATE_BACKOFF_MAX_SECONDS,
+                maxsize=config.RATE_MAX_KEYS,
+                persist=config.RATE_STORE == "sqlite",
+            )
+            _limiters[kind] = lim
+        return lim
+
+
+def reset_limiters() -> None:
+    """Descarta os limitadores (os próximos usam a configuração atual)."""
+    with _limiters_lock:
+        _limiters.clear()
+
+
+def _keys(cpf: str, client: Optional[str]):
+    yield limiter("cpf"), "cpf:" + cpf
+    if client:
+        yield limiter("client"), "client:" + client
+
+
+def check_login(cpf: str, client: Optional[str] = None) -> None:
+    """ThrottledError se o CPF ou o cliente estiver bloqueado."""
+    wait = max(lim.retry_after(key) for lim, key in _keys(cpf, client))
+    if wait > 0:
+        raise ThrottledError(wait)
+
+
+def login_failed(cpf: str, client: Optional[str] = None) -> None:
+    for lim, key in _keys(cpf, client):
+        lim.hit(key)
+
+
+def login_succeeded(cpf: str) -> None:
+    # só o CPF é liberado: o cliente continua contando falhas em outros CPFs
+    limiter("cpf").reset("cpf:" + cpf)
@@ -1,57 +1,307 @@
 from __future__ import annotations
+import base64
+import hashlib
 import json
-import os
-from dataclasses import dataclass
-from typing import Optional
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
 
 from core import config
-from core.auth import login as auth_login, verify_session, AuthError
+from core.auth import login as auth_login, verify_session, forget_token, AuthError
 
 
-def _ensure_dir(path: str) -> None:
-    d = os.path.dirname(path)
-    if d and not os.path.exists(d):
-        os.makedirs(d, exist_ok=True)
+# Sessões de login, uma por navegador. O token fica em memória, num LRU
+# limitado (SESSION_MAX_ENTRIES) indexado pela chave do navegador, a primeira
+# disponível entre:
+# - o cookie SESSION_COOKIE (ex.: definido por um proxy reverso);
+# - um id aleatório no parâmetro SESSION_QUERY_PARAM da URL (padrão "sid"),
+#   que sobrevive à recarga da página. Também fica em st.session_state,
+#   porque st.switch_page limpa a URL, e é trocado a cada login (o link de
+#   antes do login não dá acesso à sessão);
+# - o id da sessão do Streamlit, que muda a cada recarga.
+# Fora do Streamlit (scripts, testes) há uma única chave, "local".
+# save_token/load_token/clear_token são operações de dicionário; tokens
+# expirados somem na leitura e numa varredura periódica.
+#
+# Com SESSION_STORE=sqlite as sessões também vão para a tabela `session`:
+# sobrevivem a reinícios do servidor e revoke_user() encerra todas as
+# sessões de um usuário. A tabela só é lida quando a chave não está na
+# memória. Esse modo exige o cookie ou o parâmetro de URL, já que uma chave
+# que muda a cada recarga nunca seria relida.
+#
+# A entrada também guarda o usuário já verificado: enquanto o token não
+# expira e não há logout nem UserRepository.update, current_user() não
+# recalcula o HMAC nem consulta o banco.
 
+LOCAL_KEY = "local"
+SWEEP_INTERVAL = 60.0  # segundos entre varreduras de sessões expiradas
+MISS_TTL = 60  # chave ausente também da tabela: não reconsulta por esse tempo
+SID_STATE = "_session_sid"  # cópia do id da URL em st.session_state
+_SID = re.compile(r"[A-Za-z0-9_-]{16,64}")
 
-def _session_path() -> str:
-    # Read from env if present to align with runtime-configurable tests
-    return os.getenv("SESSION_FILE", config.SESSION_FILE)
 
+class SessionStore:
+    """Mapa chave do navegador -> [token, user_id, exp, usuário verificado],
+    com descarte do menos usado acima de `maxsize` e dos expirados."""
 
-def save_token(token: str) -> None:
-    path = _session_path()
-    _ensure_dir(path)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump({"token": token}, f)
+    def __init__(self, maxsize: int = 10000, clock: Callable[[], float] = time.time) -> None:
+        self.maxsize = max(1, int(maxsize))
+        self._clock = clock
+        self._data: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+        self._stats = {"evictions": 0, "expired": 0}
 
+    def get(self, key: str) -> Optional[list]:
+        now = self._clock()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if entry[2] < now:
+                del self._data[key]
+                self._stats["expired"] += 1
+                return None
+            self._data.move_to_end(key)
+            return entry
 
-def load_token() -> Optional[str]:
-    path = _session_path()
+    def put(self, key: str, token: str, user_id: int, exp: int) -> None:
+        now = self._clock()
+        with self._lock:
+            self._data[key] = [token, int(user_id), int(exp), None]
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._stats["evictions"] += 1
+            if now >= self._next_sweep:
+                self._sweep(now)
+
+    def set_user(self, key: str, token: str, user) -> None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] == token:
+                entry[3] = user
+
+    def pop(self, key: str) -> Optional[list]:
+        with self._lock:
+            return self._data.pop(key, None)
+
+    def drop_user(self, user_id: int) -> List[str]:
+        """Remove as sessões do usuário; retorna os tokens removidos."""
+        with self._lock:
+            keys = [k for k, e in self._data.items() if e[1] == int(user_id)]
+            return [self._data.pop(k)[0] for k in keys]
+
+    def forget_users(self, user_id: Optional[int] = None) -> None:
+        """Descarta os usuários verificados (de `user_id` ou de todos), mantendo os tokens."""
+        with self._lock:
+            for entry in self._data.values():
+                if entry[3] is not None and (user_id is None or entry[1] == int(user_id)):
+                    entry[3] = None
+
+    def sweep(self) -> int:
+        with self._lock:
+            return self._sweep(self._clock())
+
+    def _sweep(self, now: float) -> int:
+        expired = [k for k, e in self._data.items() if e[2] < now]
+        for k in expired:
+            del self._data[k]
+        self._stats["expired"] += len(expired)
+        self._next_sweep = now + SWEEP_INTERVAL
+        return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self._stats)
+            out["size"] = len(self._data)
+            out["resolved"] = sum(1 for e in self._data.values() if e[3] is not None)
+        return out
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_store = SessionStore(config.SESSION_MAX_ENTRIES)
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+_next_purge = 0.0
+
+
+def _query_key(st, rotate: bool = False) -> Optional[str]:
+    name = config.SESSION_QUERY_PARAM
+    if not name:
+        return None
     try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            token = data.get("token")
-            return token if isinstance(token, str) and token else None
-    except FileNotFoundError:
+        sid = None if rotate else (st.query_params.get(name) or st.session_state.get(SID_STATE))
+        if not sid or not _SID.fullmatch(sid):
+            sid = secrets.token_urlsafe(24)
+        st.session_state[SID_STATE] = sid
+        if st.query_params.get(name) != sid:
+            st.query_params[name] = sid
+    except Exception:  # fora de uma execução do Streamlit
         return None
+    return "url:" + sid
+
+
+def _browser_key(rotate: bool = False) -> str:
+    """Chave da sessão deste navegador. `rotate` troca o id da URL (no login)."""
+    # sem o streamlit carregado não há navegador (scripts, testes)
+    st = sys.modules.get("streamlit")
+    if st is None:
+        return LOCAL_KEY
+    if _persistent() and not (config.SESSION_COOKIE or config.SESSION_QUERY_PARAM):
+        raise ValueError(
+            "SESSION_STORE=sqlite exige SESSION_COOKIE ou SESSION_QUERY_PARAM "
+            "(sem eles a sessão não sobrevive a uma recarga)"
+        )
+    if config.SESSION_COOKIE:
+        try:
+            cookie = st.context.cookies.get(config.SESSION_COOKIE)
+        except Exception:  # st.context só existe a partir do Streamlit 1.37
+            cookie = None
+        if cookie:
+            return "cookie:" + cookie
+    key = _query_key(st, rotate)
+    if key:
+        return key
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        ctx = get_script_run_ctx()
     except Exception:
+        ctx = None
+    return "st:" + ctx.session_id if ctx is not None else LOCAL_KEY
+
+
+def _client_key() -> Optional[str]:
+    """Identificação do cliente para o limite de logins, ou None (só o limite
+    por CPF vale). Com AUTH_TRUSTED_PROXY_HEADER é o último IP desse cabeçalho,
+    o que o proxy acrescentou (os anteriores vêm do cliente e podem ser
+    forjados); sem ele, o IP da conexão (st.context.ip_address). Atrás de um
+    proxy sem o cabeçalho configurado, todos os usuários dividem o IP do proxy.
+    """
+    st = sys.modules.get("streamlit")
+    if st is None:
         return None
+    try:
+        if config.TRUSTED_PROXY_HEADER:
+            value = st.context.headers.get(config.TRUSTED_PROXY_HEADER) or ""
+            ip = value.split(",")[-1].strip()
+        else:
+            ip = st.context.ip_address
+    except Exception:  # st.context só existe a partir do Streamlit 1.37
+        ip = None
+    return "ip:" + ip if ip else None
+
+
+def _persistent() -> bool:
+    return config.SESSION_STORE == "sqlite"
 
 
-def clear_token() -> None:
-    path = _session_path()
+def _db_key(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def _claims(token: str) -> Tuple[int, int]:
+    """(sub, exp) do token, sem conferir a assinatura (só para expirar e
+    revogar a entrada; current_user() sempre verifica o token)."""
     try:
-        os.remove(path)
-    except FileNotFoundError:
-        pass
+        payload_b64 = token.split(".")[1]
+        payload = json.loads(base64.urlsafe_b64decode(payload_b64 + "=" * (-len(payload_b64) % 4)))
+        return int(payload.get("sub", 0)), int(payload.get("exp", 0))
+    except Exception:
+        return 0, 0
+
+
+def _entry(key: str) -> Optional[list]:
+    entry = _store.get(key)
+    if entry is not None or not _persistent():
+        return entry if entry is None or entry[0] else None
+    from repository.sessions import SessionRepository
+    row = SessionRepository.get(_db_key(key))
+    now = int(time.time())
+    if row is None or row[2] < now:
+        _store.put(key, "", 0, now + MISS_TTL)
+        return None
+    _store.put(key, *row)
+    return _store.get(key)
+
+
+def save_token(token: str, key: Optional[str] = None) -> None:
+    global _next_purge
+    key = key or _browser_key()
+    user_id, exp = _claims(token)
+    _store.put(key, token, user_id, exp)
+    if _persistent() and user_id > 0:
+        from repository.sessions import SessionRepository
+        SessionRepository.save(_db_key(key), token, user_id, exp)
+        now = time.time()
+        if now >= _next_purge:
+            _next_purge = now + SWEEP_INTERVAL
+            SessionRepository.purge_expired(int(now))
+
+
+def load_token(key: Optional[str] = None) -> Optional[str]:
+    entry = _entry(key or _browser_key())
+    return entry[0] if entry is not None else None
+
+
+def clear_token(key: Optional[str] = None) -> None:
+    key = key or _browser_key()
+    entry = _store.pop(key)
+    if entry is not None and entry[0]:
+        forget_token(entry[0])
+    if _persistent():
+        from repository.sessions import SessionRepository
+        SessionRepository.delete(_db_key(key))
+
+
+def revoke_user(user_id: int) -> int:
+    """Encerra todas as sessões do usuário (memória e, com SESSION_STORE=sqlite,
+    a tabela). Retorna quantas foram encerradas."""
+    tokens = _store.drop_user(user_id)
+    for token in tokens:
+        forget_token(token)
+    count = len(tokens)
+    if _persistent():
+        from repository.sessions import SessionRepository
+        count = max(count, SessionRepository.delete_by_user(user_id))
+    return count
+
+
+def invalidate_user(user_id: int) -> None:
+    """Descarta as resoluções em cache do usuário (ex.: após UserRepository.update)."""
+    _store.forget_users(user_id)
+
+
+def reset_resolver_cache() -> None:
+    """Esquece todas as resoluções e zera os contadores (as sessões continuam)."""
+    _store.forget_users()
+    with _lock:
+        _stats["hits"] = 0
+        _stats["misses"] = 0
+
+
+def resolver_stats() -> Dict[str, int]:
+    """Contadores de acertos/faltas do cache de current_user() e tamanho do armazenamento."""
+    store = _store.stats()
+    with _lock:
+        return dict(_stats, cached=store["resolved"], sessions=store["size"])
 
 
 def login_and_persist(cpf: str, password: str) -> int:
-    """Efetua login e persiste o token localmente. Retorna o user_id."""
-    token = auth_login(cpf, password)
-    save_token(token)
+    """Efetua login e guarda o token na sessão deste navegador. Retorna o user_id."""
+    token = auth_login(cpf, password, client=_client_key())
     payload = verify_session(token)
+    save_token(token, _browser_key(rotate=True))
     return int(payload["sub"])  # user_id
 
 
@@ -61,20 +311,33 @@ def logout() -> None:
 
 def current_user() -> Optional["services.users.User"]:
     """Retorna o usuário logado (DTO) ou None se não houver sessão válida.
-    Se o token estiver inválido/expirado, limpa o arquivo de sessão.
+    Se o token estiver inválido/expirado, encerra a sessão.
     """
     from repository.users import UserRepository
-    token = load_token()
-    if not token:
+    key = _browser_key()
+    entry = _entry(key)
+    if entry is None:
         return None
+    token, _uid, exp, user = entry
+
+    if user is not None and exp >= int(time.time()):
+        with _lock:
+            _stats["hits"] += 1
+        return user
+
+    with _lock:
+        _stats["misses"] += 1
     try:
         payload = verify_session(token)
     except AuthError:
-        clear_token()
+        clear_token(key)
         return None
 
     uid = int(payload.get("sub", 0))
     if uid <= 0:
-        clear_token()
+        clear_token(key)
         return None
-    return UserRepository.get_by_id(uid)
+    user = UserRepository.get_by_id(uid)
+    if user is not None:
+        _store.set_user(key, token, user)
+    return user
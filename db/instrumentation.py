@@ -0,0 +1,249 @@
+from __future__ import annotations
+import json
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+
+try:  # interno do SQLAlchemy; sem ele as linhas lidas ficam sem contagem
+    from sqlalchemy.engine.cursor import CursorFetchStrategy
+except ImportError:
+    CursorFetchStrategy = None
+
+
+# Instrumentação opcional do engine: conta as consultas, mede a duração e as
+# linhas de cada uma e registra as lentas. Fica desligada por padrão; liga com
+# DB_INSTRUMENT=1 (ver db/session.py) ou enable(engine). As consultas só são
+# guardadas enquanto há um QueryLog ativo na thread (collect()), então cada
+# rerun do Streamlit — que roda na sua própria thread — tem o seu resumo.
+# O início de cada consulta fica no contexto de execução, que morre com ela;
+# consultas que falham são registradas pelo handle_error (failed=True).
+#
+# Variáveis de ambiente:
+# - DB_SLOW_QUERY_MS: limite do log de consultas lentas (padrão 100)
+# - DB_QUERY_LOG: arquivo JSONL onde cada resumo de rerun é acrescentado
+
+logger = logging.getLogger("pinanca.sql")
+
+SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", "100"))
+
+_local = threading.local()
+_lock = threading.Lock()
+
+
+@dataclass
+class QueryRecord:
+    statement: str
+    duration: float  # segundos
+    rows: Optional[int] = None  # linhas lidas (SELECT) ou afetadas (DML)
+    executemany: bool = False
+    failed: bool = False
+
+
+@dataclass
+class QueryLog:
+    label: str = ""
+    slow_ms: float = SLOW_QUERY_MS
+    queries: List[QueryRecord] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_time(self) -> float:
+        return sum(q.duration for q in self.queries)
+
+    @property
+    def slow(self) -> List[QueryRecord]:
+        return [q for q in self.queries if q.duration * 1000 >= self.slow_ms]
+
+    @property
+    def failed(self) -> List[QueryRecord]:
+        return [q for q in self.queries if q.failed]
+
+    def by_statement(self) -> List[Dict[str, Any]]:
+        """Consultas agrupadas pelo texto SQL, das mais custosas para as menos."""
+        groups: Dict[str, Dict[str, Any]] = {}
+        for q in self.queries:
+            g = groups.setdefault(q.statement, {"statement": q.statement, "count": 0, "time": 0.0, "rows": 0})
+            g["count"] += 1
+            g["time"] += q.duration
+            g["rows"] += q.rows or 0
+        return sorted(groups.values(), key=lambda g: g["time"], reverse=True)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "label": self.label,
+            "queries": self.count,
+            "time_ms": round(self.total_time * 1000, 3),
+            "slow": len(self.slow),
+            "failed": len(self.failed),
+            "statements": [
+                {**g, "time": round(g["time"] * 1000, 3)} for g in self.by_statement()
+            ],
+        }
+
+    def dump_jsonl(self, path: str) -> None:
+        """Acrescenta o resumo como uma linha JSON em `path`."""
+        record = {"at": datetime.now(timezone.utc).isoformat(timespec="seconds"), **self.summary()}
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def _active() -> List[QueryLog]:
+    logs = getattr(_local, "logs", None)
+    if logs is None:
+        logs = _local.logs = []
+    return logs
+
+
+_WS = re.compile(r"\s+")
+
+
+def _normalize(statement: str) -> str:
+    return _WS.sub(" ", statement).strip()
+
+
+_CountingFetch = None
+if CursorFetchStrategy is not None:
+    class _CountingFetch(CursorFetchStrategy):
+        """Estratégia de leitura padrão que também conta as linhas entregues."""
+
+        __slots__ = ("record",)
+
+        def __init__(self, record: QueryRecord) -> None:
+            self.record = record
+
+        def _add(self, n: int) -> None:
+            self.record.rows = (self.record.rows or 0) + n
+
+        def fetchone(self, result, dbapi_cursor, hard_close=False):
+            row = super().fetchone(result, dbapi_cursor, hard_close)
+            if row is not None:
+                self._add(1)
+            return row
+
+        def fetchmany(self, result, dbapi_cursor, size=None):
+            rows = super().fetchmany(result, dbapi_cursor, size)
+            self._add(len(rows or ()))
+            return rows
+
+        def fetchall(self, result, dbapi_cursor):
+            rows = super().fetchall(result, dbapi_cursor)
+            self._add(len(rows or ()))
+            return rows
+
+
+_START = "_pinanca_query_start"
+
+
+def _count_rows(context, record: QueryRecord) -> None:
+    # só troca a estratégia padrão; se o SQLAlchemy mudar, rows fica None
+    if _CountingFetch is None or type(getattr(context, "cursor_fetch_strategy", None)) is not CursorFetchStrategy:
+        return
+    try:
+        context.cursor_fetch_strategy = _CountingFetch(record)
+    except Exception:
+        pass
+
+
+def _record(context, statement: str, executemany: bool, failed: bool = False) -> Optional[QueryRecord]:
+    logs = _active()
+    start = getattr(context, _START, None)
+    if not logs or start is None:
+        return None
+    setattr(context, _START, None)
+    duration = time.perf_counter() - start
+    record = QueryRecord(
+        statement=_normalize(statement), duration=duration, executemany=bool(executemany), failed=failed
+    )
+    for log in logs:
+        log.queries.append(record)
+    if duration * 1000 >= min(log.slow_ms for log in logs):
+        logger.warning("Consulta lenta (%.1f ms): %s", duration * 1000, record.statement)
+    return record
+
+
+def _before(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _active():
+        setattr(context, _START, time.perf_counter())
+
+
+def _after(conn, cursor, statement, parameters, context, executemany):
+    record = _record(context, statement, executemany)
+    if record is None:
+        return
+    if cursor.description is None:
+        record.rows = cursor.rowcount if cursor.rowcount >= 0 else None
+    else:
+        _count_rows(context, record)
+
+
+def _on_error(exception_context):
+    # after_cursor_execute não dispara quando a consulta falha
+    context = exception_context.execution_context
+    _record(context, exception_context.statement or "", getattr(context, "executemany", False), failed=True)
+
+
+def enable(engine) -> None:
+    """Liga a instrumentação no engine (idempotente)."""
+    with _lock:
+        if is_enabled(engine):
+            return
+        event.listen(engine, "before_cursor_execute", _before)
+        event.listen(engine, "after_cursor_execute", _after)
+        event.listen(engine, "handle_error", _on_error)
+
+
+def disable(engine) -> None:
+    with _lock:
+        if not is_enabled(engine):
+            return
+        event.remove(engine, "before_cursor_execute", _before)
+        event.remove(engine, "after_cursor_execute", _after)
+        event.remove(engine, "handle_error", _on_error)
+
+
+def is_enabled(engine) -> bool:
+    return event.contains(engine, "after_cursor_execute", _after)
+
+
+@contextmanager
+def collect(label: str = "", engine=None) -> Iterator[QueryLog]:
+    """Registra as consultas feitas na thread atual dentro do bloco.
+    Com `engine`, liga a instrumentação nele durante o bloco se ainda não estiver.
+    """
+    attached = engine is not None and not is_enabled(engine)
+    if attached:
+        enable(engine)
+    log = QueryLog(label=label)
+    logs = _active()
+    logs.append(log)
+    try:
+        yield log
+    finally:
+        logs.remove(log)
+        if attached:
+            disable(engine)
+
+
+@contextmanager
+def assert_max_queries(n: int, engine=None) -> Iterator[QueryLog]:
+    """Falha (AssertionError) se o bloco fizer mais de `n` consultas.
+    Sem `engine`, usa o de db.session.
+    """
+    if engine is None:
+        from db.session import engine
+    with collect(f"assert_max_queries({n})", engine=engine) as log:
+        yield log
+    if log.count > n:
+        listing = "\n".join(f"  {g['count']}x {g['statement']}" for g in log.by_statement())
+        raise AssertionError(f"{log.count} consultas, esperado no máximo {n}:\n{listing}")
@@ -1,4 +1,5 @@
 from sqlmodel import SQLModel, Field
+from sqlalchemy import Index
 from typing import Optional
 from datetime import date, datetime, timezone
 
@@ -17,14 +18,14 @@ class User(SQLModel, table=True):
 class Category(SQLModel, table=True):
     __table_args__ = {"extend_existing": True}
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id")
+    user_id: int = Field(foreign_key="user.id", index=True)
     name: str
 
 
 class Responsible(SQLModel, table=True):
     __table_args__ = {"extend_existing": True}
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id")
+    user_id: int = Field(foreign_key="user.id", index=True)
     name: Optional[str] = None
     related_user_id: Optional[int] = Field(default=None, foreign_key="user.id")
 
@@ -32,12 +33,17 @@ class Responsible(SQLModel, table=True):
 class DebtOrigin(SQLModel, table=True):
     __table_args__ = {"extend_existing": True}
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id")
+    user_id: int = Field(foreign_key="user.id", index=True)
     name: str
 
 
 class Debt(SQLModel, table=True):
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # list_by_filters: user_id [+ paid] ordenado por debt_date, id
+        Index("ix_debt_user_paid_date", "user_id", "paid", "debt_date"),
+        Index("ix_debt_user_date", "user_id", "debt_date", "id"),
+        {"extend_existing": True},
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     origin_id: int = Field(foreign_key="debtorigin.id")
@@ -45,29 +51,39 @@ class Debt(SQLModel, table=True):
     responsible_id: Optional[int] = Field(default=None, foreign_key="responsible.id")
     debt_date: date
     description: Optional[str] = None
-    total_amount: float
+    total_amount_cents: int  # centavos
     installments: int
     notes: Optional[str] = None
     paid: bool = False
 
 
 class DebtInstallment(SQLModel, table=True):
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("ix_debtinstallment_debt_number", "debt_id", "number"),
+        {"extend_existing": True},
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     debt_id: int = Field(foreign_key="debt.id")
     number: int
-    amount: float
+    amount_cents: int  # centavos
     due_on: date
     paid: bool = False
     paid_at: Optional[datetime] = None
 
 
 class Transaction(SQLModel, table=True):
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        # list_by_filters(fixed=...) e list_by_user: ordenados por occurred_at DESC, id DESC
+        Index("ix_transaction_user_fixed_occurred", "user_id", "fixed", "occurred_at", "id"),
+        Index("ix_transaction_user_occurred", "user_id", "occurred_at", "id"),
+        # services.recurrence: regras fixas vencidas (next_execution <= hoje)
+        Index("ix_transaction_fixed_next_execution", "fixed", "next_execution"),
+        {"extend_existing": True},
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     category_id: Optional[int] = Field(default=None, foreign_key="category.id")
-    amount: float
+    amount_cents: int  # centavos
     type: str   # 'income' or 'expense'
     fixed: bool = False
     periodicity: str = "none"  # 'none','monthly','weekly','yearly'
@@ -76,3 +92,45 @@ class Transaction(SQLModel, table=True):
     notes: Optional[str] = None
     occurred_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     installment_id: Optional[int] = Field(default=None, foreign_key="debtinstallment.id")
+
+
+class MonthlySummary(SQLModel, table=True):
+    # Totais mensais materializados das transações efetivas (fixed=False),
+    # mantidos pelo TransactionRepository na mesma transação das escritas.
+    __table_args__ = (
+        Index("ux_monthlysummary_key", "user_id", "year_month", "type", "category_id", unique=True),
+        {"extend_existing": True},
+    )
+    id: Optional[int] = Field(default=None, primary_key=True)
+    user_id: int = Field(foreign_key="user.id")
+    year_month: str  # 'YYYY-MM'
+    type: str   # 'income' or 'expense'
+    category_id: int = 0  # 0 = sem categoria (NULL não entra na chave única)
+    total_cents: int = 0
+    count: int = 0
+
+
+class UserSession(SQLModel, table=True):
+    # Sessões de login persistidas (SESSION_STORE=sqlite): sobrevivem a
+    # reinícios do servidor e podem ser revogadas. A chave é o SHA-256 do
+    # identificador do navegador, nunca o identificador em si.
+    __tablename__ = "session"
+    __table_args__ = {"extend_existing": True}
+    key: str = Field(primary_key=True)
+    token: str
+    user_id: int = Field(foreign_key="user.id", index=True)
+    expires_at: int  # epoch (segundos), o mesmo exp do token
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class LoginThrottle(SQLModel, table=True):
+    # Contadores de falhas de login (AUTH_RATE_STORE=sqlite), compartilhados
+    # entre processos. A chave é o SHA-256 de "cpf:..."/"client:...".
+    __table_args__ = {"extend_existing": True}
+    key: str = Field(primary_key=True)
+    window_start: float
+    prev_count: int = 0
+    curr_count: int = 0
+    strikes: int = 0
+    blocked_until: float = 0
+    expires_at: float = Field(index=True)
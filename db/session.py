@@ -1,14 +1,242 @@
 from sqlmodel import SQLModel, create_engine
+from sqlalchemy import event, inspect
 import os
+import threading
 
 DB_PATH = os.getenv("DB_PATH", "./data/app.db")
 
+# Perfis de ajuste do SQLite, aplicados via PRAGMA a cada nova conexão.
+# - "throughput" (padrão): WAL + synchronous=NORMAL. Leitores não bloqueiam o
+#   escritor e cada commit evita o fsync do banco principal; em queda de energia
+#   as últimas transações confirmadas podem se perder, mas o arquivo não corrompe.
+# - "durability": WAL + synchronous=FULL. Cada commit faz fsync do WAL; mais
+#   lento em rajadas de escrita, porém nenhuma transação confirmada é perdida.
+# Valores individuais podem ser sobrescritos por variáveis de ambiente
+# (DB_SYNCHRONOUS, DB_MMAP_SIZE, DB_CACHE_SIZE, DB_BUSY_TIMEOUT).
+ENGINE_PROFILES = {
+    "throughput": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,  # negativo = KiB (64 MiB)
+        "temp_store": "MEMORY",
+        "foreign_keys": "ON",
+        "busy_timeout": 5000,
+    },
+    "durability": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "mmap_size": 0,
+        "cache_size": -16 * 1024,
+        "temp_store": "MEMORY",
+        "foreign_keys": "ON",
+        "busy_timeout": 5000,
+    },
+}
+
+DB_PROFILE = os.getenv("DB_PROFILE", "throughput")
+
+_ENV_OVERRIDES = {
+    "synchronous": "DB_SYNCHRONOUS",
+    "mmap_size": "DB_MMAP_SIZE",
+    "cache_size": "DB_CACHE_SIZE",
+    "busy_timeout": "DB_BUSY_TIMEOUT",
+}
+_SYNCHRONOUS_LEVELS = ("OFF", "NORMAL", "FULL", "EXTRA", "0", "1", "2", "3")
+
+
+def _override_value(key: str, env_name: str, value: str):
+    # os valores entram direto no texto do PRAGMA: nada além de níveis
+    # conhecidos e inteiros passa daqui
+    if key == "synchronous":
+        level = value.strip().upper()
+        if level not in _SYNCHRONOUS_LEVELS:
+            raise ValueError(f"{env_name} inválido: {value!r} (use OFF, NORMAL, FULL, EXTRA ou 0-3)")
+        return level
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{env_name} inválido: {value!r} (esperado um número inteiro)") from None
+
+
+def engine_pragmas(profile: str = DB_PROFILE) -> dict:
+    """Retorna os PRAGMAs do perfil informado, já com overrides do ambiente."""
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Perfil de banco inválido: {profile!r} (use {', '.join(ENGINE_PROFILES)})")
+    pragmas = dict(ENGINE_PROFILES[profile])
+    for key, env_name in _ENV_OVERRIDES.items():
+        value = os.getenv(env_name)
+        if value:
+            pragmas[key] = _override_value(key, env_name, value)
+    return pragmas
+
+
+PRAGMAS = engine_pragmas()
+
 # cria engine apontando para SQLite
 engine = create_engine(
     f"sqlite:///{DB_PATH}",
     connect_args={"check_same_thread": False}
 )
 
+
+@event.listens_for(engine, "connect")
+def _apply_pragmas(dbapi_conn, _conn_record) -> None:
+    cur = dbapi_conn.cursor()
+    try:
+        for key, value in PRAGMAS.items():
+            cur.execute(f"PRAGMA {key}={value}")
+    finally:
+        cur.close()
+
+
+# Contagem/latência das consultas (db/instrumentation.py), opcional
+if os.getenv("DB_INSTRUMENT", "").lower() in ("1", "true", "yes"):
+    from db.instrumentation import enable as _enable_instrumentation
+    _enable_instrumentation(engine)
+
+
+def ensure_indexes() -> None:
+    """Cria índices declarados nos modelos que ainda não existem no banco.
+    create_all só cria índices junto com tabelas novas; bancos existentes
+    recebem os índices por aqui. Idempotente (checkfirst).
+    """
+    with engine.begin() as conn:
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(conn, checkfirst=True)
+
+
+# Versão do esquema, gravada em PRAGMA user_version. Cada passo de
+# migrate() leva um banco da versão anterior para a seguinte.
+SCHEMA_VERSION = 3
+
+# v1: valores monetários passam de REAL (reais) para INTEGER (centavos)
+_CENTS_COLUMNS = (
+    ("transaction", "amount", "amount_cents"),
+    ("debt", "total_amount", "total_amount_cents"),
+    ("debtinstallment", "amount", "amount_cents"),
+    ("monthlysummary", "total", "total_cents"),
+)
+
+
+def _migrate_to_cents(conn) -> bool:
+    insp = inspect(conn)
+    migrated = False
+    for table, old, new in _CENTS_COLUMNS:
+        if not insp.has_table(table):
+            continue
+        columns = {c["name"] for c in insp.get_columns(table)}
+        if old not in columns:
+            continue
+        if new not in columns:
+            conn.exec_driver_sql(f'ALTER TABLE "{table}" ADD COLUMN {new} INTEGER NOT NULL DEFAULT 0')
+        conn.exec_driver_sql(f'UPDATE "{table}" SET {new} = CAST(ROUND({old} * 100) AS INTEGER)')
+        # DROP COLUMN exige SQLite >= 3.35
+        conn.exec_driver_sql(f'ALTER TABLE "{table}" DROP COLUMN {old}')
+        migrated = True
+    return migrated
+
+
+# v2: índices de texto (FTS5) sobre descrição/notas. São tabelas de conteúdo
+# externo: guardam só o índice invertido e leem o texto da tabela original;
+# gatilhos mantêm o índice em dia a cada INSERT/UPDATE/DELETE.
+SEARCH_TABLES = {
+    "transaction": "transaction_fts",
+    "debt": "debt_fts",
+}
+_SEARCH_COLUMNS = ("description", "notes")
+
+
+def _create_search_index(conn) -> None:
+    cols = ", ".join(_SEARCH_COLUMNS)
+    new_vals = ", ".join(f"new.{c}" for c in _SEARCH_COLUMNS)
+    old_vals = ", ".join(f"old.{c}" for c in _SEARCH_COLUMNS)
+    for table, fts in SEARCH_TABLES.items():
+        conn.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, "
+            f"content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        conn.exec_driver_sql(
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON "{table}" BEGIN '
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_vals}); END"
+        )
+        conn.exec_driver_sql(
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON "{table}" BEGIN '
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); END"
+        )
+        # só dispara quando o texto muda (ex.: avançar next_execution não reindexa)
+        conn.exec_driver_sql(
+            f'CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON "{table}" BEGIN '
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_vals}); "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_vals}); END"
+        )
+        # indexa as linhas que já existiam
+        conn.exec_driver_sql(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+# v3: transações fixas gravadas antes do motor de recorrência não tinham
+# next_execution e nunca seriam materializadas; começam do próprio dia de
+# referência (occurred_at), como o formulário faz hoje
+def _backfill_next_execution(conn) -> None:
+    conn.exec_driver_sql(
+        'UPDATE "transaction" SET next_execution = date(occurred_at) '
+        "WHERE fixed = 1 AND periodicity != 'none' AND next_execution IS NULL"
+    )
+
+
+def migrate() -> bool:
+    """Atualiza o esquema de um banco existente até SCHEMA_VERSION.
+    Não é atômico: o pysqlite só abre a transação implícita antes de
+    INSERT/UPDATE/DELETE, então DDL emitido antes disso (ex.: o primeiro
+    ADD COLUMN) é confirmado na hora. Cada passo pode ser repetido com
+    segurança (a coluna em centavos só é criada se ainda não existir) e
+    user_version só muda no fim, então uma migração interrompida é refeita
+    na próxima chamada.
+    Retorna True se algum dado foi convertido.
+    """
+    with engine.begin() as conn:
+        version = int(conn.exec_driver_sql("PRAGMA user_version").scalar() or 0)
+        migrated = False
+        if version < 1:
+            migrated = _migrate_to_cents(conn) or migrated
+        if version < 2:
+            _create_search_index(conn)
+        if version < 3:
+            _backfill_next_execution(conn)
+        if version < SCHEMA_VERSION:
+            conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return migrated
+
+
 def init_db():
+    insp = inspect(engine)
+    upgrading = insp.has_table("transaction") and not insp.has_table("monthlysummary")
     # cria tabelas se não existirem
     SQLModel.metadata.create_all(engine)
+    upgrading = migrate() or upgrading
+    ensure_indexes()
+    if upgrading:
+        # banco anterior à tabela de resumos mensais (ou aos centavos):
+        # recalcula os resumos a partir do histórico
+        from repository.rollups import rebuild_rollups
+        rebuild_rollups()
+
+
+# init_db() confere e altera o esquema; o Streamlit reexecuta app.py a cada
+# interação, mas isso só precisa acontecer uma vez por processo.
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def ensure_db() -> None:
+    """Roda init_db() na primeira chamada do processo; as seguintes não fazem nada."""
+    global _initialized
+    if _initialized:
+        return
+    with _init_lock:
+        if _initialized:
+            return
+        import db.models  # registra as tabelas no metadata antes do create_all
+        init_db()
+        _initialized = True
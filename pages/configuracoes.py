@@ -1,11 +1,14 @@
 from __future__ import annotations
-import uuid
-from pathlib import Path
+import os
+import tempfile
+from datetime import date
 import pandas as pd
 import streamlit as st
 
 from core.session import current_user
 from ui.nav import render_sidebar
+from ui.debug import run_page
+from ui.table_diff import diff_frames
 
 from services.debt_origins import DebtOrigin
 from repository.debt_origins import DebtOriginRepository
@@ -14,6 +17,8 @@ from services.categories import Category
 from repository.responsibles import ResponsibleRepository
 from repository.categories import CategoryRepository
 from repository.users import UserRepository
+from services.export import LedgerExporter, available_formats
+from services.profile_images import release_profile_image, save_profile_image
 
 
 # -------------------- util --------------------
@@ -23,23 +28,11 @@ def _do_rerun() -> None:
         fn()
 
 
-PROFILE_DIR = Path("data/profile_images")
-
-
-def _ensure_dirs() -> None:
-    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
-
-
 def _save_profile_image(upload) -> str | None:
     if not upload:
         return None
-    _ensure_dirs()
-    suffix = "".join(Path(upload.name).suffixes) or ".png"
-    filename = f"{uuid.uuid4().hex}{suffix}"
-    dest = PROFILE_DIR / filename
-    with open(dest, "wb") as f:
-        f.write(upload.getbuffer())
-    return str(dest)
+    # grava só a miniatura (320px WebP), com o nome pelo hash do conteúdo
+    return save_profile_image(upload.getvalue(), upload.name)
 
 
 def _load_origins(user_id: int):
@@ -70,30 +63,31 @@ def _df_from_models(items, id_fn, name_fn):
     return pd.DataFrame([{"id": id_fn(x), "nome": name_fn(x)} for x in items])
 
 
-def _apply_updates(df_original: pd.DataFrame, df_editado: pd.DataFrame, update_fn):
-    """Compara apenas a coluna 'nome' por id; ignora colunas extras como 'sel'."""
-    alterados = 0
-    base_map = {int(r["id"]): str(r["nome"] or "").strip() for _, r in df_original.iterrows()}
-    for _, row in df_editado.iterrows():
-        rid = int(row["id"])
-        new_name = str(row.get("nome", "") or "").strip()
-        if base_map.get(rid, "") != new_name:
-            try:
-                update_fn(rid, new_name or None)
-                alterados += 1
-            except Exception as e:
-                st.error(f"Erro ao atualizar id={rid}: {e}")
-    return alterados
-
-
-def _apply_deletes(ids, delete_fn, label: str):
-    removidos = 0
-    for rid in ids:
-        try:
-            delete_fn(int(rid))
-            removidos += 1
-        except Exception as e:
-            st.error(f"Erro ao remover id={rid}: {e}")
+def _apply_updates(df_original: pd.DataFrame, df_editado: pd.DataFrame, items, bulk_update_fn):
+    """Compara apenas a coluna 'nome' (quadros indexados pelo id); ignora colunas extras como 'sel'.
+    As linhas alteradas são gravadas de uma vez com `bulk_update_fn`.
+    """
+    diff = diff_frames(df_original, df_editado, {"nome": "text"})
+    items_by_id = {item.get_id(): item for item in items}
+    changed = []
+    for rid, patch in diff.patches.items():
+        if rid in items_by_id:
+            item = items_by_id[rid]
+            item.set_name(patch["nome"] or None)
+            changed.append(item)
+    if not changed:
+        return 0
+    result = bulk_update_fn(changed)
+    for idx, msg in result.errors.items():
+        st.error(f"Erro ao atualizar id={changed[idx].get_id()}: {msg}")
+    return result.ok_count
+
+
+def _apply_deletes(ids, bulk_delete_fn, label: str):
+    result = bulk_delete_fn([int(rid) for rid in ids])
+    for idx, msg in result.errors.items():
+        st.error(f"Erro ao remover id={ids[idx]}: {msg}")
+    removidos = result.ok_count
     if removidos:
         st.toast(f"{removidos} {label} removido(s)", icon="✅")
 
@@ -122,8 +116,11 @@ def render(user=None):
             try:
                 new_path = _save_profile_image(uploaded)
                 if new_path:
+                    old_path = user.get_profile_image()
                     user.set_profile_image(new_path)
                     UserRepository.update(user)
+                    if old_path != new_path:
+                        release_profile_image(old_path)
                     st.toast("Imagem atualizada!", icon="✅")
                     _do_rerun()
                 else:
@@ -193,15 +190,7 @@ def render(user=None):
             col1, col2 = st.columns(2)
         with col1:
             if st.button("Salvar alterações", type="primary", key="save_origins_btn", width='stretch'):
-                def _update_origin(oid, new_name):
-                    o = next(x for x in origins if x.get_id() == oid)
-                    o.set_name(new_name)
-                    DebtOriginRepository.update(o)
-
-                # Converte de volta o índice 'id' para coluna para aplicar atualizações
-                base_o = df_o.reset_index()[["id", "nome"]]
-                edit_o = edited_o.reset_index()[["id", "nome"]]
-                alterados = _apply_updates(base_o, edit_o, _update_origin)
+                alterados = _apply_updates(df_o, edited_o, origins, DebtOriginRepository.bulk_update)
                 if alterados:
                     st.toast("Alterações salvas.", icon="✅")
                     _do_rerun()
@@ -236,7 +225,7 @@ def render(user=None):
                         _do_rerun()
                 with c2:
                     if st.button("Excluir", type="primary", width='stretch'):
-                        _apply_deletes(ids, DebtOriginRepository.delete, "origem(ns)")
+                        _apply_deletes(ids, DebtOriginRepository.bulk_delete, "origem(ns)")
                         st.session_state["confirm_delete_origin_ids"] = []
                         _do_rerun()
             _confirm_del_origins()
@@ -251,7 +240,7 @@ def render(user=None):
                 st.session_state["confirm_delete_origin_ids"] = []
                 _do_rerun()
             if c2.button("Excluir", type="primary"):
-                _apply_deletes(ids, DebtOriginRepository.delete, "origem(ns)")
+                _apply_deletes(ids, DebtOriginRepository.bulk_delete, "origem(ns)")
                 st.session_state["confirm_delete_origin_ids"] = []
                 _do_rerun()
 
@@ -313,14 +302,7 @@ def render(user=None):
             ccol1, ccol2 = st.columns(2)
         with ccol1:
             if st.button("Salvar alterações", type="primary", key="save_cats_btn", width='stretch'):
-                def _update_cat(cid, new_name):
-                    c = next(x for x in categories if x.get_id() == cid)
-                    c.set_name(new_name)
-                    CategoryRepository.update(c)
-
-                base_c = df_c.reset_index()[["id", "nome"]]
-                edit_c = edited_c.reset_index()[["id", "nome"]]
-                alterados = _apply_updates(base_c, edit_c, _update_cat)
+                alterados = _apply_updates(df_c, edited_c, categories, CategoryRepository.bulk_update)
                 if alterados:
                     st.toast("Alterações salvas.", icon="✅")
                     _do_rerun()
@@ -354,7 +336,7 @@ def render(user=None):
                         _do_rerun()
                 with col2:
                     if st.button("Excluir", type="primary", width='stretch'):
-                        _apply_deletes(ids, CategoryRepository.delete, "categoria(s)")
+                        _apply_deletes(ids, CategoryRepository.bulk_delete, "categoria(s)")
                         st.session_state["confirm_delete_cat_ids"] = []
                         _do_rerun()
             _confirm_del_cats()
@@ -369,7 +351,7 @@ def render(user=None):
                 st.session_state["confirm_delete_cat_ids"] = []
                 _do_rerun()
             if col2.button("Excluir", type="primary"):
-                _apply_deletes(ids, CategoryRepository.delete, "categoria(s)")
+                _apply_deletes(ids, CategoryRepository.bulk_delete, "categoria(s)")
                 st.session_state["confirm_delete_cat_ids"] = []
                 _do_rerun()
 
@@ -433,14 +415,7 @@ def render(user=None):
             rcol1, rcol2 = st.columns(2)
         with rcol1:
             if st.button("Salvar alterações", type="primary", key="save_resps_btn", width='stretch'):
-                def _update_resp(rid, new_name):
-                    r = next(x for x in responsibles if x.get_id() == rid)
-                    r.set_name((new_name or "").strip() or None)
-                    ResponsibleRepository.update(r)
-
-                base_r = df_r.reset_index()[["id", "nome"]]
-                edit_r = edited_r.reset_index()[["id", "nome"]]
-                alterados = _apply_updates(base_r, edit_r, _update_resp)
+                alterados = _apply_updates(df_r, edited_r, responsibles, ResponsibleRepository.bulk_update)
                 if alterados:
                     st.toast("Alterações salvas.", icon="✅")
                     _do_rerun()
@@ -475,7 +450,7 @@ def render(user=None):
                         _do_rerun()
                 with c2:
                     if st.button("Excluir", type="primary", width='stretch'):
-                        _apply_deletes(ids, ResponsibleRepository.delete, "responsável(is)")
+                        _apply_deletes(ids, ResponsibleRepository.bulk_delete, "responsável(is)")
                         st.session_state["confirm_delete_resp_ids"] = []
                         _do_rerun()
             _confirm_del_resps()
@@ -490,10 +465,64 @@ def render(user=None):
                 st.session_state["confirm_delete_resp_ids"] = []
                 _do_rerun()
             if c2.button("Excluir", type="primary"):
-                _apply_deletes(ids, ResponsibleRepository.delete, "responsável(is)")
+                _apply_deletes(ids, ResponsibleRepository.bulk_delete, "responsável(is)")
                 st.session_state["confirm_delete_resp_ids"] = []
                 _do_rerun()
 
+    st.divider()
+
+    # ======================================================================
+    # EXPORTAÇÃO
+    # ======================================================================
+    _section_export(user)
+
+
+def _drop_export() -> None:
+    """Apaga o zip gerado (chamado ao baixar, ao trocar o formato ou ao gerar outro)."""
+    blob = st.session_state.pop("export_blob", None)
+    if blob:
+        try:
+            os.remove(blob[1])
+        except OSError:
+            pass
+
+
+def _section_export(user) -> None:
+    st.subheader("Exportar dados")
+    st.caption("Transações, dívidas e parcelas completas, um arquivo por tabela (valores em centavos).")
+    formats = available_formats()
+    labels = {"csv": "CSV", "parquet": "Parquet"}
+    c1, c2 = st.columns([2, 1])
+    with c1:
+        fmt = st.radio("Formato", formats, format_func=labels.get, horizontal=True, key="export_fmt")
+    with c2:
+        if st.button("Gerar arquivo", width='stretch'):
+            _drop_export()
+            # o zip fica em disco; a sessão guarda só o caminho até o download
+            tmp = tempfile.NamedTemporaryFile(prefix="pinanca-export-", suffix=".zip", delete=False)
+            try:
+                with tmp, st.spinner("Gerando exportação..."):
+                    result = LedgerExporter.export_zip(user.get_id(), tmp, fmt=fmt)
+                st.session_state["export_blob"] = (fmt, tmp.name, sum(result.rows.values()))
+            except Exception as e:
+                os.remove(tmp.name)
+                st.error(f"Falha ao exportar: {e}")
+    blob = st.session_state.get("export_blob")
+    if blob and (blob[0] != fmt or not os.path.exists(blob[1])):
+        _drop_export()
+        blob = None
+    if blob:
+        _, path, rows = blob
+        with open(path, "rb") as data:
+            st.download_button(
+                f"Baixar ({rows} linha(s))",
+                data=data,
+                file_name=f"pinanca-{date.today():%Y%m%d}-{fmt}.zip",
+                mime="application/zip",
+                type="primary",
+                on_click=_drop_export,
+            )
+
 
 # Auto-render
-render()
+run_page(render, "configuracoes")
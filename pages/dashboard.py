@@ -1,7 +1,13 @@
 from __future__ import annotations
+from datetime import date, datetime, time, timezone
 import streamlit as st
 from core.session import current_user
 from ui.nav import render_sidebar
+from ui.debug import run_page
+
+from services.debts import add_months
+from services.money import from_cents
+from repository.reports import ReportRepository
 
 
 def render(user=None):
@@ -13,7 +19,51 @@ def render(user=None):
             st.stop()
     render_sidebar(user)
     st.title("Dashboard")
-    st.write("Bem-vindo ao painel. Em breve, gráficos e resumos aqui.")
+
+    today = date.today()
+    first_of_month = today.replace(day=1)
+    c1, c2 = st.columns(2)
+    with c1:
+        start_day = st.date_input("De", value=add_months(first_of_month, -11), key="dash_start")
+    with c2:
+        end_day = st.date_input("Até", value=today, key="dash_end")
+    if start_day > end_day:
+        st.warning("A data inicial deve ser anterior à final.")
+        return
+    st.caption("Os totais consideram os meses inteiros do período.")
+    start = datetime.combine(start_day, time.min, tzinfo=timezone.utc)
+    end = datetime.combine(end_day, time.max, tzinfo=timezone.utc)
+
+    try:
+        monthly = ReportRepository.monthly_totals(user.get_id(), start, end)
+        balance = ReportRepository.balance_series(user.get_id(), start, end)
+        by_category = ReportRepository.category_breakdown(user.get_id(), start, end, type="expense")
+    except Exception as e:
+        st.error(f"Erro ao carregar resumo: {e}")
+        return
+
+    if monthly.empty:
+        st.info("Nenhuma transação no período.")
+        return
+
+    m1, m2, m3 = st.columns(3)
+    income = int(monthly["entradas_cents"].sum())
+    expense = int(monthly["saidas_cents"].sum())
+    m1.metric("Entradas", f"R$ {from_cents(income):,.2f}")
+    m2.metric("Saídas", f"R$ {from_cents(expense):,.2f}")
+    m3.metric("Saldo do período", f"R$ {from_cents(income - expense):,.2f}")
+
+    st.subheader("Entradas e saídas por mês")
+    st.bar_chart(monthly.set_index("mes")[["entradas", "saidas"]])
+
+    st.subheader("Saldo acumulado")
+    st.line_chart(balance.set_index("mes")[["saldo"]])
+
+    st.subheader("Saídas por categoria")
+    if by_category.empty:
+        st.caption("Sem saídas no período.")
+    else:
+        st.bar_chart(by_category.set_index("categoria")[["total"]])
 
 # Ensure page renders when executed directly by Streamlit multipage
-render()
+run_page(render, "dashboard")
@@ -1,18 +1,21 @@
 from __future__ import annotations
 from datetime import date, datetime, time, timezone
-import calendar
 import pandas as pd
 import streamlit as st
 
 from core.session import current_user
 from ui.nav import render_sidebar
+from ui.debug import run_page
+from ui.pagination import PAGE_SIZE, current_cursor, render_pager
+from ui.table_diff import diff_frames
 
 from services.debts import Debt
+from services.money import from_cents, series_to_cents
 from repository.debts import DebtRepository
 from repository.debt_origins import DebtOriginRepository
 from repository.categories import CategoryRepository
 from repository.responsibles import ResponsibleRepository
-from services.debt_installments import DebtInstallment
+from services.installment_scheduler import InstallmentScheduler
 from repository.debt_installments import DebtInstallmentRepository
 
 st.set_page_config(page_title="Débitos", layout="wide")
@@ -71,6 +74,20 @@ def _str_to_opt(value):
         return None
 
 
+# Colunas editáveis da tabela de débitos e como compará-las (ver ui/table_diff.py)
+_DEBT_COLUMNS = {
+    "origem": "text",
+    "categoria": "text",
+    "responsavel": "text",
+    "descricao": "text",
+    "data": "date",
+    "valor_total": "money",
+    "parcelas": "int",
+    "pago": "bool",
+    "notas": "text",
+}
+
+
 def _df_from_debts(debts):
     rows = []
     for d in debts:
@@ -93,49 +110,9 @@ def _df_from_debts(debts):
     return pd.DataFrame(rows)
 
 
-def _add_months(base: date, months: int) -> date:
-    month_index = (base.month - 1) + months
-    year = base.year + month_index // 12
-    month = (month_index % 12) + 1
-    day = min(base.day, calendar.monthrange(year, month)[1])
-    return date(year, month, day)
-
-
-def _sync_debt_installments(debt: Debt, total_amount: float, start_date: date, installments: int) -> None:
-    if not debt or debt.get_id() is None:
-        return
+def _sync_debt_installments(debt: Debt) -> None:
     try:
-        count = max(1, int(installments or 1))
-        total = float(total_amount or 0.0)
-        if total <= 0:
-            return
-        base_date = start_date or date.today()
-        if isinstance(base_date, pd.Timestamp):
-            base_date = base_date.date()
-
-        existing = DebtInstallmentRepository.list_by_debt(debt.get_id(), limit=2000)
-        for inst in existing:
-            try:
-                DebtInstallmentRepository.delete(inst.get_id())
-            except Exception:
-                continue
-
-        timestamp_now = datetime.now(timezone.utc)
-        for idx in range(count):
-            due = _add_months(base_date, idx)
-            inst = DebtInstallment(
-                debt_id=debt.get_id(),
-                number=idx + 1,
-                amount=float(max(0.0, total)),
-                due_on=due,
-                paid=bool(debt.get_paid()),
-            )
-            if inst.get_paid():
-                inst.set_paid_at(timestamp_now)
-            try:
-                DebtInstallmentRepository.create(inst)
-            except Exception as e:
-                st.warning(f"Falha ao criar parcela {idx + 1}: {e}")
+        InstallmentScheduler.reconcile(debt)
     except Exception as e:
         st.warning(f"Não foi possível sincronizar parcelas: {e}")
 
@@ -296,12 +273,7 @@ def render(user=None):
                     paid=bool(paid),
                 )
                 debt = DebtRepository.create(model)
-                _sync_debt_installments(
-                    debt,
-                    float(total_amount),
-                    debt_date,
-                    int(installments),
-                )
+                _sync_debt_installments(debt)
                 st.toast("Dívida cadastrada!", icon="✅")
                 st.session_state["reset_debt_form"] = True
                 _do_rerun()
@@ -360,15 +332,26 @@ def render(user=None):
     elif status_choice == "Quitados":
         paid_filter = True
 
+    search_query = st.text_input(
+        "Buscar", key="debts_search", placeholder="Descrição ou notas", label_visibility="collapsed"
+    ).strip()
+
+    page_key = "debts_page_cursors"
+    cursor = current_cursor(page_key, (paid_filter, origin_filter, category_filter, responsible_filter, search_query))
+    next_cursor = None
+    filters = dict(
+        paid=paid_filter,
+        origin_id=origin_filter if origin_filter else None,
+        category_id=category_filter if category_filter else None,
+        responsible_id=responsible_filter if responsible_filter else None,
+    )
     try:
-        debts = DebtRepository.list_by_filters(
-            user.get_id(),
-            paid=paid_filter,
-            origin_id=origin_filter if origin_filter else None,
-            category_id=category_filter if category_filter else None,
-            responsible_id=responsible_filter if responsible_filter else None,
-            limit=500,
-        )
+        if search_query:
+            debts, next_cursor = DebtRepository.search(user.get_id(), search_query, PAGE_SIZE, cursor, **filters)
+        else:
+            debts, next_cursor = DebtRepository.list_page_by_filters(
+                user.get_id(), limit=PAGE_SIZE, cursor=cursor, **filters
+            )
     except Exception as e:
         st.error(f"Erro ao carregar dívidas: {e}")
         debts = []
@@ -387,6 +370,7 @@ def render(user=None):
 
     if not debts:
         st.info("Nenhum débito encontrado com os filtros selecionados.")
+        render_pager(page_key, None)
         return
 
     df = _df_from_debts(debts)
@@ -441,8 +425,9 @@ def render(user=None):
             "notas": st.column_config.TextColumn("Observações", required=False),
         },
         num_rows="fixed",
-        key="debts_editor",
+        key=f"debts_editor_{cursor or 0}",
     )
+    render_pager(page_key, next_cursor)
 
     selected_ids = (
         edited.index[edited["sel"] == True].astype(int).tolist()
@@ -459,76 +444,43 @@ def render(user=None):
         btn_save, btn_delete = st.columns(2)
     with btn_save:
         if st.button("Salvar alterações", type="primary", key="save_debts", width='stretch'):
+            diff = diff_frames(df, edited, _DEBT_COLUMNS)
+            debt_by_id = {d.get_id(): d for d in debts}
+            changed_debts = []
+            for debt_id, patch in diff.patches.items():
+                try:
+                    debt = debt_by_id[debt_id]
+                    if "origem" in patch:
+                        debt.set_origin_id(int(patch["origem"]))
+                    if "categoria" in patch:
+                        debt.set_category_id(_str_to_opt(patch["categoria"]))
+                    if "responsavel" in patch:
+                        debt.set_responsible_id(_str_to_opt(patch["responsavel"]))
+                    if "descricao" in patch:
+                        debt.set_description(patch["descricao"] or None)
+                    if patch.get("data") is not None:
+                        debt.set_debt_date(patch["data"])
+                    if "valor_total" in patch:
+                        debt.set_total_amount_cents(patch["valor_total"])
+                    if "parcelas" in patch:
+                        debt.set_installments(patch["parcelas"])
+                    if "pago" in patch:
+                        debt.set_paid(patch["pago"])
+                    if "notas" in patch:
+                        debt.set_notes(patch["notas"] or None)
+                    changed_debts.append(debt)
+                except Exception as e:
+                    st.error(f"Erro ao atualizar id={debt_id}: {e}")
             altered = 0
-            base = df.reset_index()[
-                [
-                    "id",
-                    "origem",
-                    "categoria",
-                    "responsavel",
-                    "descricao",
-                    "data",
-                    "valor_total",
-                    "parcelas",
-                    "pago",
-                    "notas",
-                ]
-            ]
-            curr = edited.reset_index()[
-                [
-                    "id",
-                    "origem",
-                    "categoria",
-                    "responsavel",
-                    "descricao",
-                    "data",
-                    "valor_total",
-                    "parcelas",
-                    "pago",
-                    "notas",
-                ]
-            ]
-            base = base.fillna({"descricao": "", "notas": "", "valor_total": 0.0, "parcelas": 1})
-            curr = curr.fillna({"descricao": "", "notas": "", "valor_total": 0.0, "parcelas": 1})
-
-            for _, row in curr.iterrows():
-                orig = base.loc[base["id"] == row["id"]].iloc[0]
-                changed = (
-                    str(orig["origem"]) != str(row["origem"]) or
-                    str(orig["categoria"]) != str(row["categoria"]) or
-                    str(orig["responsavel"]) != str(row["responsavel"]) or
-                    str(orig["descricao"]).strip() != str(row["descricao"]).strip() or
-                    float(orig["valor_total"]) != float(row["valor_total"]) or
-                    int(orig["parcelas"]) != int(row["parcelas"]) or
-                    bool(orig["pago"]) != bool(row["pago"]) or
-                    (orig["data"] != row["data"]) or
-                    str(orig["notas"]).strip() != str(row["notas"]).strip()
-                )
-                if changed:
-                    try:
-                        debt = next(x for x in debts if x.get_id() == int(row["id"]))
-                        debt.set_origin_id(int(row["origem"]))
-                        debt.set_category_id(_str_to_opt(row["categoria"]))
-                        debt.set_responsible_id(_str_to_opt(row["responsavel"]))
-                        debt.set_description((str(row["descricao"]).strip() or None))
-                        debt_date = row["data"]
-                        if isinstance(debt_date, pd.Timestamp):
-                            debt_date = debt_date.date()
-                        debt.set_debt_date(debt_date)
-                        debt.set_total_amount(float(row["valor_total"]))
-                        debt.set_installments(int(row["parcelas"]))
-                        debt.set_paid(bool(row["pago"]))
-                        debt.set_notes((str(row["notas"]).strip() or None))
-                        debt = DebtRepository.update(debt)
-                        _sync_debt_installments(
-                            debt,
-                            float(row["valor_total"]),
-                            debt_date,
-                            int(row["parcelas"]),
-                        )
-                        altered += 1
-                    except Exception as e:
-                        st.error(f"Erro ao atualizar id={row['id']}: {e}")
+            if changed_debts:
+                result = DebtRepository.bulk_update(changed_debts)
+                for idx, msg in result.errors.items():
+                    st.error(f"Erro ao atualizar id={changed_debts[idx].get_id()}: {msg}")
+                for debt in result.results:
+                    if debt is None:
+                        continue
+                    _sync_debt_installments(debt)
+                altered = result.ok_count
             if altered:
                 st.toast(f"{altered} alteração(ões) salva(s)", icon="✅")
                 _do_rerun()
@@ -615,22 +567,23 @@ def render(user=None):
             )
 
             if st.button("Salvar parcelas", key=f"save_installments_{selected_debt_view}"):
-                base_inst = df_inst.reset_index()[["id", "pago"]]
-                curr_inst = edited_inst.reset_index()[["id", "pago"]]
+                diff = diff_frames(df_inst, edited_inst, {"pago": "bool"})
+                inst_by_id = {inst.get_id(): inst for inst in installments_list}
+                now = datetime.now(timezone.utc)
+                changed_insts = []
+                for inst_id, patch in diff.patches.items():
+                    inst_obj = inst_by_id.get(inst_id)
+                    if not inst_obj:
+                        continue
+                    inst_obj.set_paid(patch["pago"])
+                    inst_obj.set_paid_at(now if patch["pago"] else None)
+                    changed_insts.append(inst_obj)
                 updates = 0
-                for _, row in curr_inst.iterrows():
-                    orig = base_inst.loc[base_inst["id"] == row["id"]].iloc[0]
-                    if bool(orig["pago"]) != bool(row["pago"]):
-                        inst_obj = DebtInstallmentRepository.get_by_id(int(row["id"]))
-                        if not inst_obj:
-                            continue
-                        inst_obj.set_paid(bool(row["pago"]))
-                        inst_obj.set_paid_at(datetime.now(timezone.utc) if bool(row["pago"]) else None)
-                        try:
-                            DebtInstallmentRepository.update(inst_obj)
-                            updates += 1
-                        except Exception as e:
-                            st.error(f"Erro ao atualizar parcela {row['id']}: {e}")
+                if changed_insts:
+                    result = DebtInstallmentRepository.bulk_update(changed_insts)
+                    for idx, msg in result.errors.items():
+                        st.error(f"Erro ao atualizar parcela {changed_insts[idx].get_id()}: {msg}")
+                    updates = result.ok_count
                 if updates:
                     all_paid_flag = bool(edited_inst["pago"].all())
                     debt_obj = next((d for d in debts if d.get_id() == selected_debt_view), None)
@@ -643,7 +596,7 @@ def render(user=None):
                     st.toast(f"{updates} parcela(s) atualizada(s)", icon="✅")
                     _do_rerun()
 
-            total_valor = df_inst["valor"].sum()
+            total_valor = from_cents(series_to_cents(df_inst["valor"]).sum())
             st.markdown(f"**Total parcelado:** R$ {total_valor:,.2f}")
         else:
             st.info("Nenhuma parcela encontrada para este débito.")
@@ -668,13 +621,10 @@ def render(user=None):
                         _do_rerun()
                 with col_b:
                     if st.button("Excluir", type="primary", width='stretch'):
-                        removed = 0
-                        for did in ids:
-                            try:
-                                DebtRepository.delete(int(did))
-                                removed += 1
-                            except Exception as e:
-                                st.error(f"Erro ao remover id={did}: {e}")
+                        result = DebtRepository.bulk_delete([int(did) for did in ids])
+                        for idx, msg in result.errors.items():
+                            st.error(f"Erro ao remover id={ids[idx]}: {msg}")
+                        removed = result.ok_count
                         st.session_state[confirm_key] = []
                         st.toast(f"{removed} débito(s) removido(s)", icon="✅")
                         _do_rerun()
@@ -689,16 +639,13 @@ def render(user=None):
                 st.session_state[confirm_key] = []
                 _do_rerun()
             if col_b.button("Excluir", type="primary"):
-                removed = 0
-                for did in ids:
-                    try:
-                        DebtRepository.delete(int(did))
-                        removed += 1
-                    except Exception as e:
-                        st.error(f"Erro ao remover id={did}: {e}")
+                result = DebtRepository.bulk_delete([int(did) for did in ids])
+                for idx, msg in result.errors.items():
+                    st.error(f"Erro ao remover id={ids[idx]}: {msg}")
+                removed = result.ok_count
                 st.session_state[confirm_key] = []
                 st.toast(f"{removed} débito(s) removido(s)", icon="✅")
                 _do_rerun()
 
 
-render()
+run_page(render, "debitos")
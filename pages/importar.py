@@ -0,0 +1,84 @@
+from __future__ import annotations
+import streamlit as st
+
+from core.session import current_user
+from ui.nav import render_sidebar
+from ui.debug import run_page
+
+from repository.categories import CategoryRepository
+from services.importers import StatementImporter
+
+
+_ENCODINGS = {"Automática": None, "UTF-8": "utf-8-sig", "Windows-1252 (Latin-1)": "cp1252"}
+
+
+def render(user=None):
+    user = user or current_user()
+    if not user:
+        if hasattr(st, "switch_page"):
+            st.switch_page("pages/login.py")
+        else:
+            st.stop()
+
+    render_sidebar(user)
+    st.title("Importar extrato")
+    st.caption(
+        "CSV (colunas de data, descrição e valor) ou OFX do seu banco. Lançamentos "
+        "iguais a transações já cadastradas (mesmo dia, tipo, valor e descrição) são ignorados."
+    )
+
+    categories = CategoryRepository.list_by_user(user.get_id(), limit=1000)
+    cat_options = {"Sem categoria": None, **{c.get_name(): c.get_id() for c in categories}}
+
+    with st.form("import_form", border=True):
+        uploaded = st.file_uploader("Arquivo do extrato", type=["csv", "txt", "ofx", "qfx"], accept_multiple_files=False)
+        c1, c2 = st.columns(2)
+        with c1:
+            cat_label = st.selectbox("Categoria dos lançamentos", list(cat_options.keys()))
+        with c2:
+            enc_label = st.selectbox("Codificação", list(_ENCODINGS.keys()))
+        submitted = st.form_submit_button("Importar", type="primary")
+
+    if not submitted:
+        return
+    if uploaded is None:
+        st.info("Nenhum arquivo selecionado.")
+        return
+
+    status = st.empty()
+
+    def _progress(partial) -> None:
+        status.info(f"{partial.read} lançamento(s) lidos, {partial.imported} importado(s)…")
+
+    try:
+        result = StatementImporter.run(
+            user.get_id(),
+            uploaded,
+            category_id=cat_options[cat_label],
+            encoding=_ENCODINGS[enc_label],
+            progress=_progress,
+        )
+    except Exception as e:
+        status.empty()
+        st.error(f"Falha na importação: {e}")
+        return
+
+    status.empty()
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Importados", result.imported)
+    m2.metric("Duplicados ignorados", result.duplicates)
+    m3.metric("Com erro", result.failed)
+    if result.imported:
+        st.toast(f"{result.imported} transação(ões) importada(s)!", icon="✅")
+    if result.errors:
+        with st.expander(f"Linhas com erro ({result.failed})"):
+            st.dataframe(
+                [{"linha": line, "erro": msg} for line, msg in result.errors],
+                hide_index=True,
+                width="stretch",
+            )
+            if result.failed > len(result.errors):
+                st.caption(f"Mostrando as primeiras {len(result.errors)}.")
+
+
+run_page(render, "importar")
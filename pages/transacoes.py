@@ -5,6 +5,9 @@ from datetime import date, datetime, time, timezone
 
 from core.session import current_user
 from ui.nav import render_sidebar
+from ui.debug import run_page
+from ui.pagination import PAGE_SIZE, current_cursor, render_pager
+from ui.table_diff import diff_frames
 
 from services.transactions import Transaction
 from repository.transactions import TransactionRepository
@@ -16,6 +19,54 @@ def _do_rerun() -> None:
         fn()
 
 
+def _bulk_update(txs) -> int:
+    if not txs:
+        return 0
+    res = TransactionRepository.bulk_update(txs)
+    for i, msg in res.errors.items():
+        st.error(f"Erro ao atualizar id={txs[i].get_id()}: {msg}")
+    return res.ok_count
+
+
+def _bulk_delete(ids) -> int:
+    res = TransactionRepository.bulk_delete([int(tid) for tid in ids])
+    for i, msg in res.errors.items():
+        st.error(f"Erro ao remover id={ids[i]}: {msg}")
+    return res.ok_count
+
+
+# Colunas editáveis de cada tabela e como compará-las (ver ui/table_diff.py)
+_FIXED_COLUMNS = {"tipo": "text", "descricao": "text", "valor": "money", "periodicidade": "text"}
+_ONE_OFF_COLUMNS = {"tipo": "text", "descricao": "text", "valor": "money", "data": "date"}
+
+
+def _patch_common(tx: Transaction, patch: dict) -> None:
+    """Aplica na transação os campos comuns às duas tabelas que mudaram."""
+    if "tipo" in patch:
+        tx.set_type("income" if patch["tipo"] == "Entrada" else "expense")
+    if "descricao" in patch:
+        tx.set_description(patch["descricao"] or None)
+    if "valor" in patch:
+        tx.set_amount_cents(patch["valor"])
+
+
+def _load_section(user_id: int, fixed: bool, page_key: str, search_key: str):
+    """Caixa de busca + página atual da seção. Com texto na busca, lista os
+    resultados do índice textual (por relevância); sem texto, a listagem normal.
+    """
+    query = st.text_input(
+        "Buscar", key=search_key, placeholder="Descrição ou notas", label_visibility="collapsed"
+    ).strip()
+    cursor = current_cursor(page_key, query)
+    if query:
+        txs, next_cursor = TransactionRepository.search(user_id, query, PAGE_SIZE, cursor, fixed=fixed)
+    else:
+        txs, next_cursor = TransactionRepository.list_page_by_filters(
+            user_id, fixed=fixed, limit=PAGE_SIZE, cursor=cursor
+        )
+    return query, cursor, txs, next_cursor
+
+
 def _df_from_fixed(txs):
     data = []
     for t in txs:
@@ -27,6 +78,7 @@ def _df_from_fixed(txs):
                 "descricao": t.get_description() or "",
                 "valor": float(t.get_amount() or 0.0),
                 "periodicidade": t.get_periodicity() or "none",
+                "proxima": t.get_next_execution(),
             }
         )
     return pd.DataFrame(data)
@@ -64,13 +116,15 @@ def render(user=None):
     # ============================== Seções de listagem/edição =============================
     def _section_fixed_unified():
         st.subheader("Transações fixas")
-        txs = TransactionRepository.list_by_filters(user.get_id(), fixed=True, limit=1000)
+        page_key = "fixed_page_cursors"
+        query, cursor, txs, next_cursor = _load_section(user.get_id(), True, page_key, "fixed_search")
         if not txs:
-            st.info("Nenhuma transação fixa cadastrada.")
+            st.info("Nenhuma transação encontrada para a busca." if query else "Nenhuma transação fixa cadastrada.")
+            render_pager(page_key, None)
             return
 
         df = _df_from_fixed(txs)
-        df = df.set_index("id", drop=True)[["sel", "tipo", "descricao", "valor", "periodicidade"]]
+        df = df.set_index("id", drop=True)[["sel", "tipo", "descricao", "valor", "periodicidade", "proxima"]]
         st.caption("Edite os campos e salve. Marque Selecionar para excluir em lote.")
 
         edited = st.data_editor(
@@ -85,10 +139,12 @@ def render(user=None):
                 "periodicidade": st.column_config.SelectboxColumn(
                     "Periodicidade", options=["monthly", "weekly", "yearly"], default="monthly"
                 ),
+                "proxima": st.column_config.DateColumn("Próxima execução", disabled=True),
             },
             num_rows="fixed",
-            key="fixed_all_editor",
+            key=f"fixed_all_editor_{cursor or 0}",
         )
+        render_pager(page_key, next_cursor)
 
         selected_ids = (
             edited.index[edited["sel"] == True].astype(int).tolist()
@@ -97,7 +153,7 @@ def render(user=None):
 
         if selected_ids:
             name_map = {t.get_id(): (t.get_description() or "(sem descrição)") for t in txs}
-            preview = ", ".join(name_map.get(tid, str(tid)) for t in selected_ids)
+            preview = ", ".join(name_map.get(tid, str(tid)) for tid in selected_ids)
             st.caption(f"Selecionados ({len(selected_ids)}): {preview}")
 
         sp_l, center, sp_r = st.columns([1, 4, 1])
@@ -105,30 +161,17 @@ def render(user=None):
             c1, c2 = st.columns(2)
         with c1:
             if st.button("Salvar alterações", type="primary", key="save_fixed_all", width='stretch'):
-                altered = 0
-                base = df.reset_index()[["id", "tipo", "descricao", "valor", "periodicidade"]]
-                curr = edited.reset_index()[["id", "tipo", "descricao", "valor", "periodicidade"]]
-                base = base.fillna({"descricao": "", "valor": 0.0, "periodicidade": "monthly"})
-                curr = curr.fillna({"descricao": "", "valor": 0.0, "periodicidade": "monthly"})
-                for _, row in curr.iterrows():
-                    orig = base.loc[base["id"] == row["id"]].iloc[0]
-                    changed = (
-                        str(orig["tipo"]) != str(row["tipo"]) or
-                        str(orig["descricao"]).strip() != str(row["descricao"]).strip()
-                        or float(orig["valor"]) != float(row["valor"]) or
-                        str(orig["periodicidade"]) != str(row["periodicidade"]) 
-                    )
-                    if changed:
-                        try:
-                            tx = next(x for x in txs if x.get_id() == int(row["id"]))
-                            tx.set_type("income" if str(row["tipo"]) == "Entrada" else "expense")
-                            tx.set_description((str(row["descricao"]).strip() or None))
-                            tx.set_amount(float(row["valor"]))
-                            tx.set_periodicity(str(row["periodicidade"]))
-                            TransactionRepository.update(tx)
-                            altered += 1
-                        except Exception as e:
-                            st.error(f"Erro ao atualizar id={row['id']}: {e}")
+                diff = diff_frames(df, edited, _FIXED_COLUMNS)
+                tx_by_id = {t.get_id(): t for t in txs}
+                changed_txs = []
+                for tid, patch in diff.patches.items():
+                    tx = tx_by_id[tid]
+                    _patch_common(tx, patch)
+                    if "periodicidade" in patch:
+                        tx.set_periodicity(patch["periodicidade"] or "monthly")
+                    # next_execution não é editado na tabela
+                    changed_txs.append(tx)
+                altered = _bulk_update(changed_txs)
                 if altered:
                     st.toast(f"{altered} alteração(ões) salva(s)", icon="✅")
                     _do_rerun()
@@ -160,13 +203,7 @@ def render(user=None):
                             _do_rerun()
                     with b2:
                         if st.button("Excluir", type="primary", width='stretch'):
-                            removed = 0
-                            for tid in ids:
-                                try:
-                                    TransactionRepository.delete(int(tid))
-                                    removed += 1
-                                except Exception as e:
-                                    st.error(f"Erro ao remover id={tid}: {e}")
+                            removed = _bulk_delete(ids)
                             st.session_state[confirm_key] = []
                             st.toast(f"{removed} transação(ões) removida(s)", icon="✅")
                             _do_rerun()
@@ -181,22 +218,19 @@ def render(user=None):
                     st.session_state[confirm_key] = []
                     _do_rerun()
                 if b2.button("Excluir", type="primary"):
-                    removed = 0
-                    for tid in ids:
-                        try:
-                            TransactionRepository.delete(int(tid))
-                            removed += 1
-                        except Exception as e:
-                            st.error(f"Erro ao remover id={tid}: {e}")
+                    removed = _bulk_delete(ids)
                     st.session_state[confirm_key] = []
                     st.toast(f"{removed} transação(ões) removida(s)", icon="✅")
                     _do_rerun()
 
+    # ============================== Visualização/edição (avulsas) =============================
     def _section_one_off_unified():
         st.subheader("Transações avulsas")
-        txs = TransactionRepository.list_by_filters(user.get_id(), fixed=False, limit=1000)
+        page_key = "oneoff_page_cursors"
+        query, cursor, txs, next_cursor = _load_section(user.get_id(), False, page_key, "oneoff_search")
         if not txs:
-            st.info("Nenhuma transação avulsa cadastrada.")
+            st.info("Nenhuma transação encontrada para a busca." if query else "Nenhuma transação avulsa cadastrada.")
+            render_pager(page_key, None)
             return
 
         df = _df_from_one_off(txs)
@@ -215,8 +249,9 @@ def render(user=None):
                 "data": st.column_config.DateColumn("Data"),
             },
             num_rows="fixed",
-            key="oneoff_all_editor",
+            key=f"oneoff_all_editor_{cursor or 0}",
         )
+        render_pager(page_key, next_cursor)
 
         selected_ids = (
             edited.index[edited["sel"] == True].astype(int).tolist()
@@ -225,7 +260,7 @@ def render(user=None):
 
         if selected_ids:
             name_map = {t.get_id(): (t.get_description() or "(sem descrição)") for t in txs}
-            preview = ", ".join(name_map.get(tid, str(tid)) for t in selected_ids)
+            preview = ", ".join(name_map.get(tid, str(tid)) for tid in selected_ids)
             st.caption(f"Selecionados ({len(selected_ids)}): {preview}")
 
         sp_l, center, sp_r = st.columns([1, 4, 1])
@@ -233,34 +268,17 @@ def render(user=None):
             c1, c2 = st.columns(2)
         with c1:
             if st.button("Salvar alterações", type="primary", key="save_oneoff_all", width='stretch'):
-                altered = 0
-                base = df.reset_index()[["id", "tipo", "descricao", "valor", "data"]]
-                curr = edited.reset_index()[["id", "tipo", "descricao", "valor", "data"]]
-                base = base.fillna({"descricao": "", "valor": 0.0})
-                curr = curr.fillna({"descricao": "", "valor": 0.0})
-                for _, row in curr.iterrows():
-                    orig = base.loc[base["id"] == row["id"]].iloc[0]
-                    changed = (
-                        str(orig["tipo"]) != str(row["tipo"]) or
-                        str(orig["descricao"]).strip() != str(row["descricao"]).strip() or
-                        float(orig["valor"]) != float(row["valor"]) or
-                        (orig["data"] != row["data"]) 
-                    )
-                    if changed:
-                        try:
-                            tx = next(x for x in txs if x.get_id() == int(row["id"]))
-                            tx.set_type("income" if str(row["tipo"]) == "Entrada" else "expense")
-                            tx.set_description((str(row["descricao"]).strip() or None))
-                            tx.set_amount(float(row["valor"]))
-                            # Converter date -> datetime na virada do dia (UTC)
-                            rd = row["data"]
-                            if isinstance(rd, date):
-                                occ_dt = datetime.combine(rd, time(0, 0, 0, tzinfo=timezone.utc))
-                                tx.set_occurred_at(occ_dt)
-                            TransactionRepository.update(tx)
-                            altered += 1
-                        except Exception as e:
-                            st.error(f"Erro ao atualizar id={row['id']}: {e}")
+                diff = diff_frames(df, edited, _ONE_OFF_COLUMNS)
+                tx_by_id = {t.get_id(): t for t in txs}
+                changed_txs = []
+                for tid, patch in diff.patches.items():
+                    tx = tx_by_id[tid]
+                    _patch_common(tx, patch)
+                    if patch.get("data") is not None:
+                        # Converter date -> datetime na virada do dia (UTC)
+                        tx.set_occurred_at(datetime.combine(patch["data"], time(0, 0, 0, tzinfo=timezone.utc)))
+                    changed_txs.append(tx)
+                altered = _bulk_update(changed_txs)
                 if altered:
                     st.toast(f"{altered} alteração(ões) salva(s)", icon="✅")
                     _do_rerun()
@@ -292,13 +310,7 @@ def render(user=None):
                             _do_rerun()
                     with b2:
                         if st.button("Excluir", type="primary", width='stretch'):
-                            removed = 0
-                            for tid in ids:
-                                try:
-                                    TransactionRepository.delete(int(tid))
-                                    removed += 1
-                                except Exception as e:
-                                    st.error(f"Erro ao remover id={tid}: {e}")
+                            removed = _bulk_delete(ids)
                             st.session_state[confirm_key] = []
                             st.toast(f"{removed} transação(ões) removida(s)", icon="✅")
                             _do_rerun()
@@ -313,13 +325,7 @@ def render(user=None):
                     st.session_state[confirm_key] = []
                     _do_rerun()
                 if b2.button("Excluir", type="primary"):
-                    removed = 0
-                    for tid in ids:
-                        try:
-                            TransactionRepository.delete(int(tid))
-                            removed += 1
-                        except Exception as e:
-                            st.error(f"Erro ao remover id={tid}: {e}")
+                    removed = _bulk_delete(ids)
                     st.session_state[confirm_key] = []
                     st.toast(f"{removed} transação(ões) removida(s)", icon="✅")
                     _do_rerun()
@@ -334,6 +340,7 @@ def render(user=None):
         with c1:
             tipo_label = st.selectbox("Tipo", options=["Entrada", "Saída"], index=0)
             periodicidade = st.selectbox("Periodicidade", options=["monthly", "weekly", "yearly"], index=0)
+            inicio = st.date_input("Primeira ocorrência", value=date.today(), key="fixed_inicio")
         with c2:
             descricao = st.text_input("Descrição", placeholder="Ex.: Salário, Aluguel")
             valor = st.number_input("Valor (R$)", min_value=0.00, step=0.01, format="%.2f")
@@ -348,6 +355,8 @@ def render(user=None):
                 cat_id = None
 
                 tipo = "income" if tipo_label == "Entrada" else "expense"
+                # occurred_at guarda o dia de referência da recorrência;
+                # next_execution é avançado pelo scripts/run_recurrence.py
                 model = Transaction(
                     user_id=user.get_id(),
                     category_id=cat_id,
@@ -355,6 +364,8 @@ def render(user=None):
                     type=tipo,
                     fixed=True,
                     periodicity=periodicidade,
+                    next_execution=inicio,
+                    occurred_at=datetime.combine(inicio, time(0, 0, 0, tzinfo=timezone.utc)),
                     description=(descricao or "").strip() or None,
                 )
                 TransactionRepository.create(model)
@@ -405,276 +416,5 @@ def render(user=None):
     # Renderiza tabela de avulsas logo abaixo do cadastro
     _section_one_off_unified()
 
-    # ============================== Visualização/edição (unificada) =============================
-    def _section_fixed_unified():
-        st.subheader("Transações fixas")
-        txs = TransactionRepository.list_by_filters(user.get_id(), fixed=True, limit=1000)
-        if not txs:
-            st.info("Nenhuma transação fixa cadastrada.")
-            return
-
-        df = _df_from_fixed(txs)
-        df = df.set_index("id", drop=True)[["sel", "tipo", "descricao", "valor", "periodicidade"]]
-        st.caption("Edite os campos e salve. Marque Selecionar para excluir em lote.")
-
-        edited = st.data_editor(
-            df,
-            hide_index=True,
-            width='stretch',
-            column_config={
-                "sel": st.column_config.CheckboxColumn("Selecionar", width="small"),
-                "tipo": st.column_config.SelectboxColumn("Tipo", options=["Entrada", "Saída"], default="Entrada"),
-                "descricao": st.column_config.TextColumn("Descrição", required=False),
-                "valor": st.column_config.NumberColumn("Valor", min_value=0.01, step=0.01, format="R$ %.2f"),
-                "periodicidade": st.column_config.SelectboxColumn(
-                    "Periodicidade", options=["monthly", "weekly", "yearly"], default="monthly"
-                ),
-            },
-            num_rows="fixed",
-            key="fixed_all_editor",
-        )
-
-        selected_ids = (
-            edited.index[edited["sel"] == True].astype(int).tolist()
-            if not edited.empty else []
-        )
-
-        if selected_ids:
-            name_map = {t.get_id(): (t.get_description() or "(sem descrição)") for t in txs}
-            preview = ", ".join(name_map.get(tid, str(tid)) for tid in selected_ids)
-            st.caption(f"Selecionados ({len(selected_ids)}): {preview}")
-
-        sp_l, center, sp_r = st.columns([1, 4, 1])
-        with center:
-            c1, c2 = st.columns(2)
-        with c1:
-            if st.button("Salvar alterações", type="primary", key="save_fixed_all", width='stretch'):
-                altered = 0
-                base = df.reset_index()[["id", "tipo", "descricao", "valor", "periodicidade"]]
-                curr = edited.reset_index()[["id", "tipo", "descricao", "valor", "periodicidade"]]
-                base = base.fillna({"descricao": "", "valor": 0.0, "periodicidade": "monthly"})
-                curr = curr.fillna({"descricao": "", "valor": 0.0, "periodicidade": "monthly"})
-                for _, row in curr.iterrows():
-                    orig = base.loc[base["id"] == row["id"]].iloc[0]
-                    changed = (
-                        str(orig["tipo"]) != str(row["tipo"]) or
-                        str(orig["descricao"]).strip() != str(row["descricao"]).strip()
-                        or float(orig["valor"]) != float(row["valor"])
-                        or str(orig["periodicidade"]) != str(row["periodicidade"]) 
-                    )
-                    if changed:
-                        try:
-                            tx = next(x for x in txs if x.get_id() == int(row["id"]))
-                            # Tipo
-                            tx.set_type("income" if str(row["tipo"]) == "Entrada" else "expense")
-                            tx.set_description((str(row["descricao"]).strip() or None))
-                            tx.set_amount(float(row["valor"]))
-                            tx.set_periodicity(str(row["periodicidade"]))
-                            # next_execution não é editado na tabela
-                            TransactionRepository.update(tx)
-                            altered += 1
-                        except Exception as e:
-                            st.error(f"Erro ao atualizar id={row['id']}: {e}")
-                if altered:
-                    st.toast(f"{altered} alteração(ões) salva(s)", icon="✅")
-                    _do_rerun()
-        with c2:
-            if st.button(
-                f"Excluir selecionados ({len(selected_ids)})",
-                disabled=len(selected_ids) == 0,
-                key="del_fixed_all",
-                width='stretch',
-            ):
-                st.session_state["confirm_delete_fixed_all_ids"] = selected_ids
-                _do_rerun()
-
-        confirm_key = "confirm_delete_fixed_all_ids"
-        if st.session_state.get(confirm_key):
-            ids = list(st.session_state.get(confirm_key, []))
-            dialog = getattr(st, "dialog", None)
-            if callable(dialog):
-                @dialog("Confirmar exclusão")
-                def _confirm_delete_dialog():
-                    st.write("Confirma a exclusão das transações selecionadas?")
-                    if ids:
-                        name_map = {t.get_id(): (t.get_description() or "(sem descrição)") for t in txs}
-                        st.markdown("\n".join(f"- {name_map.get(i, str(i))}" for i in ids))
-                    b1, b2 = st.columns(2)
-                    with b1:
-                        if st.button("Cancelar", width='stretch'):
-                            st.session_state[confirm_key] = []
-                            _do_rerun()
-                    with b2:
-                        if st.button("Excluir", type="primary", width='stretch'):
-                            removed = 0
-                            for tid in ids:
-                                try:
-                                    TransactionRepository.delete(int(tid))
-                                    removed += 1
-                                except Exception as e:
-                                    st.error(f"Erro ao remover id={tid}: {e}")
-                            st.session_state[confirm_key] = []
-                            st.toast(f"{removed} transação(ões) removida(s)", icon="✅")
-                            _do_rerun()
-                _confirm_delete_dialog()
-            else:
-                st.warning("Confirma a exclusão das transações selecionadas?")
-                if ids:
-                    name_map = {t.get_id(): (t.get_description() or "(sem descrição)") for t in txs}
-                    st.markdown("\n".join(f"- {name_map.get(i, str(i))}" for i in ids))
-                b1, b2 = st.columns(2)
-                if b1.button("Cancelar"):
-                    st.session_state[confirm_key] = []
-                    _do_rerun()
-                if b2.button("Excluir", type="primary"):
-                    removed = 0
-                    for tid in ids:
-                        try:
-                            TransactionRepository.delete(int(tid))
-                            removed += 1
-                        except Exception as e:
-                            st.error(f"Erro ao remover id={tid}: {e}")
-                    st.session_state[confirm_key] = []
-                    st.toast(f"{removed} transação(ões) removida(s)", icon="✅")
-                    _do_rerun()
-
-    # (movido) tabela de fixas é renderizada abaixo do cadastro
-    # st.divider()
-
-    # ============================== Visualização/edição (avulsas) =============================
-    def _section_one_off_unified():
-        st.subheader("Transações avulsas")
-        txs = TransactionRepository.list_by_filters(user.get_id(), fixed=False, limit=1000)
-        if not txs:
-            st.info("Nenhuma transação avulsa cadastrada.")
-            return
-
-        df = _df_from_one_off(txs)
-        df = df.set_index("id", drop=True)[["sel", "tipo", "descricao", "valor", "data"]]
-        st.caption("Edite os campos e salve. Marque Selecionar para excluir em lote.")
-
-        edited = st.data_editor(
-            df,
-            hide_index=True,
-            width='stretch',
-            column_config={
-                "sel": st.column_config.CheckboxColumn("Selecionar", width="small"),
-                "tipo": st.column_config.SelectboxColumn("Tipo", options=["Entrada", "Saída"], default="Entrada"),
-                "descricao": st.column_config.TextColumn("Descrição", required=False),
-                "valor": st.column_config.NumberColumn("Valor", min_value=0.01, step=0.01, format="R$ %.2f"),
-                "data": st.column_config.DateColumn("Data"),
-            },
-            num_rows="fixed",
-            key="oneoff_all_editor",
-        )
-
-        selected_ids = (
-            edited.index[edited["sel"] == True].astype(int).tolist()
-            if not edited.empty else []
-        )
-
-        if selected_ids:
-            name_map = {t.get_id(): (t.get_description() or "(sem descrição)") for t in txs}
-            preview = ", ".join(name_map.get(tid, str(tid)) for tid in selected_ids)
-            st.caption(f"Selecionados ({len(selected_ids)}): {preview}")
-
-        sp_l, center, sp_r = st.columns([1, 4, 1])
-        with center:
-            c1, c2 = st.columns(2)
-        with c1:
-            if st.button("Salvar alterações", type="primary", key="save_oneoff_all", width='stretch'):
-                altered = 0
-                base = df.reset_index()[["id", "tipo", "descricao", "valor", "data"]]
-                curr = edited.reset_index()[["id", "tipo", "descricao", "valor", "data"]]
-                base = base.fillna({"descricao": "", "valor": 0.0})
-                curr = curr.fillna({"descricao": "", "valor": 0.0})
-                for _, row in curr.iterrows():
-                    orig = base.loc[base["id"] == row["id"]].iloc[0]
-                    changed = (
-                        str(orig["tipo"]) != str(row["tipo"]) or
-                        str(orig["descricao"]).strip() != str(row["descricao"]).strip() or
-                        float(orig["valor"]) != float(row["valor"]) or
-                        (orig["data"] != row["data"]) 
-                    )
-                    if changed:
-                        try:
-                            tx = next(x for x in txs if x.get_id() == int(row["id"]))
-                            tx.set_type("income" if str(row["tipo"]) == "Entrada" else "expense")
-                            tx.set_description((str(row["descricao"]).strip() or None))
-                            tx.set_amount(float(row["valor"]))
-                            # Converter date -> datetime na virada do dia (UTC)
-                            rd = row["data"]
-                            if isinstance(rd, date):
-                                occ_dt = datetime.combine(rd, time(0, 0, 0, tzinfo=timezone.utc))
-                                tx.set_occurred_at(occ_dt)
-                            TransactionRepository.update(tx)
-                            altered += 1
-                        except Exception as e:
-                            st.error(f"Erro ao atualizar id={row['id']}: {e}")
-                if altered:
-                    st.toast(f"{altered} alteração(ões) salva(s)", icon="✅")
-                    _do_rerun()
-        with c2:
-            if st.button(
-                f"Excluir selecionados ({len(selected_ids)})",
-                disabled=len(selected_ids) == 0,
-                key="del_oneoff_all",
-                width='stretch',
-            ):
-                st.session_state["confirm_delete_oneoff_all_ids"] = selected_ids
-                _do_rerun()
-
-        confirm_key = "confirm_delete_oneoff_all_ids"
-        if st.session_state.get(confirm_key):
-            ids = list(st.session_state.get(confirm_key, []))
-            dialog = getattr(st, "dialog", None)
-            if callable(dialog):
-                @dialog("Confirmar exclusão")
-                def _confirm_delete_dialog():
-                    st.write("Confirma a exclusão das transações selecionadas?")
-                    if ids:
-                        name_map = {t.get_id(): (t.get_description() or "(sem descrição)") for t in txs}
-                        st.markdown("\n".join(f"- {name_map.get(i, str(i))}" for i in ids))
-                    b1, b2 = st.columns(2)
-                    with b1:
-                        if st.button("Cancelar", width='stretch'):
-                            st.session_state[confirm_key] = []
-                            _do_rerun()
-                    with b2:
-                        if st.button("Excluir", type="primary", width='stretch'):
-                            removed = 0
-                            for tid in ids:
-                                try:
-                                    TransactionRepository.delete(int(tid))
-                                    removed += 1
-                                except Exception as e:
-                                    st.error(f"Erro ao remover id={tid}: {e}")
-                            st.session_state[confirm_key] = []
-                            st.toast(f"{removed} transação(ões) removida(s)", icon="✅")
-                            _do_rerun()
-                _confirm_delete_dialog()
-            else:
-                st.warning("Confirma a exclusão das transações selecionadas?")
-                if ids:
-                    name_map = {t.get_id(): (t.get_description() or "(sem descrição)") for t in txs}
-                    st.markdown("\n".join(f"- {name_map.get(i, str(i))}" for i in ids))
-                b1, b2 = st.columns(2)
-                if b1.button("Cancelar"):
-                    st.session_state[confirm_key] = []
-                    _do_rerun()
-                if b2.button("Excluir", type="primary"):
-                    removed = 0
-                    for tid in ids:
-                        try:
-                            TransactionRepository.delete(int(tid))
-                            removed += 1
-                        except Exception as e:
-                            st.error(f"Erro ao remover id={tid}: {e}")
-                    st.session_state[confirm_key] = []
-                    st.toast(f"{removed} transação(ões) removida(s)", icon="✅")
-                    _do_rerun()
-
-    # (movido) tabela de avulsas é renderizada abaixo do cadastro
-
 
-render()
+run_page(render, "transacoes")
@@ -0,0 +1,161 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlmodel import Session, select
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+
+
+# Limite de parâmetros por IN (...) para ficar longe do teto do SQLite
+IN_CHUNK = 500
+
+
+@dataclass
+class BulkResult:
+    """Resultado por linha de uma operação em lote.
+    `results[i]` é o DTO salvo (ou o id removido) da i-ésima entrada, ou None
+    se ela falhou; `errors[i]` traz a mensagem de erro dessa entrada.
+    """
+    results: List[Any]
+    errors: Dict[int, str] = field(default_factory=dict)
+
+    @classmethod
+    def sized(cls, n: int) -> "BulkResult":
+        return cls(results=[None] * n)
+
+    @property
+    def ok_count(self) -> int:
+        return len(self.results) - len(self.errors)
+
+    def fail(self, index: int, message: str) -> None:
+        self.errors[index] = message
+        self.results[index] = None
+
+    def validate(self, items: Sequence[Any], check: Callable[[Any], None]) -> List[Tuple[int, Any]]:
+        """Roda `check` em cada item; os que lançarem ValueError viram erro da linha.
+        Retorna os pares (índice, item) válidos.
+        """
+        valid = []
+        for i, item in enumerate(items):
+            try:
+                check(item)
+            except ValueError as e:
+                self.fail(i, str(e))
+                continue
+            valid.append((i, item))
+        return valid
+
+
+def _chunks(values: List[int]) -> Iterable[List[int]]:
+    for i in range(0, len(values), IN_CHUNK):
+        yield values[i:i + IN_CHUNK]
+
+
+def existing_ids(s: Session, entity, ids: Iterable[Optional[int]]) -> Set[int]:
+    """Retorna quais ids existem em `entity` (um SELECT ... IN por bloco)."""
+    wanted = sorted({int(i) for i in ids if i is not None})
+    found: Set[int] = set()
+    for chunk in _chunks(wanted):
+        found.update(s.exec(select(entity.id).where(entity.id.in_(chunk))).all())
+    return found
+
+
+def load_by_ids(s: Session, entity, ids: Iterable[int]) -> Dict[int, Any]:
+    """Carrega as entidades pelos ids informados, indexadas por id."""
+    wanted = sorted({int(i) for i in ids})
+    out: Dict[int, Any] = {}
+    for chunk in _chunks(wanted):
+        for ent in s.exec(select(entity).where(entity.id.in_(chunk))).all():
+            out[ent.id] = ent
+    return out
+
+
+def flush_and_commit(
+    s: Session,
+    result: BulkResult,
+    pending: List[Tuple[int, Any]],
+    to_dto: Callable[[Any], Any],
+    error_message: str = "Dados inválidos ou violação de integridade",
+    before_commit: Optional[Callable[[], None]] = None,
+) -> None:
+    """Grava as entidades pendentes numa única transação.
+    O flush agrupa os INSERT/UPDATE em executemany; os DTOs são montados antes
+    do commit para não recarregar cada linha. `before_commit` roda após o flush,
+    dentro da mesma transação. Em caso de IntegrityError todo o lote é desfeito
+    e cada linha pendente recebe o erro.
+    """
+    if not pending:
+        return
+    try:
+        s.flush()
+        if before_commit:
+            before_commit()
+        dtos = [(i, to_dto(ent)) for i, ent in pending]
+        s.commit()
+    except IntegrityError:
+        s.rollback()
+        for i, _ent in pending:
+            result.fail(i, error_message)
+        return
+    for i, dto in dtos:
+        result.results[i] = dto
+
+
+def delete_by_ids(
+    s: Session,
+    entity,
+    ids: Sequence[int],
+    *,
+    not_found: str,
+    in_use: str,
+    before_delete: Optional[Callable[[Session, List[int]], None]] = None,
+) -> BulkResult:
+    """Remove os ids informados com um DELETE ... IN e um único commit.
+    Se alguma linha estiver em uso (violação de FK), o lote é desfeito e as
+    linhas são removidas uma a uma para apontar exatamente quais falharam.
+    `before_delete` permite remover dependentes (ex.: parcelas) no mesmo lote.
+    """
+    result = BulkResult.sized(len(ids))
+    positions: Dict[int, List[int]] = {}
+    for i, rid in enumerate(ids):
+        if rid is None or int(rid) <= 0:
+            result.fail(i, "ID inválido")
+            continue
+        positions.setdefault(int(rid), []).append(i)
+
+    found = existing_ids(s, entity, positions.keys())
+    for rid, idxs in positions.items():
+        if rid not in found:
+            for i in idxs:
+                result.fail(i, not_found)
+    targets = sorted(found)
+    if not targets:
+        return result
+
+    removed: List[int] = []
+    try:
+        for chunk in _chunks(targets):
+            if before_delete:
+                before_delete(s, chunk)
+            s.exec(delete(entity).where(entity.id.in_(chunk)))
+        s.commit()
+        removed = targets
+    except IntegrityError:
+        s.rollback()
+        for rid in targets:
+            try:
+                if before_delete:
+                    before_delete(s, [rid])
+                s.exec(delete(entity).where(entity.id == rid))
+                s.commit()
+                removed.append(rid)
+            except IntegrityError:
+                s.rollback()
+                for i in positions[rid]:
+                    result.fail(i, in_use)
+
+    for rid in removed:
+        for i in positions[rid]:
+            result.results[i] = rid
+    return result
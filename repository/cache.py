@@ -0,0 +1,116 @@
+from __future__ import annotations
+import copy
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+from sqlmodel import Session, select
+
+from repository.bulk import _chunks
+
+
+# Cache de leitura dos dados de referência (categorias, origens, responsáveis):
+# listas pequenas, lidas a cada rerun e quase nunca alteradas. A chave é
+# (entidade, user_id); o valor é a lista completa do usuário. Os repositórios
+# invalidam exatamente as chaves afetadas depois de cada escrita confirmada;
+# o TTL limita o quanto um processo pode ficar defasado de escritas feitas
+# por outro processo.
+#
+# Variáveis de ambiente: REF_CACHE_TTL (segundos, padrão 300; 0 desliga) e
+# REF_CACHE_SIZE (chaves, padrão 1024).
+
+Key = Tuple[str, int]
+
+
+class RefCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0, clock: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = int(maxsize)
+        self.ttl = float(ttl)
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        # geração de cada chave, incrementada a cada invalidação: um loader que
+        # começou antes de uma escrita não grava a lista antiga por cima
+        # (uma entrada por chave já invalidada; as chaves são poucas por usuário)
+        self._generations: Dict[Hashable, int] = {}
+        self._epoch = 0  # idem para clear()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Valor em cache para `key` ou, se ausente/expirado, o resultado de `loader()`."""
+        if self.ttl <= 0 or self.maxsize <= 0:
+            return loader()
+        now = self._clock()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                if item[0] > now:
+                    self._data.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return item[1]
+                del self._data[key]
+                self._stats["expired"] += 1
+            self._stats["misses"] += 1
+            generation = (self._epoch, self._generations.get(key, 0))
+        value = loader()
+        with self._lock:
+            if generation != (self._epoch, self._generations.get(key, 0)):
+                return value  # invalidada durante a carga: não guarda
+            self._data[key] = (now + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._stats["evictions"] += 1
+        return value
+
+    def invalidate(self, keys: Iterable[Hashable]) -> None:
+        with self._lock:
+            for key in keys:
+                self._generations[key] = self._generations.get(key, 0) + 1
+                if self._data.pop(key, None) is not None:
+                    self._stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._epoch += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            out = dict(self._stats)
+            out["size"] = len(self._data)
+        return out
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for k in self._stats:
+                self._stats[k] = 0
+
+
+reference_cache = RefCache(
+    maxsize=int(os.getenv("REF_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("REF_CACHE_TTL", "300")),
+)
+
+
+def cached_list(entity: str, user_id: int, loader: Callable[[], List[Any]], limit: int, offset: int) -> List[Any]:
+    """Fatia [offset:offset+limit] da lista completa do usuário, via cache.
+    Devolve cópias: as páginas alteram os DTOs (set_name) antes de salvar.
+    """
+    items = reference_cache.get_or_load((entity, int(user_id)), loader)
+    return [copy.copy(item) for item in items[int(offset): int(offset) + int(limit)]]
+
+
+def invalidate_users(entity: str, user_ids: Iterable[Optional[int]]) -> None:
+    reference_cache.invalidate({(entity, int(uid)) for uid in user_ids if uid is not None})
+
+
+def owner_ids(s: Session, model, ids: Iterable[int]) -> Set[int]:
+    """user_id das linhas informadas (para invalidar antes de um DELETE em lote)."""
+    wanted = sorted({int(i) for i in ids if i is not None and int(i) > 0})
+    owners: Set[int] = set()
+    for chunk in _chunks(wanted):
+        owners.update(s.exec(select(model.user_id).where(model.id.in_(chunk)).distinct()).all())
+    return owners
@@ -1,28 +1,50 @@
 from __future__ import annotations
-from typing import Optional, List, TYPE_CHECKING
+from typing import Dict, Optional, List, TYPE_CHECKING
 
 from sqlmodel import Session, select
 from sqlalchemy.exc import IntegrityError
 
 from db.session import engine
-from db.models import Category as CategoryEntity, User as UserEntity
+from db.models import Category as CategoryEntity
+from repository.bulk import BulkResult, delete_by_ids, flush_and_commit, load_by_ids
+from repository.refs import changed_refs, load_refs, ref_map, validate_refs
+from repository.cache import cached_list, invalidate_users, owner_ids
 
 if TYPE_CHECKING:
     from services.categories import Category
 
 
+# chave deste repositório no cache de referência (repository/cache.py)
+_CACHE_KEY = "category"
+
+
 class CategoryRepository:
     @staticmethod
-    def create(model: 'Category') -> 'Category':
+    def _refs(model: 'Category') -> Dict[str, Optional[int]]:
+        return ref_map(user=model.get_user_id())
+
+    @staticmethod
+    def _validate_fields(model: 'Category') -> None:
         if model.get_user_id() is None or int(model.get_user_id()) <= 0:
             raise ValueError("Usuário inválido")
-        name = (model.get_name() or "").strip()
-        if not name:
+        if not (model.get_name() or "").strip():
+            raise ValueError("Nome da categoria é obrigatório")
+
+    @staticmethod
+    def _validate_update(model: 'Category') -> None:
+        if model.get_id() is None:
+            raise ValueError("ID obrigatório para update")
+        if not (model.get_name() or "").strip():
             raise ValueError("Nome da categoria é obrigatório")
+        if model.get_user_id() is None or int(model.get_user_id()) <= 0:
+            raise ValueError("Usuário inválido")
+
+    @staticmethod
+    def create(model: 'Category') -> 'Category':
+        CategoryRepository._validate_fields(model)
 
         with Session(engine) as s:
-            if not s.get(UserEntity, model.get_user_id()):
-                raise ValueError("Usuário não encontrado")
+            validate_refs(s, model.get_user_id(), CategoryRepository._refs(model))
 
             ent = model.to_entity()
             s.add(ent)
@@ -32,6 +54,7 @@ class CategoryRepository:
                 s.rollback()
                 raise ValueError("Dados inválidos ou violação de integridade") from e
             s.refresh(ent)
+            invalidate_users(_CACHE_KEY, [ent.user_id])
 
             from services.categories import Category as CategoryDTO
             return CategoryDTO.from_entity(ent)
@@ -45,15 +68,13 @@ class CategoryRepository:
 
     @staticmethod
     def list_by_user(user_id: int, limit: int = 100, offset: int = 0) -> List['Category']:
+        return cached_list(_CACHE_KEY, user_id, lambda: CategoryRepository._load_all(user_id), limit, offset)
+
+    @staticmethod
+    def _load_all(user_id: int) -> List['Category']:
         from services.categories import Category as CategoryDTO
         with Session(engine) as s:
-            q = (
-                select(CategoryEntity)
-                .where(CategoryEntity.user_id == user_id)
-                .order_by(CategoryEntity.id)
-                .offset(offset)
-                .limit(limit)
-            )
+            q = select(CategoryEntity).where(CategoryEntity.user_id == user_id).order_by(CategoryEntity.id)
             return [CategoryDTO.from_entity(e) for e in s.exec(q).all()]
 
     @staticmethod
@@ -73,10 +94,11 @@ class CategoryRepository:
             if not ent:
                 raise ValueError("Categoria não encontrada")
 
-            if not s.get(UserEntity, model.get_user_id()):
-                raise ValueError("Usuário não encontrado")
+            refs = changed_refs(ref_map(user=ent.user_id), CategoryRepository._refs(model))
+            validate_refs(s, model.get_user_id(), refs)
 
             ent.name = new_name
+            old_user_id = ent.user_id
             ent.user_id = int(model.get_user_id())
 
             try:
@@ -87,6 +109,7 @@ class CategoryRepository:
                 raise ValueError("Dados inválidos ou violação de integridade") from e
 
             s.refresh(ent)
+            invalidate_users(_CACHE_KEY, [old_user_id, ent.user_id])
             return CategoryDTO.from_entity(ent)
 
     @staticmethod
@@ -100,6 +123,7 @@ class CategoryRepository:
             if not ent:
                 raise ValueError("Categoria não encontrada")
 
+            user_id = ent.user_id
             try:
                 s.delete(ent)
                 s.commit()
@@ -107,3 +131,71 @@ class CategoryRepository:
                 s.rollback()
                 # FK em uso (ex.: transactions, debts) impede remoção
                 raise ValueError("Categoria não pode ser removida pois está em uso") from e
+            invalidate_users(_CACHE_KEY, [user_id])
+
+    # ---------------- Operações em lote (uma sessão/commit por lote) ----------------
+
+    @staticmethod
+    def bulk_create(models: List['Category']) -> BulkResult:
+        from services.categories import Category as CategoryDTO
+        result = BulkResult.sized(len(models))
+        valid = result.validate(models, CategoryRepository._validate_fields)
+        with Session(engine) as s:
+            owners = load_refs(s, (CategoryRepository._refs(m) for _, m in valid))
+            pending = []
+            for i, model in valid:
+                try:
+                    owners.check(model.get_user_id(), CategoryRepository._refs(model))
+                except ValueError as e:
+                    result.fail(i, str(e))
+                    continue
+                ent = model.to_entity()
+                s.add(ent)
+                pending.append((i, ent))
+            flush_and_commit(s, result, pending, CategoryDTO.from_entity)
+        invalidate_users(_CACHE_KEY, (m.get_user_id() for _, m in valid))
+        return result
+
+    @staticmethod
+    def bulk_update(models: List['Category']) -> BulkResult:
+        from services.categories import Category as CategoryDTO
+        result = BulkResult.sized(len(models))
+        valid = result.validate(models, CategoryRepository._validate_update)
+        with Session(engine) as s:
+            ents = load_by_ids(s, CategoryEntity, (m.get_id() for _, m in valid))
+            old_users = {e.user_id for e in ents.values()}
+            to_check = {
+                i: changed_refs(ref_map(user=ents[int(m.get_id())].user_id), CategoryRepository._refs(m))
+                for i, m in valid if int(m.get_id()) in ents
+            }
+            owners = load_refs(s, to_check.values())
+            pending = []
+            for i, model in valid:
+                ent = ents.get(int(model.get_id()))
+                try:
+                    if ent is None:
+                        raise ValueError("Categoria não encontrada")
+                    owners.check(model.get_user_id(), to_check[i])
+                except ValueError as e:
+                    result.fail(i, str(e))
+                    continue
+                ent.user_id = int(model.get_user_id())
+                ent.name = (model.get_name() or "").strip()
+                pending.append((i, ent))
+            flush_and_commit(s, result, pending, CategoryDTO.from_entity)
+        invalidate_users(_CACHE_KEY, old_users | {m.get_user_id() for _, m in valid})
+        return result
+
+    @staticmethod
+    def bulk_delete(category_ids: List[int]) -> BulkResult:
+        with Session(engine) as s:
+            owners = owner_ids(s, CategoryEntity, category_ids)
+            result = delete_by_ids(
+                s,
+                CategoryEntity,
+                category_ids,
+                not_found="Categoria não encontrada",
+                in_use="Categoria não pode ser removida pois está em uso",
+            )
+        invalidate_users(_CACHE_KEY, owners)
+        return result
@@ -3,10 +3,12 @@ from typing import Optional, List, TYPE_CHECKING
 from datetime import datetime, timezone
 
 from sqlmodel import Session, select
+from sqlalchemy import delete
 from sqlalchemy.exc import IntegrityError
 
 from db.session import engine
 from db.models import DebtInstallment as InstallmentEntity, Debt as DebtEntity
+from repository.bulk import BulkResult, delete_by_ids, existing_ids, flush_and_commit, load_by_ids
 
 if TYPE_CHECKING:
     from services.debt_installments import DebtInstallment
@@ -14,16 +16,44 @@ if TYPE_CHECKING:
 
 class DebtInstallmentRepository:
     @staticmethod
-    def create(model: 'DebtInstallment') -> 'DebtInstallment':
+    def _validate_fields(model: 'DebtInstallment') -> None:
         if model.get_debt_id() is None or int(model.get_debt_id()) <= 0:
             raise ValueError("Dívida inválida")
         if model.get_number() is None or int(model.get_number()) <= 0:
             raise ValueError("Número da parcela inválido")
-        if model.get_amount() is None or float(model.get_amount()) <= 0:
+        if model.get_amount_cents() <= 0:
+            raise ValueError("Valor da parcela inválido")
+        if model.get_due_on() is None:
+            raise ValueError("Data de vencimento é obrigatória")
+
+    @staticmethod
+    def _validate_update(model: 'DebtInstallment') -> None:
+        if model.get_id() is None:
+            raise ValueError("ID obrigatório para update")
+        if model.get_number() is None or int(model.get_number()) <= 0:
+            raise ValueError("Número da parcela inválido")
+        if model.get_amount_cents() <= 0:
             raise ValueError("Valor da parcela inválido")
         if model.get_due_on() is None:
             raise ValueError("Data de vencimento é obrigatória")
 
+    @staticmethod
+    def _apply(ent: InstallmentEntity, model: 'DebtInstallment') -> None:
+        ent.debt_id = int(model.get_debt_id())
+        ent.number = int(model.get_number())
+        ent.amount_cents = int(model.get_amount_cents())
+        ent.due_on = model.get_due_on()
+        ent.paid = bool(model.get_paid())
+        # Ajusta paid_at conforme consistência
+        if ent.paid:
+            ent.paid_at = model.get_paid_at() or datetime.now(timezone.utc)
+        else:
+            ent.paid_at = None
+
+    @staticmethod
+    def create(model: 'DebtInstallment') -> 'DebtInstallment':
+        DebtInstallmentRepository._validate_fields(model)
+
         with Session(engine) as s:
             if not s.get(DebtEntity, int(model.get_debt_id())):
                 raise ValueError("Dívida não encontrada")
@@ -48,7 +78,7 @@ class DebtInstallmentRepository:
             return DTO.from_entity(ent) if ent else None
 
     @staticmethod
-    def list_by_debt(debt_id: int, limit: int = 100, offset: int = 0) -> List['DebtInstallment']:
+    def list_by_debt(debt_id: int, limit: Optional[int] = 100, offset: int = 0) -> List['DebtInstallment']:
         from services.debt_installments import DebtInstallment as DTO
         with Session(engine) as s:
             q = (
@@ -63,14 +93,7 @@ class DebtInstallmentRepository:
     @staticmethod
     def update(model: 'DebtInstallment') -> 'DebtInstallment':
         from services.debt_installments import DebtInstallment as DTO
-        if model.get_id() is None:
-            raise ValueError("ID obrigatório para update")
-        if model.get_number() is None or int(model.get_number()) <= 0:
-            raise ValueError("Número da parcela inválido")
-        if model.get_amount() is None or float(model.get_amount()) <= 0:
-            raise ValueError("Valor da parcela inválido")
-        if model.get_due_on() is None:
-            raise ValueError("Data de vencimento é obrigatória")
+        DebtInstallmentRepository._validate_update(model)
 
         with Session(engine) as s:
             ent = s.get(InstallmentEntity, model.get_id())
@@ -80,16 +103,7 @@ class DebtInstallmentRepository:
             if model.get_debt_id() is None or not s.get(DebtEntity, int(model.get_debt_id())):
                 raise ValueError("Dívida não encontrada")
 
-            ent.debt_id = int(model.get_debt_id())
-            ent.number = int(model.get_number())
-            ent.amount = float(model.get_amount())
-            ent.due_on = model.get_due_on()
-            ent.paid = bool(model.get_paid())
-            # Ajusta paid_at conforme consistência
-            if ent.paid:
-                ent.paid_at = model.get_paid_at() or datetime.now(timezone.utc)
-            else:
-                ent.paid_at = None
+            DebtInstallmentRepository._apply(ent, model)
 
             try:
                 s.add(ent)
@@ -117,3 +131,97 @@ class DebtInstallmentRepository:
                 s.rollback()
                 raise ValueError("Parcela não pode ser removida pois está em uso") from e
 
+
+    # ---------------- Operações em lote (uma sessão/commit por lote) ----------------
+
+    @staticmethod
+    def bulk_create(models: List['DebtInstallment']) -> BulkResult:
+        from services.debt_installments import DebtInstallment as DTO
+        result = BulkResult.sized(len(models))
+        valid = result.validate(models, DebtInstallmentRepository._validate_fields)
+        with Session(engine) as s:
+            debts = existing_ids(s, DebtEntity, (m.get_debt_id() for _, m in valid))
+            pending = []
+            for i, model in valid:
+                if int(model.get_debt_id()) not in debts:
+                    result.fail(i, "Dívida não encontrada")
+                    continue
+                ent = model.to_entity()
+                s.add(ent)
+                pending.append((i, ent))
+            flush_and_commit(s, result, pending, DTO.from_entity)
+        return result
+
+    @staticmethod
+    def bulk_update(models: List['DebtInstallment']) -> BulkResult:
+        from services.debt_installments import DebtInstallment as DTO
+        result = BulkResult.sized(len(models))
+        valid = result.validate(models, DebtInstallmentRepository._validate_update)
+        with Session(engine) as s:
+            ents = load_by_ids(s, InstallmentEntity, (m.get_id() for _, m in valid))
+            debts = existing_ids(s, DebtEntity, (m.get_debt_id() for _, m in valid))
+            pending = []
+            for i, model in valid:
+                ent = ents.get(int(model.get_id()))
+                if ent is None:
+                    result.fail(i, "Parcela não encontrada")
+                    continue
+                if model.get_debt_id() is None or int(model.get_debt_id()) not in debts:
+                    result.fail(i, "Dívida não encontrada")
+                    continue
+                DebtInstallmentRepository._apply(ent, model)
+                pending.append((i, ent))
+            flush_and_commit(s, result, pending, DTO.from_entity)
+        return result
+
+    @staticmethod
+    def bulk_delete(installment_ids: List[int]) -> BulkResult:
+        with Session(engine) as s:
+            return delete_by_ids(
+                s,
+                InstallmentEntity,
+                installment_ids,
+                not_found="Parcela não encontrada",
+                in_use="Parcela não pode ser removida pois está em uso",
+            )
+
+    @staticmethod
+    def apply_schedule(
+        debt_id: int,
+        create: List['DebtInstallment'],
+        update: List['DebtInstallment'],
+        delete_ids: List[int],
+    ) -> None:
+        """Aplica um diff de parcelas de uma dívida numa única transação.
+        Ou todas as inserções/alterações/remoções são gravadas, ou nenhuma.
+        """
+        for model in create:
+            DebtInstallmentRepository._validate_fields(model)
+        for model in update:
+            DebtInstallmentRepository._validate_update(model)
+        if not (create or update or delete_ids):
+            return
+
+        with Session(engine) as s:
+            if not s.get(DebtEntity, int(debt_id)):
+                raise ValueError("Dívida não encontrada")
+
+            ents = load_by_ids(s, InstallmentEntity, (m.get_id() for m in update))
+            for model in update:
+                ent = ents.get(int(model.get_id()))
+                if ent is None or ent.debt_id != int(debt_id):
+                    raise ValueError("Parcela não encontrada")
+                DebtInstallmentRepository._apply(ent, model)
+            for model in create:
+                s.add(model.to_entity())
+            try:
+                if delete_ids:
+                    s.exec(
+                        delete(InstallmentEntity)
+                        .where(InstallmentEntity.debt_id == int(debt_id))
+                        .where(InstallmentEntity.id.in_([int(i) for i in delete_ids]))
+                    )
+                s.commit()
+            except IntegrityError as e:
+                s.rollback()
+                raise ValueError("Dados inválidos ou violação de integridade") from e
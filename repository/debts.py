@@ -1,12 +1,17 @@
 from __future__ import annotations
-from typing import Optional, List, TYPE_CHECKING
+from typing import Dict, Optional, List, Tuple, TYPE_CHECKING
 from datetime import date
 
 from sqlmodel import Session, select
+from sqlalchemy import delete, tuple_
 from sqlalchemy.exc import IntegrityError
 
 from db.session import engine
-from db.models import Debt as DebtEntity, User as UserEntity, DebtOrigin as OriginEntity, Category as CategoryEntity, Responsible as ResponsibleEntity
+from db.models import Debt as DebtEntity, DebtInstallment as InstallmentEntity
+from repository.bulk import BulkResult, delete_by_ids, flush_and_commit, load_by_ids
+from repository.refs import changed_refs, load_refs, ref_map, validate_refs
+from repository.pagination import encode_cursor, decode_cursor
+from repository.search import match_expression, ranked_page
 
 if TYPE_CHECKING:
     from services.debts import Debt
@@ -14,33 +19,67 @@ if TYPE_CHECKING:
 
 class DebtRepository:
     @staticmethod
-    def _validate_foreign_keys(s: Session, model: 'Debt') -> None:
-        if not s.get(UserEntity, int(model.get_user_id())):
-            raise ValueError("Usuário não encontrado")
-        if not s.get(OriginEntity, int(model.get_origin_id())):
-            raise ValueError("Origem não encontrada")
-        if model.get_category_id() is not None:
-            if not s.get(CategoryEntity, int(model.get_category_id())):
-                raise ValueError("Categoria não encontrada")
-        if model.get_responsible_id() is not None:
-            if not s.get(ResponsibleEntity, int(model.get_responsible_id())):
-                raise ValueError("Responsável não encontrado")
+    def _refs(model: 'Debt') -> Dict[str, Optional[int]]:
+        # referências checadas por repository.refs, na ordem das mensagens
+        return ref_map(
+            user=model.get_user_id(),
+            origin=model.get_origin_id(),
+            category=model.get_category_id(),
+            responsible=model.get_responsible_id(),
+        )
 
     @staticmethod
-    def create(model: 'Debt') -> 'Debt':
+    def _entity_refs(ent: DebtEntity) -> Dict[str, Optional[int]]:
+        return ref_map(user=ent.user_id, origin=ent.origin_id, category=ent.category_id, responsible=ent.responsible_id)
+
+    @staticmethod
+    def _validate_fields(model: 'Debt') -> None:
         if model.get_user_id() is None or int(model.get_user_id()) <= 0:
             raise ValueError("Usuário inválido")
         if model.get_origin_id() is None or int(model.get_origin_id()) <= 0:
             raise ValueError("Origem inválida")
         if model.get_debt_date() is None:
             raise ValueError("Data da dívida é obrigatória")
-        if float(model.get_total_amount() or 0) <= 0:
+        if model.get_total_amount_cents() <= 0:
+            raise ValueError("Valor total inválido")
+        if int(model.get_installments() or 0) <= 0:
+            raise ValueError("Número de parcelas inválido")
+
+    @staticmethod
+    def _validate_update(model: 'Debt') -> None:
+        if model.get_id() is None:
+            raise ValueError("ID obrigatório para update")
+        if model.get_debt_date() is None:
+            raise ValueError("Data da dívida é obrigatória")
+        if model.get_total_amount_cents() <= 0:
             raise ValueError("Valor total inválido")
         if int(model.get_installments() or 0) <= 0:
             raise ValueError("Número de parcelas inválido")
 
+    @staticmethod
+    def _apply(ent: DebtEntity, model: 'Debt') -> None:
+        ent.user_id = int(model.get_user_id())
+        ent.origin_id = int(model.get_origin_id())
+        ent.category_id = model.get_category_id()
+        ent.responsible_id = model.get_responsible_id()
+        ent.debt_date = model.get_debt_date()
+        ent.description = model.get_description()
+        ent.total_amount_cents = int(model.get_total_amount_cents())
+        ent.installments = int(model.get_installments())
+        ent.notes = model.get_notes()
+        ent.paid = bool(model.get_paid())
+
+    @staticmethod
+    def _delete_installments(s: Session, debt_ids: List[int]) -> None:
+        # Com foreign_keys=ON as parcelas precisam sair antes da dívida
+        s.exec(delete(InstallmentEntity).where(InstallmentEntity.debt_id.in_(debt_ids)))
+
+    @staticmethod
+    def create(model: 'Debt') -> 'Debt':
+        DebtRepository._validate_fields(model)
+
         with Session(engine) as s:
-            DebtRepository._validate_foreign_keys(s, model)
+            validate_refs(s, model.get_user_id(), DebtRepository._refs(model))
 
             ent = model.to_entity()
             s.add(ent)
@@ -123,6 +162,38 @@ class DebtRepository:
             q = q.order_by(DebtEntity.debt_date, DebtEntity.id).offset(offset).limit(limit)
             return [DTO.from_entity(e) for e in s.exec(q).all()]
 
+    @staticmethod
+    def _filtered_query(
+        user_id: int,
+        *,
+        paid: Optional[bool] = None,
+        origin_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        responsible_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        installments_min: Optional[int] = None,
+        installments_max: Optional[int] = None,
+    ):
+        q = select(DebtEntity).where(DebtEntity.user_id == int(user_id))
+        if paid is not None:
+            q = q.where(DebtEntity.paid == bool(paid))
+        if origin_id is not None:
+            q = q.where(DebtEntity.origin_id == int(origin_id))
+        if category_id is not None:
+            q = q.where(DebtEntity.category_id == int(category_id))
+        if responsible_id is not None:
+            q = q.where(DebtEntity.responsible_id == int(responsible_id))
+        if start_date is not None:
+            q = q.where(DebtEntity.debt_date >= start_date)
+        if end_date is not None:
+            q = q.where(DebtEntity.debt_date <= end_date)
+        if installments_min is not None:
+            q = q.where(DebtEntity.installments >= int(installments_min))
+        if installments_max is not None:
+            q = q.where(DebtEntity.installments <= int(installments_max))
+        return q
+
     @staticmethod
     def list_by_filters(
         user_id: int,
@@ -142,38 +213,99 @@ class DebtRepository:
         Todos os filtros são AND entre si. Ordena por data e id.
         """
         from services.debts import Debt as DTO
+        q = DebtRepository._filtered_query(
+            user_id,
+            paid=paid,
+            origin_id=origin_id,
+            category_id=category_id,
+            responsible_id=responsible_id,
+            start_date=start_date,
+            end_date=end_date,
+            installments_min=installments_min,
+            installments_max=installments_max,
+        )
         with Session(engine) as s:
-            q = select(DebtEntity).where(DebtEntity.user_id == int(user_id))
-            if paid is not None:
-                q = q.where(DebtEntity.paid == bool(paid))
-            if origin_id is not None:
-                q = q.where(DebtEntity.origin_id == int(origin_id))
-            if category_id is not None:
-                q = q.where(DebtEntity.category_id == int(category_id))
-            if responsible_id is not None:
-                q = q.where(DebtEntity.responsible_id == int(responsible_id))
-            if start_date is not None:
-                q = q.where(DebtEntity.debt_date >= start_date)
-            if end_date is not None:
-                q = q.where(DebtEntity.debt_date <= end_date)
-            if installments_min is not None:
-                q = q.where(DebtEntity.installments >= int(installments_min))
-            if installments_max is not None:
-                q = q.where(DebtEntity.installments <= int(installments_max))
             q = q.order_by(DebtEntity.debt_date, DebtEntity.id).offset(offset).limit(limit)
             return [DTO.from_entity(e) for e in s.exec(q).all()]
 
+    @staticmethod
+    def list_page_by_filters(
+        user_id: int,
+        *,
+        paid: Optional[bool] = None,
+        origin_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        responsible_id: Optional[int] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        installments_min: Optional[int] = None,
+        installments_max: Optional[int] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List['Debt'], Optional[str]]:
+        """Variante paginada por chave de list_by_filters (mesmos filtros e ordem).
+        Retorna (dívidas, próximo cursor); o cursor é None na última página.
+        """
+        from services.debts import Debt as DTO
+        q = DebtRepository._filtered_query(
+            user_id,
+            paid=paid,
+            origin_id=origin_id,
+            category_id=category_id,
+            responsible_id=responsible_id,
+            start_date=start_date,
+            end_date=end_date,
+            installments_min=installments_min,
+            installments_max=installments_max,
+        )
+        after = decode_cursor(cursor, (date, int))
+        if after is not None:
+            q = q.where(tuple_(DebtEntity.debt_date, DebtEntity.id) > tuple_(*after))
+        with Session(engine) as s:
+            q = q.order_by(DebtEntity.debt_date, DebtEntity.id).limit(int(limit) + 1)
+            ents = s.exec(q).all()
+            rows = [DTO.from_entity(e) for e in ents[:limit]]
+        next_cursor = None
+        if len(ents) > limit and rows:
+            last = rows[-1]
+            next_cursor = encode_cursor(last.get_debt_date(), last.get_id())
+        return rows, next_cursor
+
+    @staticmethod
+    def search(
+        user_id: int,
+        query: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        *,
+        paid: Optional[bool] = None,
+        origin_id: Optional[int] = None,
+        category_id: Optional[int] = None,
+        responsible_id: Optional[int] = None,
+    ) -> Tuple[List['Debt'], Optional[str]]:
+        """Busca textual em descrição/notas (índice FTS5), com os mesmos filtros
+        de list_by_filters. Resultados do mais para o menos relevante;
+        retorna (dívidas, próximo cursor).
+        """
+        from services.debts import Debt as DTO
+        match = match_expression(query)
+        if match is None:
+            return [], None
+        q = DebtRepository._filtered_query(
+            user_id,
+            paid=paid,
+            origin_id=origin_id,
+            category_id=category_id,
+            responsible_id=responsible_id,
+        )
+        with Session(engine) as s:
+            ents, next_cursor = ranked_page(s, DebtEntity, "debt_fts", q, match, limit, cursor)
+            return [DTO.from_entity(e) for e in ents], next_cursor
+
     @staticmethod
     def update(model: 'Debt') -> 'Debt':
         from services.debts import Debt as DTO
-        if model.get_id() is None:
-            raise ValueError("ID obrigatório para update")
-        if model.get_debt_date() is None:
-            raise ValueError("Data da dívida é obrigatória")
-        if float(model.get_total_amount() or 0) <= 0:
-            raise ValueError("Valor total inválido")
-        if int(model.get_installments() or 0) <= 0:
-            raise ValueError("Número de parcelas inválido")
+        DebtRepository._validate_update(model)
 
         with Session(engine) as s:
             ent = s.get(DebtEntity, model.get_id())
@@ -184,18 +316,9 @@ class DebtRepository:
                 raise ValueError("Usuário inválido")
             if model.get_origin_id() is None:
                 raise ValueError("Origem inválida")
-            DebtRepository._validate_foreign_keys(s, model)
-
-            ent.user_id = int(model.get_user_id())
-            ent.origin_id = int(model.get_origin_id())
-            ent.category_id = model.get_category_id()
-            ent.responsible_id = model.get_responsible_id()
-            ent.debt_date = model.get_debt_date()
-            ent.description = model.get_description()
-            ent.total_amount = float(model.get_total_amount())
-            ent.installments = int(model.get_installments())
-            ent.notes = model.get_notes()
-            ent.paid = bool(model.get_paid())
+            refs = changed_refs(DebtRepository._entity_refs(ent), DebtRepository._refs(model))
+            validate_refs(s, model.get_user_id(), refs)
+            DebtRepository._apply(ent, model)
 
             try:
                 s.add(ent)
@@ -216,8 +339,78 @@ class DebtRepository:
             if not ent:
                 raise ValueError("Dívida não encontrada")
             try:
+                DebtRepository._delete_installments(s, [ent.id])
                 s.delete(ent)
                 s.commit()
             except IntegrityError as e:
                 s.rollback()
                 raise ValueError("Dívida não pode ser removida pois está em uso") from e
+
+    # ---------------- Operações em lote (uma sessão/commit por lote) ----------------
+
+    @staticmethod
+    def bulk_create(models: List['Debt']) -> BulkResult:
+        from services.debts import Debt as DTO
+        result = BulkResult.sized(len(models))
+        valid = result.validate(models, DebtRepository._validate_fields)
+        with Session(engine) as s:
+            owners = load_refs(s, (DebtRepository._refs(m) for _, m in valid))
+            pending = []
+            for i, model in valid:
+                try:
+                    owners.check(model.get_user_id(), DebtRepository._refs(model))
+                except ValueError as e:
+                    result.fail(i, str(e))
+                    continue
+                ent = model.to_entity()
+                s.add(ent)
+                pending.append((i, ent))
+            flush_and_commit(s, result, pending, DTO.from_entity)
+        return result
+
+    @staticmethod
+    def bulk_update(models: List['Debt']) -> BulkResult:
+        from services.debts import Debt as DTO
+
+        def _check(model: 'Debt') -> None:
+            DebtRepository._validate_update(model)
+            if model.get_user_id() is None:
+                raise ValueError("Usuário inválido")
+            if model.get_origin_id() is None:
+                raise ValueError("Origem inválida")
+
+        result = BulkResult.sized(len(models))
+        valid = result.validate(models, _check)
+        with Session(engine) as s:
+            ents = load_by_ids(s, DebtEntity, (m.get_id() for _, m in valid))
+            to_check = {
+                i: changed_refs(DebtRepository._entity_refs(ents[int(m.get_id())]), DebtRepository._refs(m))
+                for i, m in valid if int(m.get_id()) in ents
+            }
+            owners = load_refs(s, to_check.values())
+            pending = []
+            for i, model in valid:
+                ent = ents.get(int(model.get_id()))
+                try:
+                    if ent is None:
+                        raise ValueError("Dívida não encontrada")
+                    owners.check(model.get_user_id(), to_check[i])
+                except ValueError as e:
+                    result.fail(i, str(e))
+                    continue
+                DebtRepository._apply(ent, model)
+                pending.append((i, ent))
+            flush_and_commit(s, result, pending, DTO.from_entity)
+        return result
+
+    @staticmethod
+    def bulk_delete(debt_ids: List[int]) -> BulkResult:
+        with Session(engine) as s:
+            return delete_by_ids(
+                s,
+                DebtEntity,
+                debt_ids,
+                not_found="Dívida não encontrada",
+                in_use="Dívida não pode ser removida pois está em uso",
+                before_delete=DebtRepository._delete_installments,
+            )
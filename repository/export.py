@@ -0,0 +1,97 @@
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import Iterator, List, Sequence, Tuple
+
+from sqlalchemy import Boolean, Date, DateTime, Integer, TypeDecorator, select, type_coerce
+from sqlalchemy.types import NullType
+from sqlalchemy.engine import Connection
+
+from db.session import engine
+from db.models import Debt as DebtEntity, DebtInstallment as InstallmentEntity, Transaction as TxEntity
+
+
+# Leitura em fluxo das tabelas de um usuário para exportação (ver
+# services/export.py). Cada tabela é lida por um cursor que o SQLite avança
+# sob demanda (yield_per), em blocos de tamanho fixo, na ordem de um índice
+# existente — nada de ORDER BY que obrigue a ordenar o resultado inteiro.
+# Todas as tabelas saem do mesmo snapshot (uma transação de leitura), então
+# parcelas e dívidas exportadas são consistentes entre si.
+
+EXPORT_TABLES = ("transactions", "debts", "installments")
+
+# tipo lógico de cada coluna, para CSV/Parquet: int, bool, date, datetime, str
+Column = Tuple[str, str]
+
+
+def _kind(sa_type) -> str:
+    if isinstance(sa_type, TypeDecorator):  # ex.: UTCDateTime do SQLModel
+        sa_type = sa_type.impl
+    if isinstance(sa_type, Boolean):
+        return "bool"
+    if isinstance(sa_type, DateTime):
+        return "datetime"
+    if isinstance(sa_type, Date):
+        return "date"
+    if isinstance(sa_type, Integer):
+        return "int"
+    return "str"
+
+
+def _query(table: str, user_id: int):
+    uid = int(user_id)
+    if table == "transactions":
+        return (
+            select(*TxEntity.__table__.c)
+            .where(TxEntity.user_id == uid)
+            .order_by(TxEntity.occurred_at, TxEntity.id)  # ix_transaction_user_occurred
+        )
+    if table == "debts":
+        return (
+            select(*DebtEntity.__table__.c)
+            .where(DebtEntity.user_id == uid)
+            .order_by(DebtEntity.debt_date, DebtEntity.id)  # ix_debt_user_date
+        )
+    if table == "installments":
+        return (
+            select(*InstallmentEntity.__table__.c)
+            .join(DebtEntity, DebtEntity.id == InstallmentEntity.debt_id)
+            .where(DebtEntity.user_id == uid)
+            .order_by(DebtEntity.debt_date, DebtEntity.id, InstallmentEntity.number)
+        )
+    raise ValueError(f"Tabela de exportação inválida: {table!r} (use {', '.join(EXPORT_TABLES)})")
+
+
+def columns(table: str) -> List[Column]:
+    """(nome, tipo lógico) das colunas exportadas de `table`."""
+    return [(c.name, _kind(c.type)) for c in _query(table, 0).selected_columns]
+
+
+@contextmanager
+def snapshot() -> Iterator[Connection]:
+    """Conexão com uma transação de leitura aberta (mesmo snapshot para todas
+    as tabelas). O pysqlite só abre transação antes de escritas, daí o BEGIN.
+    """
+    with engine.connect() as conn:
+        conn.exec_driver_sql("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.rollback()
+
+
+def stream_rows(
+    conn: Connection, table: str, user_id: int, chunk_size: int, raw: bool = False
+) -> Iterator[Sequence[tuple]]:
+    """Blocos de até `chunk_size` linhas (tuplas na ordem de columns(table)).
+    Com `raw`, os valores vêm como o SQLite guarda (datas em texto ISO,
+    booleanos 0/1), sem a conversão para objetos Python — é o que o CSV usa.
+    """
+    q = _query(table, user_id)
+    if raw:
+        q = q.with_only_columns(
+            *(type_coerce(c, NullType()).label(c.name) for c in q.selected_columns),
+            maintain_column_froms=True,
+        )
+    result = conn.execution_options(yield_per=int(chunk_size)).execute(q)
+    for part in result.partitions():
+        yield part
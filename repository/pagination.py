@@ -0,0 +1,40 @@
+from __future__ import annotations
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Optional, Sequence, Tuple
+
+
+# Cursores opacos para paginação por chave (keyset/seek).
+# O cursor carrega a chave de ordenação da última linha entregue, p.ex.
+# (occurred_at, id); a próxima página começa logo depois dela, então a
+# página N custa o mesmo que a primeira (sem OFFSET).
+
+def encode_cursor(*values: Any) -> str:
+    parts = [v.isoformat() if isinstance(v, (date, datetime)) else v for v in values]
+    raw = json.dumps(parts, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str], types: Sequence[type]) -> Optional[Tuple[Any, ...]]:
+    """Decodifica um cursor gerado por encode_cursor nos tipos informados.
+    Retorna None para cursor vazio; lança ValueError se for inválido.
+    """
+    if not cursor:
+        return None
+    try:
+        padding = "=" * ((4 - len(cursor) % 4) % 4)
+        parts = json.loads(base64.urlsafe_b64decode((cursor + padding).encode("ascii")))
+        if not isinstance(parts, list) or len(parts) != len(types):
+            raise ValueError("tamanho")
+        values = []
+        for value, typ in zip(parts, types):
+            if typ is datetime:
+                values.append(datetime.fromisoformat(value))
+            elif typ is date:
+                values.append(date.fromisoformat(value))
+            else:
+                values.append(typ(value))
+        return tuple(values)
+    except Exception as e:
+        raise ValueError("Cursor inválido") from e
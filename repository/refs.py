@@ -0,0 +1,117 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlmodel import Session, select
+from sqlalchemy import literal_column, union_all
+
+from db.models import Category, Debt, DebtInstallment, DebtOrigin, Responsible, User
+from repository.bulk import IN_CHUNK, _chunks
+
+
+# Validação das referências de uma escrita (usuário, categoria, origem,
+# responsável, parcela): cada id precisa existir e pertencer ao mesmo usuário
+# do registro. A exceção é "related_user" (o usuário vinculado a um
+# responsável), que é outro usuário por definição: só precisa existir.
+# Tudo sai de um único SELECT ... UNION ALL com (tipo, id, dono), tanto para
+# um registro quanto para um lote inteiro.
+#
+# Com foreign_keys=ON o próprio SQLite já barra ids inexistentes; esta
+# checagem existe para dar as mensagens em português por linha e para a regra
+# de dono, que o banco não conhece. No update só entram as referências que
+# mudaram (ver changed_refs), então editar valor/descrição não consulta nada.
+
+MESSAGES = {
+    "user": "Usuário não encontrado",
+    "related_user": "Usuário relacionado não encontrado",
+    "category": "Categoria não encontrada",
+    "origin": "Origem não encontrada",
+    "responsible": "Responsável não encontrado",
+    "installment": "Parcela não encontrada",
+}
+
+# tipos que só precisam existir, sem a regra de mesmo dono
+_ANY_OWNER = {"related_user"}
+
+Refs = Mapping[str, Optional[int]]
+
+
+def ref_map(**refs: Optional[int]) -> Dict[str, Optional[int]]:
+    """ref_map(user=1, category=None, ...) com os ids normalizados para int."""
+    for kind in refs:
+        if kind not in MESSAGES:
+            raise ValueError(f"Tipo de referência inválido: {kind!r}")
+    return {kind: None if ref_id is None else int(ref_id) for kind, ref_id in refs.items()}
+
+
+def _owner_select(kind: str, ids: List[int]):
+    tag = literal_column(f"'{kind}'").label("kind")
+    if kind in ("user", "related_user"):
+        return select(tag, User.id.label("id"), User.id.label("owner")).where(User.id.in_(ids))
+    if kind == "installment":
+        # a parcela pertence ao dono da dívida
+        return (
+            select(tag, DebtInstallment.id.label("id"), Debt.user_id.label("owner"))
+            .join(Debt, Debt.id == DebtInstallment.debt_id)
+            .where(DebtInstallment.id.in_(ids))
+        )
+    entity = {"category": Category, "origin": DebtOrigin, "responsible": Responsible}[kind]
+    return select(tag, entity.id.label("id"), entity.user_id.label("owner")).where(entity.id.in_(ids))
+
+
+class RefOwners:
+    """Dono (user_id) de cada referência carregada, por tipo."""
+
+    def __init__(self, owners: Optional[Dict[str, Dict[int, int]]] = None) -> None:
+        self.owners: Dict[str, Dict[int, int]] = owners or {}
+
+    def check(self, user_id: int, refs: Refs) -> None:
+        """ValueError com a mensagem da primeira referência (na ordem de `refs`)
+        que não existe ou é de outro usuário.
+        """
+        for kind, ref_id in refs.items():
+            if ref_id is None:
+                continue
+            owner = self.owners.get(kind, {}).get(int(ref_id))
+            if owner is None or (kind not in _ANY_OWNER and owner != int(user_id)):
+                raise ValueError(MESSAGES[kind])
+
+
+def load_refs(s: Session, batch: Iterable[Refs]) -> RefOwners:
+    """Carrega, em um UNION ALL, os donos de todas as referências do lote.
+    Só passa de uma consulta se o lote tiver mais de IN_CHUNK ids.
+    """
+    wanted: Dict[str, set] = {}
+    for refs in batch:
+        for kind, ref_id in refs.items():
+            if ref_id is not None:
+                wanted.setdefault(kind, set()).add(int(ref_id))
+
+    parts: List[Tuple[str, List[int]]] = [
+        (kind, chunk) for kind, ids in wanted.items() for chunk in _chunks(sorted(ids))
+    ]
+    found = RefOwners({kind: {} for kind in wanted})
+    while parts:
+        group, size = [], 0
+        while parts and (not group or size + len(parts[0][1]) <= IN_CHUNK):
+            kind, chunk = parts.pop(0)
+            group.append(_owner_select(kind, chunk))
+            size += len(chunk)
+        stmt = group[0] if len(group) == 1 else union_all(*group)
+        for kind, ref_id, owner in s.exec(stmt).all():
+            found.owners[kind][int(ref_id)] = int(owner)
+    return found
+
+
+def validate_refs(s: Session, user_id: int, refs: Refs) -> None:
+    """Versão de um registro só: no máximo uma consulta, nenhuma se não houver ids."""
+    if any(ref_id is not None for ref_id in refs.values()):
+        load_refs(s, [refs]).check(user_id, refs)
+
+
+def changed_refs(before: Refs, after: Refs) -> Dict[str, Optional[int]]:
+    """Referências de `after` que precisam ser validadas num update: todas se o
+    usuário mudou, senão só as que mudaram em relação a `before`.
+    """
+    if before.get("user") != after.get("user"):
+        return dict(after)
+    return {kind: ref_id for kind, ref_id in after.items() if before.get(kind) != ref_id}
@@ -0,0 +1,118 @@
+from __future__ import annotations
+from typing import Optional
+from datetime import datetime
+
+import pandas as pd
+from sqlmodel import Session, select
+from sqlalchemy import case, func
+
+from db.session import engine
+from db.models import MonthlySummary as SummaryEntity, Category as CategoryEntity
+from services.money import series_from_cents
+
+
+# Consultas do Dashboard. Leem a tabela MonthlySummary (uma linha por
+# usuário/mês/tipo/categoria, mantida pelo TransactionRepository), então o
+# custo depende do número de meses, não do número de transações. Por isso os
+# filtros de período valem por mês inteiro: `start`/`end` selecionam os meses
+# em que caem. Só entram lançamentos efetivos (fixed=False).
+# As somas são inteiras (centavos) no SQLite e em int64 no pandas; cada
+# coluna `x_cents` tem ao lado a coluna `x` em reais, só para exibição.
+
+_INCOME = func.coalesce(func.sum(case((SummaryEntity.type == "income", SummaryEntity.total_cents), else_=0)), 0)
+_EXPENSE = func.coalesce(func.sum(case((SummaryEntity.type == "expense", SummaryEntity.total_cents), else_=0)), 0)
+_SIGNED = case((SummaryEntity.type == "income", SummaryEntity.total_cents), else_=-SummaryEntity.total_cents)
+
+
+def _frame(rows, columns) -> pd.DataFrame:
+    """Monta o DataFrame convertendo as colunas `*_cents` para int64 e criando as de reais."""
+    df = pd.DataFrame(rows, columns=columns)
+    for col in columns:
+        if col.endswith("_cents"):
+            df[col] = df[col].astype("int64")
+            df[col[: -len("_cents")]] = series_from_cents(df[col])
+    return df
+
+
+def _scoped(q, user_id: int, start: Optional[datetime], end: Optional[datetime]):
+    q = q.where(SummaryEntity.user_id == int(user_id))
+    if start is not None:
+        q = q.where(SummaryEntity.year_month >= start.strftime("%Y-%m"))
+    if end is not None:
+        q = q.where(SummaryEntity.year_month <= end.strftime("%Y-%m"))
+    return q
+
+
+class ReportRepository:
+    @staticmethod
+    def monthly_totals(
+        user_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """Entradas, saídas e saldo líquido por mês
+        (colunas: mes, entradas[_cents], saidas[_cents], liquido[_cents]).
+        """
+        q = _scoped(
+            select(SummaryEntity.year_month, _INCOME, _EXPENSE),
+            user_id, start, end,
+        ).group_by(SummaryEntity.year_month).order_by(SummaryEntity.year_month)
+        with Session(engine) as s:
+            rows = s.exec(q).all()
+        df = _frame(rows, ["mes", "entradas_cents", "saidas_cents"])
+        df["liquido_cents"] = df["entradas_cents"] - df["saidas_cents"]
+        df["liquido"] = series_from_cents(df["liquido_cents"])
+        return df
+
+    @staticmethod
+    def category_breakdown(
+        user_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        type: str = "expense",
+    ) -> pd.DataFrame:
+        """Total por categoria de um tipo (colunas: categoria_id, categoria, total[_cents]), do maior para o menor."""
+        t = (type or "").lower()
+        if t not in ("income", "expense"):
+            raise ValueError("Tipo inválido (use 'income' ou 'expense')")
+        total = func.sum(SummaryEntity.total_cents)
+        category_id = func.nullif(SummaryEntity.category_id, 0)
+        q = _scoped(
+            select(category_id, CategoryEntity.name, total)
+            .join(CategoryEntity, CategoryEntity.id == SummaryEntity.category_id, isouter=True)
+            .where(SummaryEntity.type == t),
+            user_id, start, end,
+        ).group_by(SummaryEntity.category_id, CategoryEntity.name).order_by(total.desc())
+        with Session(engine) as s:
+            rows = s.exec(q).all()
+        df = _frame(rows, ["categoria_id", "categoria", "total_cents"])
+        df["categoria"] = df["categoria"].fillna("Sem categoria")
+        return df
+
+    @staticmethod
+    def balance_series(
+        user_id: int,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> pd.DataFrame:
+        """Saldo acumulado ao fim de cada mês (colunas: mes, liquido[_cents], saldo[_cents]).
+        O saldo parte do acumulado dos meses anteriores a `start`.
+        """
+        q = _scoped(
+            select(SummaryEntity.year_month, func.sum(_SIGNED)),
+            user_id, start, end,
+        ).group_by(SummaryEntity.year_month).order_by(SummaryEntity.year_month)
+        with Session(engine) as s:
+            rows = s.exec(q).all()
+            opening = 0
+            if start is not None:
+                oq = (
+                    select(func.coalesce(func.sum(_SIGNED), 0))
+                    .where(SummaryEntity.user_id == int(user_id))
+                    .where(SummaryEntity.year_month < start.strftime("%Y-%m"))
+                )
+                opening = int(s.exec(oq).one())
+        df = _frame(rows, ["mes", "liquido_cents"])
+        df["saldo_cents"] = df["liquido_cents"].cumsum() + opening
+        df["saldo"] = series_from_cents(df["saldo_cents"])
+        return df
@@ -1,31 +1,53 @@
 from __future__ import annotations
-from typing import Optional, List, TYPE_CHECKING
+from typing import Dict, Optional, List, TYPE_CHECKING
 
 from sqlmodel import Session, select
 from sqlalchemy.exc import IntegrityError
 
 from db.session import engine
-from db.models import Responsible as ResponsibleEntity, User as UserEntity
+from db.models import Responsible as ResponsibleEntity
+from repository.bulk import BulkResult, delete_by_ids, flush_and_commit, load_by_ids
+from repository.refs import changed_refs, load_refs, ref_map, validate_refs
+from repository.cache import cached_list, invalidate_users, owner_ids
 
 if TYPE_CHECKING:
     from services.responsibles import Responsible
 
 
+# chave deste repositório no cache de referência (repository/cache.py)
+_CACHE_KEY = "responsible"
+
+
 class ResponsibleRepository:
     @staticmethod
-    def create(model: 'Responsible') -> 'Responsible':
+    def _refs(model: 'Responsible') -> Dict[str, Optional[int]]:
+        # o usuário relacionado é outro usuário: repository.refs só exige que exista
+        return ref_map(user=model.get_user_id(), related_user=model.get_related_user_id())
+
+    @staticmethod
+    def _entity_refs(ent: ResponsibleEntity) -> Dict[str, Optional[int]]:
+        return ref_map(user=ent.user_id, related_user=ent.related_user_id)
+
+    @staticmethod
+    def _validate_fields(model: 'Responsible') -> None:
         if model.get_user_id() is None or int(model.get_user_id()) <= 0:
             raise ValueError("Usuário inválido")
         name = model.get_name()
         if name is not None and (name.strip() == ""):
             raise ValueError("Nome do responsável é inválido")
 
+    @staticmethod
+    def _validate_update(model: 'Responsible') -> None:
+        if model.get_id() is None:
+            raise ValueError("ID obrigatório para update")
+        ResponsibleRepository._validate_fields(model)
+
+    @staticmethod
+    def create(model: 'Responsible') -> 'Responsible':
+        ResponsibleRepository._validate_fields(model)
+
         with Session(engine) as s:
-            if not s.get(UserEntity, model.get_user_id()):
-                raise ValueError("Usuário não encontrado")
-            if model.get_related_user_id() is not None:
-                if not s.get(UserEntity, model.get_related_user_id()):
-                    raise ValueError("Usuário relacionado não encontrado")
+            validate_refs(s, model.get_user_id(), ResponsibleRepository._refs(model))
 
             ent = model.to_entity()
             s.add(ent)
@@ -35,6 +57,7 @@ class ResponsibleRepository:
                 s.rollback()
                 raise ValueError("Dados inválidos ou violação de integridade") from e
             s.refresh(ent)
+            invalidate_users(_CACHE_KEY, [ent.user_id])
             from services.responsibles import Responsible as DTO
             return DTO.from_entity(ent)
 
@@ -47,15 +70,13 @@ class ResponsibleRepository:
 
     @staticmethod
     def list_by_user(user_id: int, limit: int = 100, offset: int = 0) -> List['Responsible']:
+        return cached_list(_CACHE_KEY, user_id, lambda: ResponsibleRepository._load_all(user_id), limit, offset)
+
+    @staticmethod
+    def _load_all(user_id: int) -> List['Responsible']:
         from services.responsibles import Responsible as DTO
         with Session(engine) as s:
-            q = (
-                select(ResponsibleEntity)
-                .where(ResponsibleEntity.user_id == user_id)
-                .order_by(ResponsibleEntity.id)
-                .offset(offset)
-                .limit(limit)
-            )
+            q = select(ResponsibleEntity).where(ResponsibleEntity.user_id == user_id).order_by(ResponsibleEntity.id)
             return [DTO.from_entity(e) for e in s.exec(q).all()]
 
     @staticmethod
@@ -75,13 +96,10 @@ class ResponsibleRepository:
             if not ent:
                 raise ValueError("Responsável não encontrado")
 
-            if not s.get(UserEntity, model.get_user_id()):
-                raise ValueError("Usuário não encontrado")
-
-            if model.get_related_user_id() is not None:
-                if not s.get(UserEntity, model.get_related_user_id()):
-                    raise ValueError("Usuário relacionado não encontrado")
+            refs = changed_refs(ResponsibleRepository._entity_refs(ent), ResponsibleRepository._refs(model))
+            validate_refs(s, model.get_user_id(), refs)
 
+            old_user_id = ent.user_id
             ent.user_id = int(model.get_user_id())
             ent.name = model.get_name()
             ent.related_user_id = model.get_related_user_id()
@@ -94,6 +112,7 @@ class ResponsibleRepository:
                 raise ValueError("Dados inválidos ou violação de integridade") from e
 
             s.refresh(ent)
+            invalidate_users(_CACHE_KEY, [old_user_id, ent.user_id])
             return DTO.from_entity(ent)
 
     @staticmethod
@@ -105,10 +124,80 @@ class ResponsibleRepository:
             ent = s.get(ResponsibleEntity, int(responsible_id))
             if not ent:
                 raise ValueError("Responsável não encontrado")
+            user_id = ent.user_id
             try:
                 s.delete(ent)
                 s.commit()
             except IntegrityError as e:
                 s.rollback()
                 raise ValueError("Responsável não pode ser removido pois está em uso") from e
+            invalidate_users(_CACHE_KEY, [user_id])
+
+
+    # ---------------- Operações em lote (uma sessão/commit por lote) ----------------
+
+    @staticmethod
+    def bulk_create(models: List['Responsible']) -> BulkResult:
+        from services.responsibles import Responsible as DTO
+        result = BulkResult.sized(len(models))
+        valid = result.validate(models, ResponsibleRepository._validate_fields)
+        with Session(engine) as s:
+            owners = load_refs(s, (ResponsibleRepository._refs(m) for _, m in valid))
+            pending = []
+            for i, model in valid:
+                try:
+                    owners.check(model.get_user_id(), ResponsibleRepository._refs(model))
+                except ValueError as e:
+                    result.fail(i, str(e))
+                    continue
+                ent = model.to_entity()
+                s.add(ent)
+                pending.append((i, ent))
+            flush_and_commit(s, result, pending, DTO.from_entity)
+        invalidate_users(_CACHE_KEY, (m.get_user_id() for _, m in valid))
+        return result
+
+    @staticmethod
+    def bulk_update(models: List['Responsible']) -> BulkResult:
+        from services.responsibles import Responsible as DTO
+        result = BulkResult.sized(len(models))
+        valid = result.validate(models, ResponsibleRepository._validate_update)
+        with Session(engine) as s:
+            ents = load_by_ids(s, ResponsibleEntity, (m.get_id() for _, m in valid))
+            old_users = {e.user_id for e in ents.values()}
+            to_check = {
+                i: changed_refs(ResponsibleRepository._entity_refs(ents[int(m.get_id())]), ResponsibleRepository._refs(m))
+                for i, m in valid if int(m.get_id()) in ents
+            }
+            owners = load_refs(s, to_check.values())
+            pending = []
+            for i, model in valid:
+                ent = ents.get(int(model.get_id()))
+                try:
+                    if ent is None:
+                        raise ValueError("Responsável não encontrado")
+                    owners.check(model.get_user_id(), to_check[i])
+                except ValueError as e:
+                    result.fail(i, str(e))
+                    continue
+                ent.user_id = int(model.get_user_id())
+                ent.name = model.get_name()
+                ent.related_user_id = model.get_related_user_id()
+                pending.append((i, ent))
+            flush_and_commit(s, result, pending, DTO.from_entity)
+        invalidate_users(_CACHE_KEY, old_users | {m.get_user_id() for _, m in valid})
+        return result
 
+    @staticmethod
+    def bulk_delete(responsible_ids: List[int]) -> BulkResult:
+        with Session(engine) as s:
+            owners = owner_ids(s, ResponsibleEntity, responsible_ids)
+            result = delete_by_ids(
+                s,
+                ResponsibleEntity,
+                responsible_ids,
+                not_found="Responsável não encontrado",
+                in_use="Responsável não pode ser removido pois está em uso",
+            )
+        invalidate_users(_CACHE_KEY, owners)
+        return result
@@ -0,0 +1,119 @@
+from __future__ import annotations
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlmodel import Session, select
+from sqlalchemy import delete, func, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from db.session import engine
+from db.models import MonthlySummary as SummaryEntity, Transaction as TxEntity
+
+
+# Manutenção incremental da tabela MonthlySummary.
+# Cada escrita de transação vira um delta (soma, contagem) por chave
+# (user_id, year_month, type, category_id), aplicado com UPSERT na mesma
+# sessão — e portanto no mesmo commit — da escrita original.
+
+RollupKey = Tuple[int, str, str, int]
+RollupEntry = Tuple[RollupKey, int]  # (chave, valor em centavos)
+
+_KEY_COLUMNS = ["user_id", "year_month", "type", "category_id"]
+
+
+def make_entry(user_id: int, occurred_at, type: str, category_id: Optional[int], amount_cents: int) -> RollupEntry:
+    return (int(user_id), occurred_at.strftime("%Y-%m"), type, int(category_id or 0)), int(amount_cents)
+
+
+def rollup_entry(ent: TxEntity) -> Optional[RollupEntry]:
+    """Chave e valor com que a transação entra no resumo (None se não entra)."""
+    if ent.fixed or ent.occurred_at is None:
+        return None
+    return make_entry(ent.user_id, ent.occurred_at, ent.type, ent.category_id, ent.amount_cents)
+
+
+def merge_deltas(
+    added: Iterable[Optional[RollupEntry]] = (),
+    removed: Iterable[Optional[RollupEntry]] = (),
+) -> Dict[RollupKey, Tuple[int, int]]:
+    deltas: Dict[RollupKey, Tuple[int, int]] = {}
+    for entries, sign in ((added, 1), (removed, -1)):
+        for entry in entries:
+            if entry is None:
+                continue
+            key, amount = entry
+            total, count = deltas.get(key, (0, 0))
+            deltas[key] = (total + sign * amount, count + sign)
+    return {k: v for k, v in deltas.items() if v != (0, 0)}
+
+
+def apply_deltas(s: Session, deltas: Dict[RollupKey, Tuple[int, int]]) -> None:
+    """Soma os deltas no resumo (UPSERT) e remove as chaves que ficaram vazias."""
+    if not deltas:
+        return
+    rows = [
+        dict(zip(_KEY_COLUMNS, key), total_cents=total, count=count)
+        for key, (total, count) in deltas.items()
+    ]
+    stmt = sqlite_insert(SummaryEntity)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=_KEY_COLUMNS,
+        set_={
+            "total_cents": SummaryEntity.total_cents + stmt.excluded.total_cents,
+            "count": SummaryEntity.count + stmt.excluded.count,
+        },
+    )
+    s.exec(stmt, params=rows)
+    users = sorted({key[0] for key in deltas})
+    s.exec(delete(SummaryEntity).where(SummaryEntity.user_id.in_(users)).where(SummaryEntity.count <= 0))
+
+
+def _aggregate_query(user_id: Optional[int] = None):
+    year_month = func.strftime("%Y-%m", TxEntity.occurred_at)
+    category = func.coalesce(TxEntity.category_id, 0)
+    q = (
+        select(
+            TxEntity.user_id,
+            year_month,
+            TxEntity.type,
+            category,
+            func.sum(TxEntity.amount_cents),
+            func.count(),
+        )
+        .where(TxEntity.fixed == False)
+        .group_by(TxEntity.user_id, year_month, TxEntity.type, category)
+    )
+    if user_id is not None:
+        q = q.where(TxEntity.user_id == int(user_id))
+    return q
+
+
+def rebuild_rollups(user_id: Optional[int] = None) -> int:
+    """Recalcula o resumo a partir das transações (de um usuário ou de todos).
+    Retorna o número de linhas de resumo gravadas.
+    """
+    with Session(engine) as s:
+        clear = delete(SummaryEntity)
+        if user_id is not None:
+            clear = clear.where(SummaryEntity.user_id == int(user_id))
+        s.exec(clear)
+        s.exec(insert(SummaryEntity).from_select(_KEY_COLUMNS + ["total_cents", "count"], _aggregate_query(user_id)))
+        q = select(func.count()).select_from(SummaryEntity)
+        if user_id is not None:
+            q = q.where(SummaryEntity.user_id == int(user_id))
+        written = int(s.exec(q).one())
+        s.commit()
+        return written
+
+
+def verify_rollups(user_id: Optional[int] = None) -> List[RollupKey]:
+    """Compara o resumo com a agregação das transações; retorna as chaves divergentes."""
+    with Session(engine) as s:
+        expected = {tuple(r[:4]): (int(r[4]), int(r[5])) for r in s.exec(_aggregate_query(user_id)).all()}
+        q = select(SummaryEntity)
+        if user_id is not None:
+            q = q.where(SummaryEntity.user_id == int(user_id))
+        stored = {
+            (e.user_id, e.year_month, e.type, e.category_id): (int(e.total_cents), int(e.count))
+            for e in s.exec(q).all()
+        }
+    return [key for key in sorted(set(expected) | set(stored)) if expected.get(key) != stored.get(key)]
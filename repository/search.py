@@ -0,0 +1,59 @@
+from __future__ import annotations
+import re
+from typing import Any, List, Optional, Tuple
+
+from sqlmodel import Session, select
+from sqlalchemy import and_, column, func, literal_column, or_, table
+
+from repository.pagination import encode_cursor, decode_cursor
+
+
+# Busca textual sobre as tabelas FTS5 criadas em db/session.py (SEARCH_TABLES).
+# O texto digitado vira uma expressão MATCH segura; a ordenação é por bm25
+# (menor = mais relevante) e a paginação usa cursor (score, id).
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def match_expression(query: Optional[str]) -> Optional[str]:
+    """Texto livre -> expressão MATCH: cada palavra vira um prefixo entre aspas
+    e todas precisam aparecer ("agua luz" -> '"agua"* "luz"*'). None se vazio.
+    """
+    tokens = _TOKEN.findall(query or "")
+    if not tokens:
+        return None
+    return " ".join(f'"{tok}"*' for tok in tokens)
+
+
+def ranked_page(
+    s: Session,
+    entity,
+    fts_name: str,
+    filtered,
+    match: str,
+    limit: int,
+    cursor: Optional[str],
+) -> Tuple[List[Any], Optional[str]]:
+    """Entidades de `filtered` (um select(entity) com os filtros do repositório)
+    que casam com `match`, da mais para a menos relevante.
+    Retorna (entidades, próximo cursor); o cursor é None na última página.
+    """
+    fts = table(fts_name, column("rowid"))
+    score = func.bm25(literal_column(fts_name))
+    q = (
+        select(entity, score)
+        .join(fts, fts.c.rowid == entity.id)
+        .where(literal_column(fts_name).op("MATCH")(match))
+    )
+    if filtered.whereclause is not None:
+        q = q.where(filtered.whereclause)
+    after = decode_cursor(cursor, (float, int))
+    if after is not None:
+        q = q.where(or_(score > after[0], and_(score == after[0], entity.id > after[1])))
+    rows = s.exec(q.order_by(score, entity.id).limit(int(limit) + 1)).all()
+    ents = [ent for ent, _ in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit and ents:
+        last_ent, last_score = rows[limit - 1]
+        next_cursor = encode_cursor(float(last_score), last_ent.id)
+    return ents, next_cursor
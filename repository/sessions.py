@@ -0,0 +1,58 @@
+from __future__ import annotations
+from typing import Optional, Tuple
+
+from sqlmodel import Session, delete, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from db.session import engine
+from db.models import UserSession as SessionEntity
+
+
+# Armazenamento em SQLite das sessões de login (ver core/session.py), usado
+# com SESSION_STORE=sqlite. O cache em memória continua sendo a fonte das
+# leituras; a tabela só é consultada quando a chave não está na memória
+# (ex.: depois de reiniciar o servidor).
+
+class SessionRepository:
+    @staticmethod
+    def save(key: str, token: str, user_id: int, expires_at: int) -> None:
+        stmt = sqlite_insert(SessionEntity.__table__).values(
+            key=key, token=token, user_id=int(user_id), expires_at=int(expires_at),
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["key"],
+            set_={"token": stmt.excluded.token, "user_id": stmt.excluded.user_id, "expires_at": stmt.excluded.expires_at},
+        )
+        with Session(engine) as s:
+            s.exec(stmt)
+            s.commit()
+
+    @staticmethod
+    def get(key: str) -> Optional[Tuple[str, int, int]]:
+        """(token, user_id, expires_at) da sessão, ou None."""
+        with Session(engine) as s:
+            row = s.exec(
+                select(SessionEntity.token, SessionEntity.user_id, SessionEntity.expires_at)
+                .where(SessionEntity.key == key)
+            ).first()
+            return tuple(row) if row else None
+
+    @staticmethod
+    def delete(key: str) -> None:
+        with Session(engine) as s:
+            s.exec(delete(SessionEntity).where(SessionEntity.key == key))
+            s.commit()
+
+    @staticmethod
+    def delete_by_user(user_id: int) -> int:
+        with Session(engine) as s:
+            result = s.exec(delete(SessionEntity).where(SessionEntity.user_id == int(user_id)))
+            s.commit()
+            return int(result.rowcount or 0)
+
+    @staticmethod
+    def purge_expired(now: int) -> int:
+        with Session(engine) as s:
+            result = s.exec(delete(SessionEntity).where(SessionEntity.expires_at < int(now)))
+            s.commit()
+            return int(result.rowcount or 0)
@@ -0,0 +1,50 @@
+from __future__ import annotations
+from typing import List, Optional
+
+from sqlmodel import Session, delete, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from db.session import engine
+from db.models import LoginThrottle as ThrottleEntity
+
+
+# Estado do limitador de login (core/ratelimit.py) em SQLite, para vários
+# processos compartilharem os contadores (AUTH_RATE_STORE=sqlite). O estado
+# é a lista [window_start, prev_count, curr_count, strikes, blocked_until].
+
+_FIELDS = ("window_start", "prev_count", "curr_count", "strikes", "blocked_until")
+
+
+class LoginThrottleRepository:
+    @staticmethod
+    def get(key: str) -> Optional[List[float]]:
+        with Session(engine) as s:
+            row = s.exec(
+                select(*(getattr(ThrottleEntity, f) for f in _FIELDS)).where(ThrottleEntity.key == key)
+            ).first()
+            return list(row) if row else None
+
+    @staticmethod
+    def save(key: str, state: List[float], expires_at: float) -> None:
+        values = dict(zip(_FIELDS, state), key=key, expires_at=float(expires_at))
+        stmt = sqlite_insert(ThrottleEntity.__table__).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["key"],
+            set_={f: getattr(stmt.excluded, f) for f in _FIELDS + ("expires_at",)},
+        )
+        with Session(engine) as s:
+            s.exec(stmt)
+            s.commit()
+
+    @staticmethod
+    def delete(key: str) -> None:
+        with Session(engine) as s:
+            s.exec(delete(ThrottleEntity).where(ThrottleEntity.key == key))
+            s.commit()
+
+    @staticmethod
+    def purge_expired(now: float) -> int:
+        with Session(engine) as s:
+            result = s.exec(delete(ThrottleEntity).where(ThrottleEntity.expires_at < float(now)))
+            s.commit()
+            return int(result.rowcount or 0)
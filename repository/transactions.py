@@ -1,12 +1,19 @@
 from __future__ import annotations
-from typing import Optional, List, TYPE_CHECKING
-from datetime import datetime
+from typing import Any, Dict, Optional, List, Tuple, TYPE_CHECKING
+from datetime import date, datetime
 
 from sqlmodel import Session, select
+from sqlalchemy import bindparam, func, insert, tuple_, update
 from sqlalchemy.exc import IntegrityError
 
 from db.session import engine
-from db.models import Transaction as TxEntity, User as UserEntity, Category as CategoryEntity, DebtInstallment as InstallmentEntity
+from db.models import Transaction as TxEntity
+from repository.bulk import BulkResult, delete_by_ids, flush_and_commit, load_by_ids
+from repository.refs import changed_refs, load_refs, ref_map, validate_refs
+from repository.pagination import encode_cursor, decode_cursor
+from repository.search import match_expression, ranked_page
+from repository.rollups import apply_deltas, make_entry, merge_deltas, rollup_entry
+from services.money import to_cents
 
 if TYPE_CHECKING:
     from services.transactions import Transaction
@@ -18,33 +25,57 @@ ALLOWED_PERIODICITY = {"none", "monthly", "weekly", "yearly"}
 
 class TransactionRepository:
     @staticmethod
-    def _validate_refs(s: Session, model: 'Transaction') -> None:
-        if not s.get(UserEntity, int(model.get_user_id())):
-            raise ValueError("Usuário não encontrado")
-        if model.get_category_id() is not None:
-            if not s.get(CategoryEntity, int(model.get_category_id())):
-                raise ValueError("Categoria não encontrada")
-        if model.get_installment_id() is not None:
-            if not s.get(InstallmentEntity, int(model.get_installment_id())):
-                raise ValueError("Parcela não encontrada")
+    def _refs(model: 'Transaction') -> Dict[str, Optional[int]]:
+        # referências checadas por repository.refs, na ordem das mensagens
+        return ref_map(user=model.get_user_id(), category=model.get_category_id(), installment=model.get_installment_id())
 
     @staticmethod
-    def create(model: 'Transaction') -> 'Transaction':
+    def _entity_refs(ent: TxEntity) -> Dict[str, Optional[int]]:
+        return ref_map(user=ent.user_id, category=ent.category_id, installment=ent.installment_id)
+
+    @staticmethod
+    def _validate_fields(model: 'Transaction') -> None:
         if model.get_user_id() is None or int(model.get_user_id()) <= 0:
             raise ValueError("Usuário inválido")
-        if float(model.get_amount() or 0) <= 0:
+        if model.get_amount_cents() <= 0:
             raise ValueError("Valor inválido")
         if (model.get_type() or "").lower() not in ALLOWED_TYPES:
             raise ValueError("Tipo inválido (use 'income' ou 'expense')")
         if (model.get_periodicity() or "none").lower() not in ALLOWED_PERIODICITY:
             raise ValueError("Periodicidade inválida")
 
+    @staticmethod
+    def _validate_update(model: 'Transaction') -> None:
+        if model.get_id() is None:
+            raise ValueError("ID obrigatório para update")
+        TransactionRepository._validate_fields(model)
+
+    @staticmethod
+    def _apply(ent: TxEntity, model: 'Transaction') -> None:
+        ent.user_id = int(model.get_user_id())
+        ent.category_id = model.get_category_id()
+        ent.amount_cents = int(model.get_amount_cents())
+        ent.type = model.get_type().lower()
+        ent.fixed = bool(model.get_fixed())
+        ent.periodicity = (model.get_periodicity() or "none").lower()
+        ent.next_execution = model.get_next_execution()
+        ent.description = model.get_description()
+        ent.notes = model.get_notes()
+        ent.occurred_at = model.get_occurred_at() or ent.occurred_at
+        ent.installment_id = model.get_installment_id()
+
+    @staticmethod
+    def create(model: 'Transaction') -> 'Transaction':
+        TransactionRepository._validate_fields(model)
+
         with Session(engine) as s:
-            TransactionRepository._validate_refs(s, model)
+            validate_refs(s, model.get_user_id(), TransactionRepository._refs(model))
 
             ent = model.to_entity()
             s.add(ent)
             try:
+                s.flush()  # preenche os defaults (occurred_at) antes de calcular o resumo
+                apply_deltas(s, merge_deltas(added=[rollup_entry(ent)]))
                 s.commit()
             except IntegrityError as e:
                 s.rollback()
@@ -73,6 +104,47 @@ class TransactionRepository:
             )
             return [DTO.from_entity(e) for e in s.exec(q).all()]
 
+    @staticmethod
+    def _filtered_query(
+        user_id: int,
+        *,
+        type: Optional[str] = None,
+        category_id: Optional[int] = None,
+        fixed: Optional[bool] = None,
+        periodicity: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        installment_id: Optional[int] = None,
+    ):
+        q = select(TxEntity).where(TxEntity.user_id == int(user_id))
+        if type is not None:
+            t = type.lower()
+            if t not in ALLOWED_TYPES:
+                raise ValueError("Tipo inválido (use 'income' ou 'expense')")
+            q = q.where(TxEntity.type == t)
+        if category_id is not None:
+            q = q.where(TxEntity.category_id == int(category_id))
+        if fixed is not None:
+            q = q.where(TxEntity.fixed == bool(fixed))
+        if periodicity is not None:
+            p = periodicity.lower()
+            if p not in ALLOWED_PERIODICITY:
+                raise ValueError("Periodicidade inválida")
+            q = q.where(TxEntity.periodicity == p)
+        if start is not None:
+            q = q.where(TxEntity.occurred_at >= start)
+        if end is not None:
+            q = q.where(TxEntity.occurred_at <= end)
+        if min_amount is not None:
+            q = q.where(TxEntity.amount_cents >= to_cents(min_amount))
+        if max_amount is not None:
+            q = q.where(TxEntity.amount_cents <= to_cents(max_amount))
+        if installment_id is not None:
+            q = q.where(TxEntity.installment_id == int(installment_id))
+        return q
+
     @staticmethod
     def list_by_filters(
         user_id: int,
@@ -90,70 +162,109 @@ class TransactionRepository:
         offset: int = 0,
     ) -> List['Transaction']:
         from services.transactions import Transaction as DTO
+        q = TransactionRepository._filtered_query(
+            user_id,
+            type=type,
+            category_id=category_id,
+            fixed=fixed,
+            periodicity=periodicity,
+            start=start,
+            end=end,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            installment_id=installment_id,
+        )
         with Session(engine) as s:
-            q = select(TxEntity).where(TxEntity.user_id == int(user_id))
-            if type is not None:
-                t = type.lower()
-                if t not in ALLOWED_TYPES:
-                    raise ValueError("Tipo inválido (use 'income' ou 'expense')")
-                q = q.where(TxEntity.type == t)
-            if category_id is not None:
-                q = q.where(TxEntity.category_id == int(category_id))
-            if fixed is not None:
-                q = q.where(TxEntity.fixed == bool(fixed))
-            if periodicity is not None:
-                p = periodicity.lower()
-                if p not in ALLOWED_PERIODICITY:
-                    raise ValueError("Periodicidade inválida")
-                q = q.where(TxEntity.periodicity == p)
-            if start is not None:
-                q = q.where(TxEntity.occurred_at >= start)
-            if end is not None:
-                q = q.where(TxEntity.occurred_at <= end)
-            if min_amount is not None:
-                q = q.where(TxEntity.amount >= float(min_amount))
-            if max_amount is not None:
-                q = q.where(TxEntity.amount <= float(max_amount))
-            if installment_id is not None:
-                q = q.where(TxEntity.installment_id == int(installment_id))
             q = q.order_by(TxEntity.occurred_at.desc(), TxEntity.id.desc()).offset(offset).limit(limit)
             return [DTO.from_entity(e) for e in s.exec(q).all()]
 
+    @staticmethod
+    def list_page_by_filters(
+        user_id: int,
+        *,
+        type: Optional[str] = None,
+        category_id: Optional[int] = None,
+        fixed: Optional[bool] = None,
+        periodicity: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        min_amount: Optional[float] = None,
+        max_amount: Optional[float] = None,
+        installment_id: Optional[int] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List['Transaction'], Optional[str]]:
+        """Variante paginada por chave de list_by_filters (mesmos filtros e ordem).
+        Retorna (transações, próximo cursor); o cursor é None na última página.
+        """
+        from services.transactions import Transaction as DTO
+        q = TransactionRepository._filtered_query(
+            user_id,
+            type=type,
+            category_id=category_id,
+            fixed=fixed,
+            periodicity=periodicity,
+            start=start,
+            end=end,
+            min_amount=min_amount,
+            max_amount=max_amount,
+            installment_id=installment_id,
+        )
+        after = decode_cursor(cursor, (datetime, int))
+        if after is not None:
+            q = q.where(tuple_(TxEntity.occurred_at, TxEntity.id) < tuple_(*after))
+        with Session(engine) as s:
+            q = q.order_by(TxEntity.occurred_at.desc(), TxEntity.id.desc()).limit(int(limit) + 1)
+            ents = s.exec(q).all()
+            rows = [DTO.from_entity(e) for e in ents[:limit]]
+        next_cursor = None
+        if len(ents) > limit and rows:
+            last = rows[-1]
+            next_cursor = encode_cursor(last.get_occurred_at(), last.get_id())
+        return rows, next_cursor
+
+    @staticmethod
+    def search(
+        user_id: int,
+        query: str,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        *,
+        type: Optional[str] = None,
+        fixed: Optional[bool] = None,
+        category_id: Optional[int] = None,
+    ) -> Tuple[List['Transaction'], Optional[str]]:
+        """Busca textual em descrição/notas (índice FTS5), com os filtros de
+        list_by_filters. Resultados do mais para o menos relevante;
+        retorna (transações, próximo cursor).
+        """
+        from services.transactions import Transaction as DTO
+        match = match_expression(query)
+        if match is None:
+            return [], None
+        q = TransactionRepository._filtered_query(user_id, type=type, fixed=fixed, category_id=category_id)
+        with Session(engine) as s:
+            ents, next_cursor = ranked_page(s, TxEntity, "transaction_fts", q, match, limit, cursor)
+            return [DTO.from_entity(e) for e in ents], next_cursor
+
     @staticmethod
     def update(model: 'Transaction') -> 'Transaction':
         from services.transactions import Transaction as DTO
-        if model.get_id() is None:
-            raise ValueError("ID obrigatório para update")
-        if model.get_user_id() is None or int(model.get_user_id()) <= 0:
-            raise ValueError("Usuário inválido")
-        if float(model.get_amount() or 0) <= 0:
-            raise ValueError("Valor inválido")
-        if (model.get_type() or "").lower() not in ALLOWED_TYPES:
-            raise ValueError("Tipo inválido (use 'income' ou 'expense')")
-        if (model.get_periodicity() or "none").lower() not in ALLOWED_PERIODICITY:
-            raise ValueError("Periodicidade inválida")
+        TransactionRepository._validate_update(model)
 
         with Session(engine) as s:
             ent = s.get(TxEntity, model.get_id())
             if not ent:
                 raise ValueError("Transação não encontrada")
 
-            TransactionRepository._validate_refs(s, model)
-
-            ent.user_id = int(model.get_user_id())
-            ent.category_id = model.get_category_id()
-            ent.amount = float(model.get_amount())
-            ent.type = model.get_type().lower()
-            ent.fixed = bool(model.get_fixed())
-            ent.periodicity = (model.get_periodicity() or "none").lower()
-            ent.next_execution = model.get_next_execution()
-            ent.description = model.get_description()
-            ent.notes = model.get_notes()
-            ent.occurred_at = model.get_occurred_at() or ent.occurred_at
-            ent.installment_id = model.get_installment_id()
+            refs = changed_refs(TransactionRepository._entity_refs(ent), TransactionRepository._refs(model))
+            validate_refs(s, model.get_user_id(), refs)
+            before = rollup_entry(ent)
+            TransactionRepository._apply(ent, model)
 
             try:
                 s.add(ent)
+                apply_deltas(s, merge_deltas(added=[rollup_entry(ent)], removed=[before]))
                 s.commit()
             except IntegrityError as e:
                 s.rollback()
@@ -171,9 +282,208 @@ class TransactionRepository:
             if not ent:
                 raise ValueError("Transação não encontrada")
             try:
+                apply_deltas(s, merge_deltas(removed=[rollup_entry(ent)]))
                 s.delete(ent)
                 s.commit()
             except IntegrityError as e:
                 s.rollback()
                 raise ValueError("Transação não pode ser removida pois está em uso") from e
 
+
+    # ---------------- Operações em lote (uma sessão/commit por lote) ----------------
+
+    @staticmethod
+    def bulk_create(models: List['Transaction']) -> BulkResult:
+        from services.transactions import Transaction as DTO
+        result = BulkResult.sized(len(models))
+        valid = result.validate(models, TransactionRepository._validate_fields)
+        with Session(engine) as s:
+            owners = load_refs(s, (TransactionRepository._refs(m) for _, m in valid))
+            pending = []
+            for i, model in valid:
+                try:
+                    owners.check(model.get_user_id(), TransactionRepository._refs(model))
+                except ValueError as e:
+                    result.fail(i, str(e))
+                    continue
+                ent = model.to_entity()
+                s.add(ent)
+                pending.append((i, ent))
+            flush_and_commit(
+                s, result, pending, DTO.from_entity,
+                before_commit=lambda: apply_deltas(s, merge_deltas(added=[rollup_entry(e) for _, e in pending])),
+            )
+        return result
+
+    @staticmethod
+    def bulk_update(models: List['Transaction']) -> BulkResult:
+        from services.transactions import Transaction as DTO
+        result = BulkResult.sized(len(models))
+        valid = result.validate(models, TransactionRepository._validate_update)
+        with Session(engine) as s:
+            ents = load_by_ids(s, TxEntity, (m.get_id() for _, m in valid))
+            to_check = {
+                i: changed_refs(TransactionRepository._entity_refs(ents[int(m.get_id())]), TransactionRepository._refs(m))
+                for i, m in valid if int(m.get_id()) in ents
+            }
+            owners = load_refs(s, to_check.values())
+            pending = []
+            added, removed = [], []
+            for i, model in valid:
+                ent = ents.get(int(model.get_id()))
+                try:
+                    if ent is None:
+                        raise ValueError("Transação não encontrada")
+                    owners.check(model.get_user_id(), to_check[i])
+                except ValueError as e:
+                    result.fail(i, str(e))
+                    continue
+                removed.append(rollup_entry(ent))
+                TransactionRepository._apply(ent, model)
+                added.append(rollup_entry(ent))
+                pending.append((i, ent))
+            deltas = merge_deltas(added=added, removed=removed)
+            flush_and_commit(s, result, pending, DTO.from_entity, before_commit=lambda: apply_deltas(s, deltas))
+        return result
+
+    @staticmethod
+    def bulk_delete(tx_ids: List[int]) -> BulkResult:
+        with Session(engine) as s:
+            return delete_by_ids(
+                s,
+                TxEntity,
+                tx_ids,
+                not_found="Transação não encontrada",
+                in_use="Transação não pode ser removida pois está em uso",
+                before_delete=TransactionRepository._remove_from_rollups,
+            )
+
+    @staticmethod
+    def _remove_from_rollups(s: Session, tx_ids: List[int]) -> None:
+        ents = s.exec(select(TxEntity).where(TxEntity.id.in_(tx_ids))).all()
+        apply_deltas(s, merge_deltas(removed=[rollup_entry(e) for e in ents]))
+
+    # ---------------- Importação de extratos (ver services.importers) ----------------
+
+    @staticmethod
+    def max_id() -> int:
+        with Session(engine) as s:
+            return int(s.exec(select(func.max(TxEntity.id))).one() or 0)
+
+    @staticmethod
+    def list_import_keys(
+        user_id: int, start: datetime, end: datetime, max_id: int
+    ) -> List[Tuple[int, datetime, str, int, Optional[str]]]:
+        """(id, occurred_at, type, amount_cents, description) das transações
+        avulsas do usuário em [start, end) com id <= max_id, para a detecção
+        de duplicadas. Só lê as colunas da chave (índice user_id, fixed, occurred_at).
+        """
+        q = (
+            select(TxEntity.id, TxEntity.occurred_at, TxEntity.type, TxEntity.amount_cents, TxEntity.description)
+            .where(TxEntity.user_id == int(user_id))
+            .where(TxEntity.fixed == False)
+            .where(TxEntity.occurred_at >= start)
+            .where(TxEntity.occurred_at < end)
+            .where(TxEntity.id <= int(max_id))
+        )
+        with Session(engine) as s:
+            return [tuple(row) for row in s.exec(q).all()]
+
+    @staticmethod
+    def insert_imported(user_id: int, category_id: Optional[int], rows: List[Dict[str, Any]]) -> int:
+        """Grava um bloco de lançamentos importados (dicts com amount_cents,
+        type, description, notes e occurred_at) num único executemany, com os
+        resumos mensais no mesmo commit. Retorna quantos foram gravados.
+        """
+        if not rows:
+            return 0
+        table = TxEntity.__table__
+        values = [
+            dict(
+                r, user_id=int(user_id), category_id=category_id,
+                fixed=False, periodicity="none", next_execution=None, installment_id=None,
+            )
+            for r in rows
+        ]
+        with Session(engine) as s:
+            validate_refs(s, user_id, ref_map(user=user_id, category=category_id))
+            try:
+                s.connection().execute(insert(table), values)
+                apply_deltas(s, merge_deltas(added=[
+                    make_entry(v["user_id"], v["occurred_at"], v["type"], v["category_id"], v["amount_cents"])
+                    for v in values
+                ]))
+                s.commit()
+            except IntegrityError as e:
+                s.rollback()
+                raise ValueError("Dados inválidos ou violação de integridade") from e
+        return len(values)
+
+    # ---------------- Recorrência (ver services.recurrence) ----------------
+
+    @staticmethod
+    def list_due_recurring(until: date, limit: int = 5000) -> List['Transaction']:
+        """Transações fixas com next_execution <= until, das mais atrasadas para as mais novas.
+        A ordem (next_execution, id) é a do índice ix_transaction_fixed_next_execution,
+        então o SQLite lê só o bloco pedido, sem ordenar todas as regras vencidas.
+        """
+        from services.transactions import Transaction as DTO
+        cols = (
+            TxEntity.id, TxEntity.user_id, TxEntity.category_id, TxEntity.amount_cents, TxEntity.type,
+            TxEntity.periodicity, TxEntity.next_execution, TxEntity.description, TxEntity.notes,
+            TxEntity.occurred_at,
+        )
+        q = (
+            select(*cols)
+            .where(TxEntity.fixed == True)
+            .where(TxEntity.next_execution <= until)
+            .where(TxEntity.periodicity.in_(ALLOWED_PERIODICITY - {"none"}))
+            .order_by(TxEntity.next_execution, TxEntity.id)
+            .limit(int(limit))
+        )
+        with Session(engine) as s:
+            return [
+                DTO(
+                    id=r[0], user_id=r[1], category_id=r[2], amount_cents=r[3], type=r[4], fixed=True,
+                    periodicity=r[5], next_execution=r[6], description=r[7], notes=r[8], occurred_at=r[9],
+                )
+                for r in s.exec(q).all()
+            ]
+
+    @staticmethod
+    def materialize_occurrences(occurrences: List[Dict[str, Any]], advances: List[Dict[str, Any]]) -> int:
+        """Insere as ocorrências geradas e avança next_execution das regras, num único commit.
+        `occurrences`: dicts com user_id, category_id, amount_cents, type, description, notes, occurred_at.
+        `advances`: dicts com rule_id, old (next_execution lido) e new.
+        O avanço só vale se next_execution ainda for o valor lido; se outra execução
+        já tiver avançado alguma regra, nada é gravado e ValueError é lançado.
+        """
+        if not advances:
+            return 0
+        table = TxEntity.__table__
+        rows = [
+            dict(o, fixed=False, periodicity="none", next_execution=None, installment_id=None)
+            for o in occurrences
+        ]
+        advance = (
+            update(table)
+            .where(table.c.id == bindparam("rule_id"))
+            .where(table.c.next_execution == bindparam("old"))
+            .values(next_execution=bindparam("new"))
+        )
+        with Session(engine) as s:
+            try:
+                moved = s.connection().execute(advance, advances).rowcount
+                if moved != len(advances):
+                    raise ValueError("Regras de recorrência alteradas por outra execução")
+                if rows:
+                    s.connection().execute(insert(table), rows)
+                    apply_deltas(s, merge_deltas(added=[
+                        make_entry(o["user_id"], o["occurred_at"], o["type"], o["category_id"], o["amount_cents"])
+                        for o in rows
+                    ]))
+                s.commit()
+            except IntegrityError as e:
+                s.rollback()
+                raise ValueError("Dados inválidos ou violação de integridade") from e
+        return len(rows)
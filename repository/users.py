@@ -1,8 +1,9 @@
 from __future__ import annotations
-from typing import Optional, List, TYPE_CHECKING
+from typing import Optional, List, Set, TYPE_CHECKING
 from datetime import datetime, timezone
 
 from sqlmodel import Session, select
+from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError
 
 from db.session import engine
@@ -64,6 +65,35 @@ class UserRepository:
             q = select(UserEntity).order_by(UserEntity.id).offset(offset).limit(limit)
             return [UserDTO.from_entity(e) for e in s.exec(q).all()]
 
+    @staticmethod
+    def update_password_hash(user_id: int, password_hash: bytes) -> None:
+        if not isinstance(password_hash, (bytes, bytearray)) or len(password_hash) == 0:
+            raise ValueError("Senha hash inválida")
+        with Session(engine) as s:
+            ent = s.get(UserEntity, user_id)
+            if not ent:
+                raise ValueError("Usuário não encontrado")
+            ent.password_hash = bytes(password_hash)
+            ent.updated_at = datetime.now(timezone.utc)
+            s.add(ent)
+            s.commit()
+        from core.session import invalidate_user
+        invalidate_user(user_id)
+
+    @staticmethod
+    def count_profile_image_refs(path: str) -> int:
+        """Quantos usuários usam `path` como imagem de perfil (o arquivo é
+        compartilhado quando a mesma foto é enviada mais de uma vez)."""
+        with Session(engine) as s:
+            q = select(func.count()).select_from(UserEntity).where(UserEntity.profile_image == path)
+            return int(s.exec(q).one())
+
+    @staticmethod
+    def list_profile_images() -> Set[str]:
+        with Session(engine) as s:
+            q = select(UserEntity.profile_image).where(UserEntity.profile_image.is_not(None)).distinct()
+            return set(s.exec(q).all())
+
     @staticmethod
     def update(model: 'User') -> 'User':
         from services.users import User as UserDTO
@@ -97,4 +127,7 @@ class UserRepository:
                 raise ValueError("CPF já cadastrado ou dados inválidos") from e
 
             s.refresh(ent)
+            # current_user() guarda o DTO em cache; força a releitura
+            from core.session import invalidate_user
+            invalidate_user(ent.id)
             return UserDTO.from_entity(ent)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Ensure project root on sys.path when running from scripts/
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from core import config
+from core.kdf import pbkdf2_sha256
+
+# Below this the hash is too cheap to brute-force against, whatever the host
+MIN_ITERATIONS = 100_000
+PROBE_ITERATIONS = 50_000
+
+
+def _time_kdf(iterations: int, rounds: int) -> float:
+    """Median seconds for one PBKDF2-SHA256 run with `iterations`."""
+    salt = os.urandom(16)
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        pbkdf2_sha256(b"calibration-password", salt, iterations)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Recommend a PBKDF2 iteration count for a target login latency")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Desired time for one password check (default: 250)")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed runs per measurement")
+    args = parser.parse_args()
+
+    _time_kdf(PROBE_ITERATIONS, 1)  # warm-up
+    per_iteration = _time_kdf(PROBE_ITERATIONS, args.rounds) / PROBE_ITERATIONS
+    recommended = int(args.target_ms / 1000 / per_iteration) // 10_000 * 10_000
+    recommended = max(MIN_ITERATIONS, recommended)
+
+    current_s = _time_kdf(config.KDF_ITERATIONS, args.rounds)
+    recommended_s = _time_kdf(recommended, args.rounds)
+    workers = max(1, config.KDF_WORKERS)
+
+    print(f"Host: {os.cpu_count()} CPU(s), {per_iteration * 1e9:.0f} ns per iteration")
+    print(f"Configured: {config.KDF_ITERATIONS} iterations -> {current_s * 1000:.0f} ms per check")
+    print(f"Recommended: {recommended} iterations -> {recommended_s * 1000:.0f} ms per check "
+          f"(target {args.target_ms:.0f} ms)")
+    print(f"With {workers} KDF worker(s): about {workers / recommended_s:.1f} logins/s before queueing")
+    if recommended == MIN_ITERATIONS and recommended_s * 1000 > args.target_ms:
+        print(f"Note: {MIN_ITERATIONS} is the minimum accepted; this host cannot meet the target")
+    print(f"\nexport AUTH_KDF_ITERATIONS={recommended}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
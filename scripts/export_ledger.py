@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Ensure project root on sys.path when running from scripts/
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Default DB_PATH to project data/ if not provided
+os.environ.setdefault("DB_PATH", str(ROOT / "data" / "app.db"))
+
+from db.session import init_db
+from repository.export import EXPORT_TABLES
+from repository.users import UserRepository
+from services.export import FORMATS, LedgerExporter
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Export a user's transactions, debts and installments")
+    who = parser.add_mutually_exclusive_group(required=True)
+    who.add_argument("--user-id", type=int, help="Owner user id")
+    who.add_argument("--cpf", help="Owner CPF (11 digits)")
+    parser.add_argument("--format", choices=FORMATS, default="csv", help="Output format (parquet needs pyarrow)")
+    parser.add_argument("--out", default="export", help="Output directory, or a .zip file")
+    parser.add_argument("--tables", nargs="+", choices=EXPORT_TABLES, default=None, help="Tables to export (default: all)")
+    parser.add_argument("--chunk-size", type=int, default=LedgerExporter.CHUNK_SIZE, help="Rows read per chunk")
+    args = parser.parse_args()
+
+    init_db()
+    user_id = args.user_id
+    if args.cpf:
+        user = UserRepository.get_by_cpf(''.join(ch for ch in args.cpf if ch.isdigit()))
+        if not user:
+            print("Error: user not found")
+            return 1
+        user_id = user.get_id()
+
+    try:
+        if args.out.lower().endswith(".zip"):
+            with open(args.out, "wb") as f:
+                result = LedgerExporter.export_zip(user_id, f, args.format, args.tables, args.chunk_size)
+        else:
+            result = LedgerExporter.export_dir(user_id, args.out, args.format, args.tables, args.chunk_size)
+    except Exception as e:
+        print(f"Error: {e}")
+        return 2
+    for table, rows in result.rows.items():
+        print(f"{table}: {rows} row(s) -> {result.files[table]}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
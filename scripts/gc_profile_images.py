@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Ensure project root on sys.path when running from scripts/
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Default DB_PATH to project data/ if not provided
+os.environ.setdefault("DB_PATH", str(ROOT / "data" / "app.db"))
+
+from db.session import init_db
+import db.models  # noqa: F401  (registers the tables for init_db)
+from services.profile_images import GC_GRACE_SECONDS, PROFILE_DIR, collect_garbage
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Delete profile images no user references")
+    parser.add_argument("--dir", default=None, help=f"Image directory (default: {PROFILE_DIR}, relative to the project root)")
+    parser.add_argument("--grace", type=float, default=GC_GRACE_SECONDS, help="Keep files modified in the last N seconds")
+    parser.add_argument("--dry-run", action="store_true", help="Only list what would be deleted")
+    args = parser.parse_args()
+
+    init_db()
+    directory = Path(args.dir) if args.dir else ROOT / PROFILE_DIR
+    removed = collect_garbage(directory, grace_seconds=args.grace, dry_run=args.dry_run, root=ROOT)
+    for path in removed:
+        print(("Would delete: " if args.dry_run else "Deleted: ") + path)
+    print(f"{len(removed)} unreferenced file(s)" + (" (dry run)" if args.dry_run else " deleted"))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Ensure project root on sys.path when running from scripts/
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Default DB_PATH to project data/ if not provided
+os.environ.setdefault("DB_PATH", str(ROOT / "data" / "app.db"))
+
+from db.session import init_db
+from repository.users import UserRepository
+from services.importers import FORMATS, StatementImporter
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import CSV/OFX bank statements as transactions")
+    parser.add_argument("files", nargs="+", help="Statement files (.csv, .ofx, .qfx)")
+    who = parser.add_mutually_exclusive_group(required=True)
+    who.add_argument("--user-id", type=int, help="Owner user id")
+    who.add_argument("--cpf", help="Owner CPF (11 digits)")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="File format (default: by extension/content)")
+    parser.add_argument("--category-id", type=int, default=None, help="Category for the imported transactions")
+    parser.add_argument("--encoding", default=None, help="Text encoding (default: utf-8 for CSV, OFX header for OFX)")
+    parser.add_argument("--batch-size", type=int, default=StatementImporter.BATCH_SIZE, help="Rows per transaction")
+    args = parser.parse_args()
+
+    init_db()
+    user_id = args.user_id
+    if args.cpf:
+        user = UserRepository.get_by_cpf(''.join(ch for ch in args.cpf if ch.isdigit()))
+        if not user:
+            print("Error: user not found")
+            return 1
+        user_id = user.get_id()
+
+    status = 0
+    for path in args.files:
+        try:
+            result = StatementImporter.run(
+                user_id,
+                path,
+                fmt=args.format,
+                category_id=args.category_id,
+                encoding=args.encoding,
+                batch_size=args.batch_size,
+            )
+        except Exception as e:
+            # Blocos já gravados ficam; rodar de novo pula o que já foi importado
+            print(f"{path}: error: {e}")
+            status = 2
+            continue
+        print(
+            f"{path}: read {result.read}, imported {result.imported}, "
+            f"skipped {result.duplicates} duplicate(s), {result.failed} invalid"
+        )
+        for line, message in result.errors:
+            print(f"  line {line}: {message}")
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Ensure project root on sys.path when running from scripts/
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Default DB_PATH to project data/ if not provided
+os.environ.setdefault("DB_PATH", str(ROOT / "data" / "app.db"))
+
+from db.session import init_db
+from repository.rollups import rebuild_rollups, verify_rollups
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild or verify the monthly summary table")
+    parser.add_argument("--user-id", type=int, default=None, help="Only this user (default: all users)")
+    parser.add_argument("--verify", action="store_true", help="Only compare the summary with the transactions")
+    args = parser.parse_args()
+
+    init_db()
+    if args.verify:
+        mismatches = verify_rollups(args.user_id)
+        for key in mismatches:
+            print(f"Mismatch: user_id={key[0]} month={key[1]} type={key[2]} category_id={key[3]}")
+        print("Summary OK" if not mismatches else f"{len(mismatches)} mismatching row(s)")
+        return 0 if not mismatches else 1
+
+    written = rebuild_rollups(args.user_id)
+    print(f"Summary rebuilt: {written} row(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
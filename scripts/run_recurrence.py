@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+import argparse
+import os
+import sys
+from datetime import date
+from pathlib import Path
+
+# Ensure project root on sys.path when running from scripts/
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Default DB_PATH to project data/ if not provided
+os.environ.setdefault("DB_PATH", str(ROOT / "data" / "app.db"))
+
+from db.session import init_db
+from services.recurrence import RecurrenceEngine
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Generate the due occurrences of fixed (recurring) transactions")
+    parser.add_argument("--until", type=date.fromisoformat, default=None, help="Last due date to process, YYYY-MM-DD (default: today, UTC)")
+    parser.add_argument("--chunk-size", type=int, default=RecurrenceEngine.CHUNK_SIZE, help="Rules per transaction")
+    args = parser.parse_args()
+
+    init_db()
+    try:
+        result = RecurrenceEngine.run(until=args.until, chunk_size=args.chunk_size)
+    except Exception as e:
+        # Blocos já gravados ficam; basta rodar de novo para continuar
+        print(f"Error: {e}")
+        return 2
+    print(f"Processed {result.rules} rule(s), created {result.created} transaction(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,8 +1,10 @@
 from __future__ import annotations
 from typing import Optional
 from datetime import date, datetime
+from decimal import Decimal
 
 from db.models import DebtInstallment as DebtInstallmentEntity
+from services.money import cents_to_decimal, from_cents, to_cents
 
 
 class DebtInstallment:
@@ -15,11 +17,13 @@ class DebtInstallment:
         due_on: Optional[date] = None,
         paid: bool = False,
         paid_at: Optional[datetime] = None,
+        amount_cents: Optional[int] = None,
     ):
         self._id = id
         self._debt_id = debt_id
         self._number = number
-        self._amount = amount
+        # valor em centavos; `amount` (reais) é aceito por conveniência
+        self._amount_cents = int(amount_cents) if amount_cents is not None else to_cents(amount)
         self._due_on = due_on
         self._paid = paid
         self._paid_at = paid_at
@@ -35,7 +39,13 @@ class DebtInstallment:
         return self._number
 
     def get_amount(self) -> float:
-        return self._amount
+        return from_cents(self._amount_cents)
+
+    def get_amount_cents(self) -> int:
+        return self._amount_cents
+
+    def get_amount_decimal(self) -> Decimal:
+        return cents_to_decimal(self._amount_cents)
 
     def get_due_on(self) -> Optional[date]:
         return self._due_on
@@ -54,7 +64,10 @@ class DebtInstallment:
         self._number = v
 
     def set_amount(self, v: float) -> None:
-        self._amount = v
+        self._amount_cents = to_cents(v)
+
+    def set_amount_cents(self, v: int) -> None:
+        self._amount_cents = int(v)
 
     def set_due_on(self, v: date) -> None:
         self._due_on = v
@@ -72,7 +85,7 @@ class DebtInstallment:
             id=e.id,
             debt_id=e.debt_id,
             number=e.number,
-            amount=e.amount,
+            amount_cents=e.amount_cents,
             due_on=e.due_on,
             paid=e.paid,
             paid_at=e.paid_at,
@@ -83,7 +96,7 @@ class DebtInstallment:
             id=self._id,
             debt_id=self._debt_id,
             number=self._number,
-            amount=self._amount,
+            amount_cents=self._amount_cents,
             due_on=self._due_on,
             paid=self._paid,
             paid_at=self._paid_at,
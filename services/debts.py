@@ -2,8 +2,19 @@ from __future__ import annotations
 import calendar
 from typing import Optional
 from datetime import date
+from decimal import Decimal
 
 from db.models import Debt as DebtEntity
+from services.money import cents_to_decimal, from_cents, to_cents
+
+
+def add_months(base: date, months: int) -> date:
+    """Soma meses a uma data, limitando o dia ao fim do mês (31/01 + 1 = 28/02)."""
+    month_index = (base.month - 1) + months
+    year = base.year + month_index // 12
+    month = (month_index % 12) + 1
+    day = min(base.day, calendar.monthrange(year, month)[1])
+    return date(year, month, day)
 
 
 class Debt:
@@ -20,6 +31,7 @@ class Debt:
         installments: int = 1,
         notes: Optional[str] = None,
         paid: bool = False,
+        total_amount_cents: Optional[int] = None,
     ):
         self._id = id
         self._user_id = user_id
@@ -28,7 +40,10 @@ class Debt:
         self._responsible_id = responsible_id
         self._debt_date = debt_date
         self._description = description
-        self._total_amount = total_amount
+        # valor em centavos; `total_amount` (reais) é aceito por conveniência
+        self._total_amount_cents = (
+            int(total_amount_cents) if total_amount_cents is not None else to_cents(total_amount)
+        )
         self._installments = installments
         self._notes = notes
         self._paid = paid
@@ -41,7 +56,9 @@ class Debt:
     def get_responsible_id(self) -> Optional[int]: return self._responsible_id
     def get_debt_date(self) -> Optional[date]: return self._debt_date
     def get_description(self) -> Optional[str]: return self._description
-    def get_total_amount(self) -> float: return self._total_amount
+    def get_total_amount(self) -> float: return from_cents(self._total_amount_cents)
+    def get_total_amount_cents(self) -> int: return self._total_amount_cents
+    def get_total_amount_decimal(self) -> Decimal: return cents_to_decimal(self._total_amount_cents)
     def get_installments(self) -> int: return self._installments
     def get_notes(self) -> Optional[str]: return self._notes
     def get_paid(self) -> bool: return self._paid
@@ -52,11 +69,7 @@ class Debt:
         if not start or installments <= 0:
             return None
 
-        month_index = (start.month - 1) + (installments - 1)
-        year = start.year + month_index // 12
-        month = (month_index % 12) + 1
-        day = min(start.day, calendar.monthrange(year, month)[1])
-        return date(year, month, day)
+        return add_months(start, installments - 1)
 
     # setters
     def set_user_id(self, v: int) -> None: self._user_id = v
@@ -65,7 +78,8 @@ class Debt:
     def set_responsible_id(self, v: Optional[int]) -> None: self._responsible_id = v
     def set_debt_date(self, v: date) -> None: self._debt_date = v
     def set_description(self, v: Optional[str]) -> None: self._description = v
-    def set_total_amount(self, v: float) -> None: self._total_amount = v
+    def set_total_amount(self, v: float) -> None: self._total_amount_cents = to_cents(v)
+    def set_total_amount_cents(self, v: int) -> None: self._total_amount_cents = int(v)
     def set_installments(self, v: int) -> None: self._installments = v
     def set_notes(self, v: Optional[str]) -> None: self._notes = v
     def set_paid(self, v: bool) -> None: self._paid = v
@@ -81,7 +95,7 @@ class Debt:
             responsible_id=e.responsible_id,
             debt_date=e.debt_date,
             description=e.description,
-            total_amount=e.total_amount,
+            total_amount_cents=e.total_amount_cents,
             installments=e.installments,
             notes=e.notes,
             paid=e.paid,
@@ -96,7 +110,7 @@ class Debt:
             responsible_id=self._responsible_id,
             debt_date=self._debt_date,
             description=self._description,
-            total_amount=self._total_amount,
+            total_amount_cents=self._total_amount_cents,
             installments=self._installments,
             notes=self._notes,
             paid=self._paid,
@@ -0,0 +1,147 @@
+from __future__ import annotations
+import csv
+import importlib.util
+import io
+import os
+import tempfile
+import zipfile
+from dataclasses import dataclass, field
+from typing import BinaryIO, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Exportação do histórico completo de um usuário (transações, dívidas e
+# parcelas) em CSV ou Parquet. As linhas vêm em blocos de CHUNK_SIZE
+# (repository/export.py) e cada bloco é escrito e descartado antes do
+# próximo: a memória usada não depende do tamanho do histórico.
+# Parquet exige pyarrow instalado (opcional); sem ele só há CSV.
+#
+# Valores monetários saem em centavos (colunas *_cents), como no banco; no CSV
+# datas e booleanos também saem como gravados (texto ISO e 0/1).
+
+FORMATS = ("csv", "parquet")
+
+_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet"}
+
+
+def available_formats() -> Tuple[str, ...]:
+    if importlib.util.find_spec("pyarrow") is None:
+        return ("csv",)
+    return FORMATS
+
+
+@dataclass
+class ExportResult:
+    files: Dict[str, str] = field(default_factory=dict)  # tabela -> caminho (ou nome no zip)
+    rows: Dict[str, int] = field(default_factory=dict)
+
+
+def write_csv(chunks: Iterable[Sequence[tuple]], columns: List[Tuple[str, str]], stream: BinaryIO) -> int:
+    """Escreve cabeçalho + blocos em `stream` (UTF-8). Espera as linhas cruas
+    (stream_rows(raw=True)): datas em texto ISO e booleanos 0/1 vão como estão.
+    Retorna o número de linhas.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    try:
+        writer = csv.writer(text)
+        writer.writerow([name for name, _ in columns])
+        total = 0
+        for chunk in chunks:
+            writer.writerows(chunk)
+            total += len(chunk)
+        text.flush()
+    finally:
+        text.detach()  # não fecha o arquivo de quem chamou
+    return total
+
+
+def _arrow_schema(columns: List[Tuple[str, str]]):
+    import pyarrow as pa
+
+    types = {"int": pa.int64(), "bool": pa.bool_(), "date": pa.date32(), "datetime": pa.timestamp("us", tz="UTC"), "str": pa.string()}
+    return pa.schema([(name, types[kind]) for name, kind in columns])
+
+
+def write_parquet(chunks: Iterable[Sequence[tuple]], columns: List[Tuple[str, str]], path: str) -> int:
+    """Escreve cada bloco como um row group do arquivo Parquet em `path`."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _arrow_schema(columns)
+    total = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in chunks:
+            arrays = [
+                pa.array([row[i] for row in chunk], type=schema.field(i).type)
+                for i in range(len(columns))
+            ]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            total += len(chunk)
+    return total
+
+
+class LedgerExporter:
+    CHUNK_SIZE = 10_000
+
+    @staticmethod
+    def _check(fmt: str, tables: Optional[Sequence[str]]) -> List[str]:
+        from repository.export import EXPORT_TABLES
+
+        if fmt not in FORMATS:
+            raise ValueError(f"Formato inválido: {fmt!r} (use {', '.join(FORMATS)})")
+        if fmt not in available_formats():
+            raise ValueError("Exportação em Parquet requer o pacote pyarrow")
+        selected = list(tables or EXPORT_TABLES)
+        for table in selected:
+            if table not in EXPORT_TABLES:
+                raise ValueError(f"Tabela de exportação inválida: {table!r} (use {', '.join(EXPORT_TABLES)})")
+        return selected
+
+    @staticmethod
+    def export_dir(
+        user_id: int,
+        out_dir: str,
+        fmt: str = "csv",
+        tables: Optional[Sequence[str]] = None,
+        chunk_size: Optional[int] = None,
+    ) -> ExportResult:
+        """Grava um arquivo por tabela em `out_dir` (<tabela>.csv/.parquet)."""
+        from repository.export import columns, snapshot, stream_rows
+
+        selected = LedgerExporter._check(fmt, tables)
+        chunk_size = int(chunk_size or LedgerExporter.CHUNK_SIZE)
+        os.makedirs(out_dir, exist_ok=True)
+        result = ExportResult()
+        with snapshot() as conn:
+            for table in selected:
+                path = os.path.join(out_dir, table + _EXTENSIONS[fmt])
+                chunks = stream_rows(conn, table, user_id, chunk_size, raw=(fmt == "csv"))
+                if fmt == "parquet":
+                    rows = write_parquet(chunks, columns(table), path)
+                else:
+                    with open(path, "wb") as f:
+                        rows = write_csv(chunks, columns(table), f)
+                result.files[table] = path
+                result.rows[table] = rows
+        return result
+
+    @staticmethod
+    def export_zip(
+        user_id: int,
+        stream: BinaryIO,
+        fmt: str = "csv",
+        tables: Optional[Sequence[str]] = None,
+        chunk_size: Optional[int] = None,
+    ) -> ExportResult:
+        """Mesmo conteúdo de export_dir, compactado num zip escrito em `stream`.
+        Os arquivos passam por um diretório temporário (o Parquet precisa de
+        um arquivo de verdade) e entram no zip um de cada vez.
+        """
+        with tempfile.TemporaryDirectory(prefix="pinanca-export-") as tmp:
+            written = LedgerExporter.export_dir(user_id, tmp, fmt, tables, chunk_size)
+            result = ExportResult(rows=dict(written.rows))
+            with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+                for table, path in written.files.items():
+                    name = os.path.basename(path)
+                    zf.write(path, arcname=name)
+                    result.files[table] = name
+        return result
@@ -0,0 +1,17 @@
+from services.importers.base import RowError, StatementRow, dedup_key, parse_amount
+from services.importers.csv_reader import read_csv
+from services.importers.importer import FORMATS, ImportResult, StatementImporter, detect_format
+from services.importers.ofx_reader import read_ofx
+
+__all__ = [
+    "FORMATS",
+    "ImportResult",
+    "RowError",
+    "StatementImporter",
+    "StatementRow",
+    "dedup_key",
+    "detect_format",
+    "parse_amount",
+    "read_csv",
+    "read_ofx",
+]
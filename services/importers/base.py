@@ -0,0 +1,101 @@
+from __future__ import annotations
+import re
+import unicodedata
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from typing import Optional, Tuple
+
+from services.money import to_cents
+
+
+# Tipos e conversões comuns aos leitores de extrato (CSV e OFX).
+# Os leitores entregam uma linha por vez — StatementRow ou RowError — para que
+# o arquivo inteiro nunca precise estar em memória e um lançamento ruim não
+# interrompa a importação.
+
+
+@dataclass
+class StatementRow:
+    line: int  # posição no arquivo (linha do CSV ou n-ésimo STMTTRN do OFX)
+    occurred_on: date
+    amount_cents: int  # com sinal: negativo = saída
+    description: Optional[str] = None
+    notes: Optional[str] = None
+
+    @property
+    def type(self) -> str:
+        return "expense" if self.amount_cents < 0 else "income"
+
+
+@dataclass
+class RowError:
+    line: int
+    message: str
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Minúsculas, sem acentos e com espaços colapsados (cabeçalhos e descrições)."""
+    text = unicodedata.normalize("NFKD", value or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(text.split()).casefold()
+
+
+def dedup_key(occurred_on: date, type: str, amount_cents: int, description: Optional[str]) -> Tuple[date, str, int, str]:
+    """Chave com que um lançamento é comparado aos já gravados do usuário."""
+    return occurred_on, type, abs(int(amount_cents)), normalize_text(description)
+
+
+_CURRENCY = re.compile(r"[^\d,.\-+()]")
+
+
+def parse_amount(raw: Optional[str]) -> int:
+    """Texto do extrato -> centavos com sinal.
+    Aceita "1.234,56", "1,234.56", "-12,30", "R$ 10", "(12.30)" e "12.30-".
+    Com só um tipo de separador, vírgula é sempre decimal e ponto só é milhar
+    quando aparece mais de uma vez ("1.234.567").
+    """
+    text = _CURRENCY.sub("", raw or "")
+    negative = text.startswith("-") or text.endswith("-") or (text.startswith("(") and text.endswith(")"))
+    text = text.strip("+-()")
+    if not text:
+        raise ValueError("Valor inválido")
+    if "," in text and "." in text:
+        if text.rfind(",") > text.rfind("."):
+            text = text.replace(".", "").replace(",", ".")
+        else:
+            text = text.replace(",", "")
+    elif "," in text:
+        text = text.replace(".", "").replace(",", ".")
+    elif text.count(".") > 1:
+        text = text.replace(".", "")
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        raise ValueError("Valor inválido") from None
+    cents = to_cents(value)
+    return -cents if negative else cents
+
+
+DATE_FORMATS = ("%d/%m/%Y", "%Y-%m-%d", "%d/%m/%y", "%d-%m-%Y", "%Y/%m/%d", "%d.%m.%Y", "%Y%m%d")
+
+
+class DateParser:
+    """parse_date que lembra o último formato que funcionou (um extrato usa
+    sempre o mesmo), evitando testar todos a cada linha.
+    """
+
+    def __init__(self, formats: Tuple[str, ...] = DATE_FORMATS) -> None:
+        self.formats = list(formats)
+
+    def __call__(self, raw: Optional[str]) -> date:
+        text = (raw or "").strip()
+        for i, fmt in enumerate(self.formats):
+            try:
+                value = datetime.strptime(text, fmt).date()
+            except ValueError:
+                continue
+            if i:
+                self.formats.insert(0, self.formats.pop(i))
+            return value
+        raise ValueError(f"Data inválida: {text!r}")
@@ -0,0 +1,101 @@
+from __future__ import annotations
+import csv
+import io
+from itertools import chain
+from typing import BinaryIO, Dict, Iterator, List, Mapping, Optional, Union
+
+from services.importers.base import DateParser, RowError, StatementRow, normalize_text, parse_amount
+
+
+# Leitor de extratos em CSV. O delimitador é detectado numa amostra do início
+# do arquivo e as colunas pelo cabeçalho (nomes em português ou inglês, sem
+# diferenciar acentos/maiúsculas); `columns` força um mapeamento explícito.
+# Valor pode vir numa coluna com sinal ou em duas (crédito/débito).
+
+HEADER_ALIASES: Dict[str, tuple] = {
+    "date": ("data", "date", "dt", "data lancamento", "data do lancamento", "data movimento", "data da transacao"),
+    "description": ("descricao", "description", "historico", "lancamento", "memo", "estabelecimento", "detalhes"),
+    "amount": ("valor", "amount", "value", "valor (r$)", "valor r$", "quantia"),
+    "credit": ("credito", "entrada", "credit", "credito (r$)"),
+    "debit": ("debito", "saida", "debit", "debito (r$)"),
+    "notes": ("notas", "observacao", "observacoes", "obs", "notes", "complemento"),
+}
+
+SAMPLE_SIZE = 16 * 1024
+
+
+def _text_stream(stream: BinaryIO, encoding: str) -> io.TextIOBase:
+    return io.TextIOWrapper(stream, encoding=encoding, errors="replace", newline="")
+
+
+def _map_header(header: List[str], columns: Optional[Mapping[str, str]]) -> Dict[str, int]:
+    names = [normalize_text(h) for h in header]
+    if columns:
+        wanted = {field: normalize_text(name) for field, name in columns.items()}
+    else:
+        wanted = {}
+        for field, aliases in HEADER_ALIASES.items():
+            for alias in aliases:
+                if alias in names:
+                    wanted[field] = alias
+                    break
+    index = {field: names.index(name) for field, name in wanted.items() if name in names}
+    if "date" not in index or not ({"amount", "credit", "debit"} & index.keys()):
+        raise ValueError("Cabeçalho do CSV sem colunas de data e valor")
+    return index
+
+
+def read_csv(
+    source: Union[BinaryIO, io.TextIOBase],
+    encoding: str = "utf-8-sig",
+    delimiter: Optional[str] = None,
+    columns: Optional[Mapping[str, str]] = None,
+) -> Iterator[Union[StatementRow, RowError]]:
+    """Lê o extrato linha a linha. `source` pode ser binário (decodificado com
+    `encoding`) ou texto. Linhas em branco são ignoradas; linhas que não
+    convertem viram RowError com o número da linha.
+    """
+    text = source if isinstance(source, io.TextIOBase) else _text_stream(source, encoding)
+    sample = text.read(SAMPLE_SIZE)
+    sample += text.readline()  # completa a última linha da amostra
+    if delimiter is None:
+        try:
+            delimiter = csv.Sniffer().sniff(sample, delimiters=";,\t|").delimiter
+        except csv.Error:
+            delimiter = ";" if sample.count(";") > sample.count(",") else ","
+    reader = csv.reader(chain(io.StringIO(sample, newline=""), text), delimiter=delimiter)
+
+    header = next(reader, None)
+    if header is None:
+        return
+    index = _map_header(header, columns)
+    parse_date = DateParser()
+
+    def cell(row: List[str], field: str) -> str:
+        i = index.get(field)
+        return row[i].strip() if i is not None and i < len(row) else ""
+
+    for row in reader:
+        if not any(v.strip() for v in row):
+            continue
+        line = reader.line_num
+        try:
+            occurred_on = parse_date(cell(row, "date"))
+            if "amount" in index:
+                amount = parse_amount(cell(row, "amount"))
+            else:
+                credit, debit = cell(row, "credit"), cell(row, "debit")
+                amount = abs(parse_amount(credit)) if credit else -abs(parse_amount(debit))
+        except ValueError as e:
+            yield RowError(line, str(e))
+            continue
+        if amount == 0:
+            yield RowError(line, "Valor inválido")
+            continue
+        yield StatementRow(
+            line=line,
+            occurred_on=occurred_on,
+            amount_cents=amount,
+            description=cell(row, "description") or None,
+            notes=cell(row, "notes") or None,
+        )
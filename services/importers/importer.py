@@ -0,0 +1,172 @@
+from __future__ import annotations
+import os
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from services.importers.base import RowError, StatementRow, dedup_key
+from services.importers.csv_reader import read_csv
+from services.importers.ofx_reader import read_ofx
+
+
+_MIDNIGHT_UTC = time(0, 0, 0, tzinfo=timezone.utc)
+
+FORMATS = ("csv", "ofx")
+
+Source = Union[str, "os.PathLike[str]", BinaryIO]
+
+
+@dataclass
+class ImportResult:
+    read: int = 0  # lançamentos lidos (válidos ou não)
+    imported: int = 0
+    duplicates: int = 0
+    failed: int = 0
+    errors: List[Tuple[int, str]] = field(default_factory=list)  # (linha, mensagem), até MAX_ERRORS
+
+
+def detect_format(name: Optional[str], head: bytes = b"") -> str:
+    """"csv" ou "ofx", pela extensão do arquivo ou, sem ela, pelo conteúdo."""
+    ext = os.path.splitext(name or "")[1].lower()
+    if ext in (".ofx", ".qfx"):
+        return "ofx"
+    if ext in (".csv", ".txt"):
+        return "csv"
+    upper = head.lstrip()[:512].upper()
+    return "ofx" if upper.startswith(b"OFXHEADER") or b"<OFX>" in upper else "csv"
+
+
+@contextmanager
+def _open(source: Source) -> Iterator[BinaryIO]:
+    if hasattr(source, "read"):
+        yield source  # type: ignore[misc]
+    else:
+        with open(source, "rb") as f:
+            yield f
+
+
+def _head(stream: BinaryIO, size: int = 512) -> bytes:
+    """Primeiros bytes do arquivo sem consumi-los (para detect_format)."""
+    if hasattr(stream, "peek"):
+        return stream.peek(size)[:size]
+    if stream.seekable():
+        pos = stream.tell()
+        head = stream.read(size)
+        stream.seek(pos)
+        return head
+    return b""
+
+
+class StatementImporter:
+    """Importa um extrato (CSV ou OFX) como transações avulsas do usuário.
+    O arquivo é lido em fluxo e gravado em blocos de BATCH_SIZE lançamentos,
+    cada bloco no seu próprio commit (uma inserção executemany + resumos).
+    Lançamentos iguais — mesmo dia, tipo, valor e descrição — a transações
+    que já existiam antes da importação são pulados; a comparação é por
+    contagem, então dois cafés iguais no extrato contra um já lançado
+    importam só o segundo. Reimportar o mesmo arquivo (ou retomar uma
+    importação interrompida) não duplica nada.
+    """
+
+    BATCH_SIZE = 5000
+    MAX_ERRORS = 100
+
+    @staticmethod
+    def rows(stream: BinaryIO, fmt: str, encoding: Optional[str] = None) -> Iterator[Union[StatementRow, RowError]]:
+        if fmt == "ofx":
+            return read_ofx(stream, encoding=encoding)
+        if fmt == "csv":
+            return read_csv(stream, encoding=encoding or "utf-8-sig")
+        raise ValueError(f"Formato inválido: {fmt!r} (use {', '.join(FORMATS)})")
+
+    @staticmethod
+    def run(
+        user_id: int,
+        source: Source,
+        fmt: Optional[str] = None,
+        category_id: Optional[int] = None,
+        encoding: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        progress: Optional[Callable[[ImportResult], None]] = None,
+    ) -> ImportResult:
+        """Importa `source` (caminho ou arquivo binário) para `user_id`.
+        `progress` é chamado com o resultado parcial depois de cada bloco.
+        """
+        from repository.transactions import TransactionRepository
+
+        if user_id is None or int(user_id) <= 0:
+            raise ValueError("Usuário inválido")
+        batch_size = int(batch_size or StatementImporter.BATCH_SIZE)
+        result = ImportResult()
+        # só transações que já existiam contam como duplicadas: as que esta
+        # importação grava têm id maior que o de agora
+        baseline = TransactionRepository.max_id()
+        consumed: Set[int] = set()
+
+        with _open(source) as stream:
+            if fmt is None:
+                fmt = detect_format(getattr(stream, "name", None) or str(source), _head(stream))
+            batch: List[StatementRow] = []
+            for item in StatementImporter.rows(stream, fmt, encoding):
+                result.read += 1
+                if isinstance(item, RowError):
+                    StatementImporter._fail(result, item.line, item.message)
+                    continue
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    StatementImporter._flush(int(user_id), category_id, batch, baseline, consumed, result)
+                    batch = []
+                    if progress:
+                        progress(result)
+            if batch:
+                StatementImporter._flush(int(user_id), category_id, batch, baseline, consumed, result)
+                if progress:
+                    progress(result)
+        return result
+
+    @staticmethod
+    def _fail(result: ImportResult, line: int, message: str) -> None:
+        result.failed += 1
+        if len(result.errors) < StatementImporter.MAX_ERRORS:
+            result.errors.append((line, message))
+
+    @staticmethod
+    def _flush(
+        user_id: int,
+        category_id: Optional[int],
+        batch: List[StatementRow],
+        baseline: int,
+        consumed: Set[int],
+        result: ImportResult,
+    ) -> None:
+        from repository.transactions import TransactionRepository
+
+        first = min(r.occurred_on for r in batch)
+        last = max(r.occurred_on for r in batch)
+        existing: Dict[Tuple[date, str, int, str], List[int]] = defaultdict(list)
+        for tx_id, occurred_at, type_, amount_cents, description in TransactionRepository.list_import_keys(
+            user_id,
+            datetime.combine(first, _MIDNIGHT_UTC),
+            datetime.combine(last + timedelta(days=1), _MIDNIGHT_UTC),
+            max_id=baseline,
+        ):
+            if tx_id not in consumed:
+                existing[dedup_key(occurred_at.date(), type_, amount_cents, description)].append(tx_id)
+
+        rows: List[Dict[str, Any]] = []
+        for r in batch:
+            matches = existing.get(dedup_key(r.occurred_on, r.type, r.amount_cents, r.description))
+            if matches:
+                consumed.add(matches.pop())
+                result.duplicates += 1
+                continue
+            rows.append({
+                "amount_cents": abs(r.amount_cents),
+                "type": r.type,
+                "description": r.description,
+                "notes": r.notes,
+                "occurred_at": datetime.combine(r.occurred_on, _MIDNIGHT_UTC),
+            })
+        result.imported += TransactionRepository.insert_imported(user_id, category_id, rows)
@@ -0,0 +1,92 @@
+from __future__ import annotations
+import codecs
+import html
+import re
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple, Union
+
+from services.importers.base import DateParser, RowError, StatementRow, parse_amount
+
+
+# Leitor de extratos OFX/QFX. Cobre tanto o OFX 1.x (SGML, tags de valor sem
+# fechamento) quanto o 2.x (XML): o arquivo é lido em blocos e varrido como
+# uma sequência de tags, sem montar a árvore, e cada <STMTTRN> vira uma linha.
+# Os valores vêm escapados (&amp;, &lt;, &#233;...) nas duas versões.
+
+CHUNK_SIZE = 64 * 1024
+HEADER_SIZE = 4096  # onde o cabeçalho declara a codificação
+
+_TAG = re.compile(r"<(/?)([A-Za-z0-9_.]+)[^>]*>([^<]*)")
+_XML_ENCODING = re.compile(rb"encoding=[\"']([A-Za-z0-9_\-]+)[\"']")
+
+
+def _detect_encoding(head: bytes) -> str:
+    """Codificação declarada no cabeçalho (CHARSET:1252 nos bancos brasileiros)."""
+    match = _XML_ENCODING.search(head)
+    if match:
+        return match.group(1).decode("ascii")
+    upper = head.upper()
+    if b"CHARSET:1252" in upper or b"ENCODING:USASCII" in upper:
+        return "cp1252"
+    if b"CHARSET:8859-1" in upper or b"CHARSET:ISO-8859-1" in upper:
+        return "latin-1"
+    return "utf-8"
+
+
+def _tags(stream: BinaryIO, encoding: Optional[str]) -> Iterator[Tuple[bool, str, str]]:
+    """(fechamento, NOME, texto até a próxima tag) para cada tag do arquivo."""
+    head = stream.read(HEADER_SIZE)
+    decoder = codecs.getincrementaldecoder(encoding or _detect_encoding(head))(errors="replace")
+    buffer = decoder.decode(head)
+    chunk = head
+    while True:
+        done = not chunk
+        # só varre até o último '<': a tag seguinte pode estar cortada no bloco
+        cut = len(buffer) if done else buffer.rfind("<")
+        if cut > 0:
+            for match in _TAG.finditer(buffer, 0, cut):
+                closing, name, value = match.groups()
+                yield bool(closing), name.upper(), value.strip()
+            buffer = buffer[cut:]
+        if done:
+            return
+        chunk = stream.read(CHUNK_SIZE)
+        buffer += decoder.decode(chunk, final=not chunk)
+
+
+def read_ofx(stream: BinaryIO, encoding: Optional[str] = None) -> Iterator[Union[StatementRow, RowError]]:
+    """Lê os lançamentos (<STMTTRN>) do extrato; a codificação vem do cabeçalho
+    se `encoding` não for informada.
+    """
+    parse_date = DateParser(("%Y%m%d",))
+    fields: Optional[Dict[str, str]] = None
+    number = 0
+    for closing, name, value in _tags(stream, encoding):
+        if name == "STMTTRN":
+            if not closing:
+                fields = {}
+                number += 1
+                continue
+            if fields is None:
+                continue
+            try:
+                occurred_on = parse_date(fields.get("DTPOSTED", "")[:8])
+                amount = parse_amount(fields.get("TRNAMT"))
+            except ValueError as e:
+                yield RowError(number, str(e))
+            else:
+                if amount == 0:
+                    yield RowError(number, "Valor inválido")
+                else:
+                    name_, memo = fields.get("NAME"), fields.get("MEMO")
+                    parts = [p for p in (name_, memo) if p]
+                    if len(parts) == 2 and parts[0] == parts[1]:
+                        parts = parts[:1]
+                    yield StatementRow(
+                        line=number,
+                        occurred_on=occurred_on,
+                        amount_cents=amount,
+                        description=" - ".join(parts) or None,
+                    )
+            fields = None
+        elif fields is not None and not closing and value:
+            fields[name] = html.unescape(value)
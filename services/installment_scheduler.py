@@ -0,0 +1,111 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Dict, List
+
+from services.debts import Debt, add_months
+from services.debt_installments import DebtInstallment
+
+
+@dataclass
+class ReconcileResult:
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.created or self.updated or self.deleted)
+
+
+class InstallmentScheduler:
+    """Mantém as parcelas de uma dívida em sincronia com o cadastro da dívida.
+    O cronograma esperado é calculado em memória e comparado, pelo número da
+    parcela, com o que está salvo; só as diferenças vão para o banco, numa
+    única transação.
+    """
+
+    @staticmethod
+    def target_schedule(debt: Debt) -> List[DebtInstallment]:
+        """Parcelas esperadas para a dívida (sem id e sem estado de pagamento)."""
+        count = max(1, int(debt.get_installments() or 1))
+        total = debt.get_total_amount_cents()
+        if total <= 0:
+            return []
+        base_date = debt.get_debt_date() or date.today()
+        if isinstance(base_date, datetime):
+            base_date = base_date.date()
+        return [
+            DebtInstallment(
+                debt_id=debt.get_id(),
+                number=idx + 1,
+                amount_cents=total,
+                due_on=add_months(base_date, idx),
+            )
+            for idx in range(count)
+        ]
+
+    @staticmethod
+    def reconcile(debt: Debt) -> ReconcileResult:
+        """Insere, altera e remove apenas as parcelas que diferem do esperado.
+        Parcelas mantidas preservam paid/paid_at; novas parcelas herdam o status
+        da dívida. Se a dívida está paga, as parcelas em aberto são quitadas; se
+        foi reaberta com todas as parcelas pagas, elas voltam a ficar em aberto.
+        """
+        from repository.debt_installments import DebtInstallmentRepository
+
+        result = ReconcileResult()
+        if not debt or debt.get_id() is None:
+            return result
+        target = InstallmentScheduler.target_schedule(debt)
+        if not target:
+            return result
+
+        stored: Dict[int, DebtInstallment] = {}
+        to_delete: List[int] = []
+        for inst in DebtInstallmentRepository.list_by_debt(debt.get_id(), limit=None):
+            # Números duplicados (de sincronizações antigas) são descartados
+            if inst.get_number() in stored:
+                to_delete.append(inst.get_id())
+            else:
+                stored[inst.get_number()] = inst
+
+        debt_paid = bool(debt.get_paid())
+        now = datetime.now(timezone.utc)
+        target_numbers = {t.get_number() for t in target}
+        kept = [inst for number, inst in stored.items() if number in target_numbers]
+        to_create = [t for t in target if t.get_number() not in stored]
+        reopen = not debt_paid and not to_create and bool(kept) and all(i.get_paid() for i in kept)
+
+        to_update: List[DebtInstallment] = []
+        for wanted in target:
+            inst = stored.get(wanted.get_number())
+            if inst is None:
+                wanted.set_paid(debt_paid)
+                wanted.set_paid_at(now if debt_paid else None)
+                continue
+            changed = False
+            if inst.get_due_on() != wanted.get_due_on():
+                inst.set_due_on(wanted.get_due_on())
+                changed = True
+            if inst.get_amount_cents() != wanted.get_amount_cents():
+                inst.set_amount_cents(wanted.get_amount_cents())
+                changed = True
+            if debt_paid and not inst.get_paid():
+                inst.set_paid(True)
+                inst.set_paid_at(now)
+                changed = True
+            elif reopen:
+                inst.set_paid(False)
+                inst.set_paid_at(None)
+                changed = True
+            if changed:
+                to_update.append(inst)
+
+        to_delete.extend(inst.get_id() for number, inst in stored.items() if number not in target_numbers)
+
+        DebtInstallmentRepository.apply_schedule(debt.get_id(), to_create, to_update, to_delete)
+        result.created = len(to_create)
+        result.updated = len(to_update)
+        result.deleted = len(to_delete)
+        return result
@@ -0,0 +1,65 @@
+from __future__ import annotations
+import math
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from numbers import Integral, Real
+from typing import TYPE_CHECKING, Optional, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+# Valores monetários são guardados como inteiros em centavos (R$ 12,34 -> 1234).
+# A conversão de/para reais acontece só nas bordas (formulários, tabelas e DTOs);
+# somas e comparações usam os inteiros, sem erro de arredondamento de float.
+# numpy/pandas só são importados pelas versões vetorizadas, para que DTOs e
+# repositórios não os carreguem na inicialização.
+
+Number = Union[int, float, str, Decimal]
+
+_CENT = Decimal("0.01")
+
+
+def to_cents(value: Optional[Number]) -> int:
+    """Converte um valor em reais para centavos, arredondando meio centavo para cima.
+    ValueError para texto não numérico e infinito.
+    """
+    if value is None:
+        return 0
+    if isinstance(value, Integral) and not isinstance(value, bool):
+        return int(value) * 100
+    if isinstance(value, Real):
+        if math.isnan(value):
+            return 0
+        value = repr(float(value))  # repr dá o decimal mais curto: 0.1 -> '0.1'
+    try:
+        return int((Decimal(str(value)).quantize(_CENT, rounding=ROUND_HALF_UP) * 100).to_integral_value())
+    except (InvalidOperation, ValueError) as e:
+        raise ValueError("Valor inválido") from e
+
+
+def from_cents(cents: Optional[int]) -> float:
+    """Centavos -> reais como float (para exibição e widgets)."""
+    return int(cents or 0) / 100
+
+
+def cents_to_decimal(cents: Optional[int]) -> Decimal:
+    """Centavos -> reais como Decimal exato."""
+    return (Decimal(int(cents or 0)) / 100).quantize(_CENT)
+
+
+def series_to_cents(values: "pd.Series") -> "pd.Series":
+    """Versão vetorizada de to_cents para uma coluna em reais (NaN -> 0)."""
+    import numpy as np
+    import pandas as pd
+
+    arr = pd.to_numeric(values, errors="coerce").fillna(0.0).to_numpy(dtype="float64")
+    # np.round é "meio para o par"; o deslocamento por sinal reproduz ROUND_HALF_UP
+    cents = np.trunc(arr * 100 + np.copysign(0.5, arr) + np.copysign(1e-9, arr))
+    return pd.Series(cents.astype(np.int64), index=values.index)
+
+
+def series_from_cents(values: "pd.Series") -> "pd.Series":
+    """Coluna em centavos (inteiros) -> reais (float64)."""
+    import numpy as np
+
+    return values.astype(np.int64) / 100
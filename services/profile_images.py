@@ -0,0 +1,222 @@
+from __future__ import annotations
+import base64
+import hashlib
+import io
+import mimetypes
+import os
+import tempfile
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+
+# Imagens de perfil. No upload a foto vira uma miniatura quadrada de
+# THUMB_SIZE px em WebP (gerada uma vez só); na exibição o data URI de cada
+# arquivo é montado uma vez por processo e reaproveitado pelos reruns,
+# com cache LRU por (caminho, mtime, tamanho) — trocar o arquivo invalida.
+# Pillow (dependência do Streamlit) é opcional: sem ele o arquivo é gravado
+# e exibido como veio.
+#
+# Os arquivos ficam em PROFILE_DIR com o nome igual ao SHA-256 do conteúdo:
+# a mesma imagem é gravada uma vez só, não importa quantos usuários a usem,
+# e o caminho de um conteúdo nunca muda. A contagem de referências é a
+# própria coluna User.profile_image; a imagem trocada é apagada quando
+# ninguém mais a usa e o resto é recolhido por scripts/gc_profile_images.py.
+#
+# Variáveis de ambiente: AVATAR_CACHE_SIZE (entradas do cache, padrão 64),
+# PROFILE_IMAGE_DIR (padrão data/profile_images).
+
+THUMB_SIZE = 320
+THUMB_QUALITY = 80
+# acima disso, arquivos antigos (gravados sem miniatura) são reduzidos na exibição
+MAX_INLINE_BYTES = 256 * 1024
+
+AVATAR_CACHE_SIZE = int(os.getenv("AVATAR_CACHE_SIZE", "64"))
+
+PROFILE_DIR = Path(os.getenv("PROFILE_IMAGE_DIR", "data/profile_images"))
+TMP_PREFIX = ".tmp-"
+# arquivos mais novos que isso não são apagados (envio em andamento)
+GC_GRACE_SECONDS = 3600
+
+
+def _pil():
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        return None
+    return Image, ImageOps
+
+
+def make_thumbnail(data: bytes, size: int = THUMB_SIZE) -> Optional[bytes]:
+    """Miniatura quadrada (recorte central) em WebP, ou None sem Pillow.
+    ValueError se `data` não for uma imagem.
+    """
+    pil = _pil()
+    if pil is None:
+        return None
+    Image, ImageOps = pil
+    try:
+        with Image.open(io.BytesIO(data)) as img:
+            img = ImageOps.exif_transpose(img)  # fotos de celular vêm giradas pelo EXIF
+            img = img.convert("RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB")
+            thumb = ImageOps.fit(img, (size, size), method=Image.LANCZOS)
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError("Imagem inválida") from e
+    out = io.BytesIO()
+    thumb.save(out, format="WEBP", quality=THUMB_QUALITY, method=4)
+    return out.getvalue()
+
+
+def _fsync_dir(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:  # Windows não abre diretórios
+        return
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_atomic(dest: Path, data: bytes) -> None:
+    """Grava em um temporário do mesmo diretório, faz fsync e renomeia: quem
+    lê `dest` vê o arquivo inteiro ou nenhum."""
+    fd, tmp = tempfile.mkstemp(prefix=TMP_PREFIX, dir=dest.parent)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, dest)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(dest.parent)
+
+
+def store_blob(data: bytes, suffix: str, directory: Path = PROFILE_DIR) -> str:
+    """Grava `data` em `directory/<sha256><suffix>` e retorna o caminho.
+    Conteúdo repetido reaproveita o arquivo existente (só renova o mtime,
+    para o GC não apagá-lo antes de o usuário ser gravado).
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    dest = directory / f"{hashlib.sha256(data).hexdigest()}{suffix.lower()}"
+    try:
+        os.utime(dest)
+    except FileNotFoundError:
+        _write_atomic(dest, data)
+    return str(dest)
+
+
+def save_profile_image(data: bytes, original_name: str, directory: Path = PROFILE_DIR) -> str:
+    """Grava a miniatura (ou, sem Pillow, o arquivo original) no repositório
+    de imagens e retorna o caminho.
+    """
+    thumb = make_thumbnail(data)
+    if thumb is not None:
+        data, suffix = thumb, ".webp"
+    else:
+        suffix = "".join(Path(original_name or "").suffixes) or ".png"
+    return store_blob(data, suffix, directory)
+
+
+def _in_store(path: Path, directory: Path) -> bool:
+    return path.resolve().parent == directory.resolve()
+
+
+def release_profile_image(path: Optional[str], directory: Path = PROFILE_DIR) -> bool:
+    """Apaga a imagem `path` (trocada ou removida) se ela é do repositório
+    de imagens e nenhum usuário a usa mais. Arquivos tocados há menos de
+    GC_GRACE_SECONDS ficam (podem ser de um envio ainda não gravado); o GC
+    os recolhe depois. Retorna True se apagou.
+    """
+    from repository.users import UserRepository
+
+    if not path or not _in_store(Path(path), directory):
+        return False
+    if UserRepository.count_profile_image_refs(path):
+        return False
+    try:
+        if time.time() - os.stat(path).st_mtime < GC_GRACE_SECONDS:
+            return False
+        os.unlink(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def collect_garbage(
+    directory: Path = PROFILE_DIR,
+    grace_seconds: Optional[float] = None,
+    dry_run: bool = False,
+    root: Optional[Path] = None,
+) -> List[str]:
+    """Apaga de `directory` os arquivos que nenhum usuário referencia
+    (inclusive nomes antigos em uuid e temporários abandonados) e que não
+    foram tocados nos últimos `grace_seconds`. Caminhos relativos gravados no
+    banco são resolvidos a partir de `root` (padrão: diretório atual).
+    Retorna os caminhos apagados (ou que seriam, com `dry_run`).
+    """
+    from repository.users import UserRepository
+
+    if grace_seconds is None:
+        grace_seconds = GC_GRACE_SECONDS
+    if not directory.is_dir():
+        return []
+    base = Path(root) if root is not None else Path.cwd()
+    referenced = {(base / p).resolve() for p in UserRepository.list_profile_images()}
+    cutoff = time.time() - grace_seconds
+    removed: List[str] = []
+    for entry in os.scandir(directory):
+        if not entry.is_file(follow_symlinks=False):
+            continue
+        path = Path(entry.path)
+        if path.resolve() in referenced or entry.stat().st_mtime > cutoff:
+            continue
+        if not dry_run:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                continue
+        removed.append(str(path))
+    return sorted(removed)
+
+
+def _encode(data: bytes, mime: str) -> str:
+    return f"data:{mime};base64,{base64.b64encode(data).decode('ascii')}"
+
+
+@lru_cache(maxsize=AVATAR_CACHE_SIZE)
+def _cached_data_uri(path: str, mtime_ns: int, size: int) -> str:
+    with open(path, "rb") as f:
+        data = f.read()
+    if size > MAX_INLINE_BYTES:
+        try:
+            thumb = make_thumbnail(data)
+        except ValueError:
+            thumb = None
+        if thumb is not None:
+            return _encode(thumb, "image/webp")
+    mime, _ = mimetypes.guess_type(path)
+    return _encode(data, mime or "image/png")
+
+
+def image_data_uri(path: Optional[str]) -> str:
+    """data URI da imagem em `path` ("" se não existir ou não puder ser lida)."""
+    if not path:
+        return ""
+    try:
+        st = os.stat(path)
+        return _cached_data_uri(os.path.abspath(path), st.st_mtime_ns, st.st_size)
+    except OSError:
+        return ""
+
+
+def cache_info() -> Tuple[int, int, int]:
+    """(acertos, faltas, tamanho atual) do cache de data URIs."""
+    info = _cached_data_uri.cache_info()
+    return info.hits, info.misses, info.currsize
@@ -0,0 +1,88 @@
+from __future__ import annotations
+import calendar
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from services.debts import add_months
+from services.transactions import Transaction
+
+
+_MIDNIGHT_UTC = time(0, 0, 0, tzinfo=timezone.utc)
+
+
+@dataclass
+class RecurrenceResult:
+    rules: int = 0
+    created: int = 0
+
+
+class RecurrenceEngine:
+    """Gera as ocorrências concretas das transações fixas vencidas.
+    Cada regra (fixed=True) com next_execution <= hoje produz uma transação
+    avulsa por data devida — inclusive as atrasadas — e tem next_execution
+    avançado. O trabalho é feito em blocos de regras: uma leitura, um
+    executemany de inserções e um de atualizações por bloco, cada bloco no
+    seu próprio commit. Como a ocorrência e o avanço da regra são gravados
+    juntos, rodar de novo (ou retomar após uma falha) não duplica lançamentos.
+    """
+
+    CHUNK_SIZE = 5000
+
+    @staticmethod
+    def next_date(current: date, periodicity: str, anchor_day: Optional[int] = None) -> date:
+        """Próxima data da recorrência. Mensal/anual mantêm o dia de referência
+        (`anchor_day`), limitado ao fim do mês: 31/01 -> 28/02 -> 31/03.
+        """
+        p = (periodicity or "").lower()
+        if p == "weekly":
+            return current + timedelta(days=7)
+        if p not in ("monthly", "yearly"):
+            raise ValueError("Periodicidade inválida")
+        first = add_months(current.replace(day=1), 1 if p == "monthly" else 12)
+        day = min(anchor_day or current.day, calendar.monthrange(first.year, first.month)[1])
+        return first.replace(day=day)
+
+    @staticmethod
+    def due_dates(rule: Transaction, until: date) -> Tuple[List[date], date]:
+        """Datas devidas da regra até `until` e o novo next_execution."""
+        current = rule.get_next_execution()
+        anchor = rule.get_occurred_at()
+        anchor_day = anchor.day if anchor else current.day
+        dates = []
+        while current <= until:
+            dates.append(current)
+            current = RecurrenceEngine.next_date(current, rule.get_periodicity(), anchor_day)
+        return dates, current
+
+    @staticmethod
+    def run(until: Optional[date] = None, chunk_size: Optional[int] = None) -> RecurrenceResult:
+        """Materializa todas as regras vencidas até `until` (padrão: hoje, UTC).
+        Cada bloco processado deixa de estar vencido (next_execution > until),
+        então o próximo bloco é simplesmente a próxima leitura das vencidas.
+        """
+        from repository.transactions import TransactionRepository
+
+        until = until or datetime.now(timezone.utc).date()
+        chunk_size = int(chunk_size or RecurrenceEngine.CHUNK_SIZE)
+        result = RecurrenceResult()
+        while True:
+            rules = TransactionRepository.list_due_recurring(until, limit=chunk_size)
+            if not rules:
+                return result
+            occurrences, advances = [], []
+            for rule in rules:
+                dates, new_next = RecurrenceEngine.due_dates(rule, until)
+                advances.append({"rule_id": rule.get_id(), "old": rule.get_next_execution(), "new": new_next})
+                for due in dates:
+                    occurrences.append({
+                        "user_id": rule.get_user_id(),
+                        "category_id": rule.get_category_id(),
+                        "amount_cents": rule.get_amount_cents(),
+                        "type": rule.get_type(),
+                        "description": rule.get_description(),
+                        "notes": rule.get_notes(),
+                        "occurred_at": datetime.combine(due, _MIDNIGHT_UTC),
+                    })
+            result.created += TransactionRepository.materialize_occurrences(occurrences, advances)
+            result.rules += len(rules)
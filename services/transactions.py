@@ -1,8 +1,10 @@
 from __future__ import annotations
 from typing import Optional
 from datetime import datetime, date
+from decimal import Decimal
 
 from db.models import Transaction as TransactionEntity
+from services.money import cents_to_decimal, from_cents, to_cents
 
 
 class Transaction:
@@ -20,11 +22,13 @@ class Transaction:
         notes: Optional[str] = None,
         occurred_at: Optional[datetime] = None,
         installment_id: Optional[int] = None,
+        amount_cents: Optional[int] = None,
     ):
         self._id = id
         self._user_id = user_id
         self._category_id = category_id
-        self._amount = amount
+        # valor em centavos; `amount` (reais) é aceito por conveniência
+        self._amount_cents = int(amount_cents) if amount_cents is not None else to_cents(amount)
         self._type = type
         self._fixed = fixed
         self._periodicity = periodicity
@@ -38,7 +42,9 @@ class Transaction:
     def get_id(self) -> Optional[int]: return self._id
     def get_user_id(self) -> Optional[int]: return self._user_id
     def get_category_id(self) -> Optional[int]: return self._category_id
-    def get_amount(self) -> float: return self._amount
+    def get_amount(self) -> float: return from_cents(self._amount_cents)
+    def get_amount_cents(self) -> int: return self._amount_cents
+    def get_amount_decimal(self) -> Decimal: return cents_to_decimal(self._amount_cents)
     def get_type(self) -> str: return self._type
     def get_fixed(self) -> bool: return self._fixed
     def get_periodicity(self) -> str: return self._periodicity
@@ -51,7 +57,8 @@ class Transaction:
     # setters
     def set_user_id(self, v: int) -> None: self._user_id = v
     def set_category_id(self, v: Optional[int]) -> None: self._category_id = v
-    def set_amount(self, v: float) -> None: self._amount = v
+    def set_amount(self, v: float) -> None: self._amount_cents = to_cents(v)
+    def set_amount_cents(self, v: int) -> None: self._amount_cents = int(v)
     def set_type(self, v: str) -> None: self._type = v
     def set_fixed(self, v: bool) -> None: self._fixed = v
     def set_periodicity(self, v: str) -> None: self._periodicity = v
@@ -68,7 +75,7 @@ class Transaction:
             id=e.id,
             user_id=e.user_id,
             category_id=e.category_id,
-            amount=e.amount,
+            amount_cents=e.amount_cents,
             type=e.type,
             fixed=e.fixed,
             periodicity=e.periodicity,
@@ -84,7 +91,7 @@ class Transaction:
             id=self._id,
             user_id=self._user_id,
             category_id=self._category_id,
-            amount=self._amount,
+            amount_cents=self._amount_cents,
             type=self._type,
             fixed=self._fixed,
             periodicity=self._periodicity,
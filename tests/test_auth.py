@@ -25,6 +25,8 @@ def load_env_and_modules(db_path: str):
         "services.users",
         "repository.users",
         "core.config",
+        "core.kdf",
+        "core.ratelimit",
         "core.auth",
     ]:
         if mod in sys.modules:
@@ -77,3 +79,132 @@ def test_expired_session(mods):
     with pytest.raises(auth.AuthError):
         auth.verify_session(token)
 
+
+def test_login_rehashes_when_iterations_change(mods, monkeypatch):
+    users, users_repo, auth = mods
+    old_hash = auth.hash_password("pw", iterations=1000)
+    u = users_repo.UserRepository.create(users.User(name="Carol", cpf="22233344455", password_hash=old_hash))
+    monkeypatch.setattr(auth.config, "KDF_ITERATIONS", 2000)
+    assert auth.needs_rehash(old_hash) and auth.needs_rehash(b"plain-legacy")
+
+    auth.login("22233344455", "pw")
+    new_hash = users_repo.UserRepository.get_by_id(u.get_id()).get_password_hash()
+    assert new_hash.startswith(b"pbkdf2_sha256$2000$")
+    assert not auth.needs_rehash(new_hash)
+    assert auth.verify_password("pw", new_hash)
+
+    # sem mudança de custo o hash fica como está
+    auth.login("22233344455", "pw")
+    assert users_repo.UserRepository.get_by_id(u.get_id()).get_password_hash() == new_hash
+
+
+def test_kdf_pool_rejects_when_full_and_times_out(mods, monkeypatch):
+    import threading
+    import core.kdf as kdf
+    release = threading.Event()
+    monkeypatch.setattr(kdf, "pbkdf2_sha256", lambda *a: release.wait(5) and b"k")
+    monkeypatch.setattr(kdf.config, "KDF_WORKERS", 1)
+    monkeypatch.setattr(kdf.config, "KDF_MAX_PENDING", 1)
+    kdf.shutdown()
+    try:
+        # o cálculo segue ocupando o worker (e a vaga) depois do timeout
+        with pytest.raises(kdf.KdfTimeoutError):
+            kdf.derive(b"pw", b"salt", 1, timeout=0.05)
+        with pytest.raises(kdf.KdfBusyError):
+            kdf.derive(b"pw", b"salt", 1)
+    finally:
+        release.set()
+        kdf.shutdown()
+    assert kdf.derive(b"pw", b"salt", 1) == b"k"
+    kdf.shutdown()
+
+
+def test_login_throttled_before_query_and_kdf(mods, monkeypatch):
+    users, users_repo, auth = mods
+    users_repo.UserRepository.create(users.User(name="Dan", cpf="33344455566", password_hash=auth.hash_password("pw")))
+    monkeypatch.setattr(auth.config, "RATE_LIMIT_CPF", 3)
+    auth.ratelimit.reset_limiters()
+
+    for _ in range(3):
+        with pytest.raises(auth.AuthError):
+            auth.login("33344455566", "wrong", client="ip:1")
+
+    calls = {"query": 0, "kdf": 0}
+    real_get, real_derive = users_repo.UserRepository.get_by_cpf, auth.kdf.derive
+    monkeypatch.setattr(users_repo.UserRepository, "get_by_cpf", lambda cpf: calls.__setitem__("query", calls["query"] + 1) or real_get(cpf))
+    monkeypatch.setattr(auth.kdf, "derive", lambda *a: calls.__setitem__("kdf", calls["kdf"] + 1) or real_derive(*a))
+    with pytest.raises(auth.ratelimit.ThrottledError) as exc:
+        auth.login("33344455566", "pw", client="ip:2")  # bloqueio é do CPF, não do cliente
+    assert calls == {"query": 0, "kdf": 0}
+    assert 0 < exc.value.retry_after <= auth.config.RATE_BACKOFF_SECONDS
+
+    # passado o bloqueio, um login certo zera a contagem do CPF
+    auth.ratelimit.limiter("cpf").reset("cpf:33344455566")
+    with pytest.raises(auth.AuthError):
+        auth.login("33344455566", "wrong")
+    auth.login("33344455566", "pw")
+    for _ in range(2):
+        with pytest.raises(auth.AuthError):
+            auth.login("33344455566", "wrong")
+    assert auth.ratelimit.limiter("cpf").retry_after("cpf:33344455566") == 0
+
+
+def test_sliding_window_backoff_and_bounds():
+    from core.ratelimit import SlidingWindowLimiter
+    now = [1000.0]
+    lim = SlidingWindowLimiter(limit=2, window=60, backoff=10, backoff_max=25, maxsize=2, clock=lambda: now[0])
+
+    assert lim.hit("a") == 0
+    assert lim.hit("a") == 10  # limite atingido
+    assert lim.retry_after("a") == 10
+    now[0] += 10
+    assert lim.hit("a") == 20  # a janela ainda conta as falhas: backoff dobra
+    now[0] += 20
+    assert lim.hit("a") == 25  # teto
+
+    # duas janelas depois as falhas antigas já não pesam
+    now[0] += 150
+    assert lim.hit("a") == 0
+
+    lim.hit("b")
+    lim.hit("c")
+    assert len(lim) == 2 and lim.retry_after("a") == 0  # "a" saiu pelo LRU
+
+
+def test_sqlite_throttle_is_shared_between_processes(mods):
+    from core.ratelimit import SlidingWindowLimiter
+    now = [1000.0]
+    first = SlidingWindowLimiter(2, 60, 30, 300, clock=lambda: now[0], persist=True)
+    other = SlidingWindowLimiter(2, 60, 30, 300, clock=lambda: now[0], persist=True)
+    first.hit("cpf:1")
+    other.hit("cpf:1")
+    assert first.retry_after("cpf:1") == 30
+    first.reset("cpf:1")
+    assert other.retry_after("cpf:1") == 0
+
+
+def test_verify_session_caches_valid_tokens(mods, monkeypatch):
+    _users, _users_repo, auth = mods
+    auth.clear_token_cache()
+    token = auth.issue_session(7, expires_in=60)
+    first = auth.verify_session(token)
+    monkeypatch.setattr(auth, "_sign", lambda *a: pytest.fail("assinatura recalculada num acerto"))
+    assert auth.verify_session(token) == first
+    assert auth.token_cache_stats() == {"hits": 1, "misses": 1, "size": 1, "hit_rate": 0.5}
+    monkeypatch.undo()
+
+    # token adulterado não aproveita o cache
+    with pytest.raises(auth.AuthError):
+        auth.verify_session(token[:-2] + ("AA" if not token.endswith("AA") else "BB"))
+
+    # o exp é conferido a cada acerto
+    real_now = auth._now()
+    monkeypatch.setattr(auth, "_now", lambda: real_now + 120)
+    with pytest.raises(auth.AuthError, match="expirada"):
+        auth.verify_session(token)
+    assert auth.token_cache_stats()["size"] == 0
+    monkeypatch.undo()
+
+    auth.verify_session(token)
+    auth.forget_token(token)
+    assert auth.token_cache_stats()["size"] == 0
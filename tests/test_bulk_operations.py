@@ -0,0 +1,221 @@
+import os
+import sys
+from pathlib import Path
+from datetime import date
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+MODULES = [
+    "db.session",
+    "db.models",
+    "services.users",
+    "services.categories",
+    "services.debt_origins",
+    "services.responsibles",
+    "services.debts",
+    "services.debt_installments",
+    "services.transactions",
+    "repository.bulk",
+    "repository.users",
+    "repository.cache",
+    "repository.refs",
+    "repository.categories",
+    "repository.debt_origins",
+    "repository.responsibles",
+    "repository.debts",
+    "repository.debt_installments",
+    "repository.rollups",
+    "repository.transactions",
+]
+
+
+def load_modules(db_path: str):
+    os.environ["DB_PATH"] = db_path
+    from sqlmodel import SQLModel
+    try:
+        SQLModel.metadata.clear()
+    except Exception:
+        pass
+    for mod in MODULES:
+        if mod in sys.modules:
+            del sys.modules[mod]
+
+    import db.session as db_session
+    import db.models as db_models
+    db_session.init_db()
+
+    import importlib
+    mods = {}
+    for name in MODULES[2:]:
+        key = name.split(".", 1)[1]
+        if name.startswith("repository."):
+            key += "_repo"
+        mods[key] = importlib.import_module(name)
+    return mods
+
+
+@pytest.fixture()
+def m(tmp_path):
+    return load_modules(str(tmp_path / "test.db"))
+
+
+@pytest.fixture()
+def owner(m):
+    return m["users_repo"].UserRepository.create(m["users"].User(name="Bulk", cpf="11122233344", password_hash=b"pw"))
+
+
+def test_transactions_bulk_create_reports_per_row_errors(m, owner):
+    Tx = m["transactions"].Transaction
+    repo = m["transactions_repo"].TransactionRepository
+    cat = m["categories_repo"].CategoryRepository.create(m["categories"].Category(user_id=owner.get_id(), name="Food"))
+
+    res = repo.bulk_create([
+        Tx(user_id=owner.get_id(), category_id=cat.get_id(), amount=10.0, type="expense"),
+        Tx(user_id=owner.get_id(), amount=0, type="expense"),
+        Tx(user_id=owner.get_id(), category_id=9999, amount=5.0, type="income"),
+        Tx(user_id=owner.get_id(), amount=7.5, type="income"),
+    ])
+    assert res.ok_count == 2
+    assert res.errors == {1: "Valor inválido", 2: "Categoria não encontrada"}
+    assert res.results[0].get_id() is not None and res.results[3].get_amount() == 7.5
+    assert len(repo.list_by_user(owner.get_id())) == 2
+
+
+def test_transactions_bulk_update_and_delete(m, owner):
+    Tx = m["transactions"].Transaction
+    repo = m["transactions_repo"].TransactionRepository
+    created = repo.bulk_create([Tx(user_id=owner.get_id(), amount=float(i + 1), type="expense") for i in range(3)]).results
+
+    for t in created:
+        t.set_amount(t.get_amount() * 10)
+    ghost = Tx(id=9999, user_id=owner.get_id(), amount=1.0, type="expense")
+    res = repo.bulk_update(created + [ghost])
+    assert res.errors == {3: "Transação não encontrada"}
+    assert sorted(t.get_amount() for t in repo.list_by_user(owner.get_id())) == [10.0, 20.0, 30.0]
+
+    res = repo.bulk_delete([created[0].get_id(), 9999, created[1].get_id()])
+    assert res.results == [created[0].get_id(), None, created[1].get_id()]
+    assert res.errors == {1: "Transação não encontrada"}
+    assert [t.get_id() for t in repo.list_by_user(owner.get_id())] == [created[2].get_id()]
+
+
+def test_bulk_delete_in_use_rows_fail_individually(m, owner):
+    Cat = m["categories"].Category
+    cats = m["categories_repo"].CategoryRepository.bulk_create([Cat(user_id=owner.get_id(), name=n) for n in ("A", "B", "C")]).results
+    m["transactions_repo"].TransactionRepository.create(
+        m["transactions"].Transaction(user_id=owner.get_id(), category_id=cats[1].get_id(), amount=1.0, type="expense")
+    )
+
+    res = m["categories_repo"].CategoryRepository.bulk_delete([c.get_id() for c in cats])
+    assert res.errors == {1: "Categoria não pode ser removida pois está em uso"}
+    remaining = m["categories_repo"].CategoryRepository.list_by_user(owner.get_id())
+    assert [c.get_id() for c in remaining] == [cats[1].get_id()]
+
+
+def test_debts_bulk_delete_removes_installments(m, owner):
+    origin = m["debt_origins_repo"].DebtOriginRepository.create(m["debt_origins"].DebtOrigin(user_id=owner.get_id(), name="Card"))
+    Debt = m["debts"].Debt
+    debts = m["debts_repo"].DebtRepository.bulk_create([
+        Debt(user_id=owner.get_id(), origin_id=origin.get_id(), debt_date=date(2025, 1, 1), total_amount=10.0, installments=2),
+        Debt(user_id=owner.get_id(), origin_id=9999, debt_date=date(2025, 1, 1), total_amount=10.0, installments=1),
+    ])
+    assert debts.errors == {1: "Origem não encontrada"}
+    debt = debts.results[0]
+
+    Inst = m["debt_installments"].DebtInstallment
+    inst_repo = m["debt_installments_repo"].DebtInstallmentRepository
+    insts = inst_repo.bulk_create([
+        Inst(debt_id=debt.get_id(), number=n, amount=5.0, due_on=date(2025, n, 1)) for n in (1, 2)
+    ]).results
+    for inst in insts:
+        inst.set_paid(True)
+    updated = inst_repo.bulk_update(insts)
+    assert all(i.get_paid() and i.get_paid_at() is not None for i in updated.results)
+
+    res = m["debts_repo"].DebtRepository.bulk_delete([debt.get_id()])
+    assert res.ok_count == 1
+    assert inst_repo.list_by_debt(debt.get_id()) == []
+
+
+def test_responsibles_and_origins_bulk(m, owner):
+    Resp = m["responsibles"].Responsible
+    res = m["responsibles_repo"].ResponsibleRepository.bulk_create([
+        Resp(user_id=owner.get_id(), name="Ana"),
+        Resp(user_id=owner.get_id(), name="Zé", related_user_id=4242),
+    ])
+    assert res.errors == {1: "Usuário relacionado não encontrado"}
+
+    Origin = m["debt_origins"].DebtOrigin
+    repo = m["debt_origins_repo"].DebtOriginRepository
+    origins = repo.bulk_create([Origin(user_id=owner.get_id(), name="X"), Origin(user_id=owner.get_id(), name=" ")])
+    assert origins.errors == {1: "Nome da origem é obrigatório"}
+    o = origins.results[0]
+    o.set_name("Y")
+    assert repo.bulk_update([o]).results[0].get_name() == "Y"
+
+
+def test_references_must_belong_to_the_same_user(m, owner):
+    other = m["users_repo"].UserRepository.create(m["users"].User(name="Outro", cpf="55566677788", password_hash=b"pw"))
+    foreign_cat = m["categories_repo"].CategoryRepository.create(m["categories"].Category(user_id=other.get_id(), name="Deles"))
+    foreign_origin = m["debt_origins_repo"].DebtOriginRepository.create(m["debt_origins"].DebtOrigin(user_id=other.get_id(), name="Banco"))
+    origin = m["debt_origins_repo"].DebtOriginRepository.create(m["debt_origins"].DebtOrigin(user_id=owner.get_id(), name="Cartão"))
+    Tx = m["transactions"].Transaction
+    Debt = m["debts"].Debt
+    tx_repo = m["transactions_repo"].TransactionRepository
+    debt_repo = m["debts_repo"].DebtRepository
+
+    with pytest.raises(ValueError, match="Categoria não encontrada"):
+        tx_repo.create(Tx(user_id=owner.get_id(), category_id=foreign_cat.get_id(), amount=10.0, type="expense"))
+    with pytest.raises(ValueError, match="Origem não encontrada"):
+        debt_repo.create(Debt(user_id=owner.get_id(), origin_id=foreign_origin.get_id(), debt_date=date(2025, 1, 1), total_amount=10.0, installments=1))
+
+    tx = tx_repo.create(Tx(user_id=owner.get_id(), amount=10.0, type="expense"))
+    tx.set_category_id(foreign_cat.get_id())
+    with pytest.raises(ValueError, match="Categoria não encontrada"):
+        tx_repo.update(tx)
+
+    res = debt_repo.bulk_create([
+        Debt(user_id=owner.get_id(), origin_id=origin.get_id(), debt_date=date(2025, 1, 1), total_amount=10.0, installments=1),
+        Debt(user_id=owner.get_id(), origin_id=origin.get_id(), category_id=foreign_cat.get_id(), debt_date=date(2025, 1, 1), total_amount=10.0, installments=1),
+    ])
+    assert res.errors == {1: "Categoria não encontrada"}
+
+
+def test_reference_validation_runs_one_query_per_batch(m, owner):
+    from db.instrumentation import collect
+    engine = sys.modules["db.session"].engine
+    cats = m["categories_repo"].CategoryRepository.bulk_create([
+        m["categories"].Category(user_id=owner.get_id(), name=f"C{i}") for i in range(5)
+    ]).results
+    origin = m["debt_origins_repo"].DebtOriginRepository.create(m["debt_origins"].DebtOrigin(user_id=owner.get_id(), name="Cartão"))
+    Debt = m["debts"].Debt
+    repo = m["debts_repo"].DebtRepository
+
+    def ref_queries(log):
+        return [q for q in log.queries if " AS kind" in q.statement]
+
+    with collect(engine=engine) as log:
+        res = repo.bulk_create([
+            Debt(user_id=owner.get_id(), origin_id=origin.get_id(), category_id=cats[i % 5].get_id(),
+                 debt_date=date(2025, 1, 1), total_amount=10.0, installments=1)
+            for i in range(50)
+        ])
+    assert res.ok_count == 50
+    assert len(ref_queries(log)) == 1
+
+    # sem referência alterada, o update não consulta nada para validar
+    debt = res.results[0]
+    debt.set_description("só a descrição")
+    with collect(engine=engine) as log:
+        repo.update(debt)
+    assert ref_queries(log) == []
+
+    debt.set_category_id(cats[1].get_id())
+    with collect(engine=engine) as log:
+        repo.update(debt)
+    assert len(ref_queries(log)) == 1
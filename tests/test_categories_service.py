@@ -27,6 +27,8 @@ def load_modules(db_path: str):
         "services.users",
         "services.categories",
         "repository.users",
+        "repository.cache",
+        "repository.refs",
         "repository.categories",
     ]:
         if mod in sys.modules:
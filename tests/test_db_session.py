@@ -0,0 +1,200 @@
+import os
+import sys
+from pathlib import Path
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def load_modules(db_path: str, profile: str = "throughput"):
+    os.environ["DB_PATH"] = db_path
+    os.environ["DB_PROFILE"] = profile
+    from sqlmodel import SQLModel
+    try:
+        SQLModel.metadata.clear()
+    except Exception:
+        pass
+    for mod in [
+        "db.session",
+        "db.models",
+        "repository.rollups",
+    ]:
+        if mod in sys.modules:
+            del sys.modules[mod]
+
+    import db.session as db_session
+    import db.models as db_models
+    db_session.init_db()
+    return db_session, db_models
+
+
+@pytest.fixture()
+def restore_env():
+    yield
+    os.environ.pop("DB_PROFILE", None)
+    os.environ.pop("DB_CACHE_SIZE", None)
+    os.environ.pop("DB_SYNCHRONOUS", None)
+
+
+def _pragma(engine, name):
+    with engine.connect() as conn:
+        return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_throughput_profile_applied(tmp_path, restore_env):
+    db_session, _ = load_modules(str(tmp_path / "test.db"))
+    engine = db_session.engine
+    assert str(_pragma(engine, "journal_mode")).lower() == "wal"
+    assert _pragma(engine, "synchronous") == 1  # NORMAL
+    assert _pragma(engine, "foreign_keys") == 1
+    assert _pragma(engine, "temp_store") == 2  # MEMORY
+    assert _pragma(engine, "cache_size") == -64 * 1024
+
+
+def test_durability_profile_and_env_override(tmp_path, restore_env):
+    os.environ["DB_CACHE_SIZE"] = "-2048"
+    db_session, _ = load_modules(str(tmp_path / "test.db"), profile="durability")
+    engine = db_session.engine
+    assert _pragma(engine, "synchronous") == 2  # FULL
+    assert _pragma(engine, "cache_size") == -2048
+
+
+def test_invalid_profile(tmp_path, restore_env):
+    db_session, _ = load_modules(str(tmp_path / "test.db"))
+    with pytest.raises(ValueError):
+        db_session.engine_pragmas("fast-and-loose")
+
+
+def test_invalid_env_override(tmp_path, restore_env):
+    db_session, _ = load_modules(str(tmp_path / "test.db"))
+    os.environ["DB_SYNCHRONOUS"] = "NORMAL; DROP TABLE user"
+    with pytest.raises(ValueError, match="DB_SYNCHRONOUS"):
+        db_session.engine_pragmas("throughput")
+    os.environ["DB_SYNCHRONOUS"] = "full"
+    os.environ["DB_CACHE_SIZE"] = "64MB"
+    with pytest.raises(ValueError, match="DB_CACHE_SIZE"):
+        db_session.engine_pragmas("throughput")
+    os.environ["DB_CACHE_SIZE"] = "-2048"
+    pragmas = db_session.engine_pragmas("throughput")
+    assert pragmas["synchronous"] == "FULL" and pragmas["cache_size"] == -2048
+
+
+def test_foreign_keys_enforced(tmp_path, restore_env):
+    from sqlalchemy.exc import IntegrityError
+    from sqlmodel import Session
+    db_session, db_models = load_modules(str(tmp_path / "test.db"))
+    with Session(db_session.engine) as s:
+        s.add(db_models.Category(user_id=999, name="Órfã"))
+        with pytest.raises(IntegrityError):
+            s.commit()
+
+
+def _index_names(engine, table):
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"PRAGMA index_list('{table}')").all()
+    return {r[1] for r in rows}
+
+
+def test_indexes_created_and_idempotent(tmp_path, restore_env):
+    db_session, _ = load_modules(str(tmp_path / "test.db"))
+    engine = db_session.engine
+    assert "ix_transaction_user_fixed_occurred" in _index_names(engine, "transaction")
+    assert "ix_debt_user_paid_date" in _index_names(engine, "debt")
+    assert "ix_debtinstallment_debt_number" in _index_names(engine, "debtinstallment")
+    assert "ix_category_user_id" in _index_names(engine, "category")
+
+    # Banco antigo sem os índices: init_db recria sem erro, e pode rodar de novo
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_transaction_user_fixed_occurred")
+        conn.exec_driver_sql("DROP INDEX ix_responsible_user_id")
+    db_session.init_db()
+    db_session.init_db()
+    assert "ix_transaction_user_fixed_occurred" in _index_names(engine, "transaction")
+    assert "ix_responsible_user_id" in _index_names(engine, "responsible")
+
+
+def test_list_by_filters_uses_index(tmp_path, restore_env):
+    db_session, _ = load_modules(str(tmp_path / "test.db"))
+    with db_session.engine.connect() as conn:
+        plan = conn.exec_driver_sql(
+            'EXPLAIN QUERY PLAN SELECT id FROM "transaction" WHERE user_id = 1 AND fixed = 0 '
+            "ORDER BY occurred_at DESC, id DESC LIMIT 100"
+        ).all()
+    detail = " ".join(str(r[-1]) for r in plan)
+    assert "ix_transaction_user_fixed_occurred" in detail
+    assert "TEMP B-TREE" not in detail
+
+
+def test_legacy_money_columns_migrated_to_cents(tmp_path, restore_env):
+    from sqlmodel import Session
+    db_session, db_models = load_modules(str(tmp_path / "test.db"))
+    engine = db_session.engine
+    with Session(engine) as s:
+        user = db_models.User(name="Owner", cpf="11122233344", password_hash=b"pw")
+        s.add(user)
+        s.commit()
+        uid = user.id
+
+    # Simula um banco da versão anterior: valores em REAL e sem resumos
+    with engine.begin() as conn:
+        conn.exec_driver_sql('ALTER TABLE "transaction" ADD COLUMN amount FLOAT NOT NULL DEFAULT 0')
+        conn.exec_driver_sql('ALTER TABLE "transaction" DROP COLUMN amount_cents')
+        conn.exec_driver_sql("DROP TABLE monthlysummary")
+        conn.exec_driver_sql("PRAGMA user_version = 0")
+        for amount in (0.1, 0.2, 19.995):
+            conn.exec_driver_sql(
+                'INSERT INTO "transaction" (user_id, amount, type, fixed, periodicity, occurred_at) '
+                f"VALUES ({uid}, {amount}, 'expense', 0, 'none', '2025-01-15 00:00:00')"
+            )
+
+    db_session.init_db()
+    with engine.connect() as conn:
+        columns = {r[1] for r in conn.exec_driver_sql("PRAGMA table_info('transaction')").all()}
+        cents = sorted(r[0] for r in conn.exec_driver_sql('SELECT amount_cents FROM "transaction"').all())
+        summary = conn.exec_driver_sql("SELECT total_cents, count FROM monthlysummary").all()
+    assert "amount" not in columns and "amount_cents" in columns
+    assert cents == [10, 20, 2000]
+    assert [tuple(r) for r in summary] == [(2030, 3)]
+    assert _pragma(engine, "user_version") == db_session.SCHEMA_VERSION
+
+    # Segunda execução não altera nada
+    db_session.init_db()
+    with engine.connect() as conn:
+        assert sorted(r[0] for r in conn.exec_driver_sql('SELECT amount_cents FROM "transaction"').all()) == cents
+
+
+def test_ensure_db_runs_init_once_per_process(tmp_path, restore_env, monkeypatch):
+    db_session, _ = load_modules(str(tmp_path / "test.db"))
+    calls = []
+    monkeypatch.setattr(db_session, "init_db", lambda: calls.append(1))
+    db_session.ensure_db()
+    db_session.ensure_db()
+    assert calls == [1]
+
+
+def test_search_index_backfilled_on_upgrade(tmp_path, restore_env):
+    from sqlmodel import Session
+    db_session, db_models = load_modules(str(tmp_path / "test.db"))
+    engine = db_session.engine
+    # Banco da versão 1: sem índice textual e com transações já gravadas
+    with engine.begin() as conn:
+        for name in ("transaction_fts", "debt_fts"):
+            for suffix in ("ai", "ad", "au"):
+                conn.exec_driver_sql(f"DROP TRIGGER {name}_{suffix}")
+            conn.exec_driver_sql(f"DROP TABLE {name}")
+        conn.exec_driver_sql("PRAGMA user_version = 1")
+    with Session(engine) as s:
+        user = db_models.User(name="Owner", cpf="11122233344", password_hash=b"pw")
+        s.add(user)
+        s.commit()
+        s.add(db_models.Transaction(user_id=user.id, amount_cents=100, type="expense", description="Conta de água"))
+        s.commit()
+    db_session.init_db()
+    with engine.connect() as conn:
+        hits = conn.exec_driver_sql("SELECT rowid FROM transaction_fts WHERE transaction_fts MATCH 'agua'").all()
+        triggers = {r[0] for r in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'trigger'").all()}
+    assert [r[0] for r in hits] == [1]
+    assert {"transaction_fts_ai", "transaction_fts_ad", "transaction_fts_au", "debt_fts_au"} <= triggers
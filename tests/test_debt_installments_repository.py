@@ -24,6 +24,8 @@ def load_modules(db_path: str):
         "services.debt_origins",
         "services.debt_installments",
         "repository.users",
+        "repository.cache",
+        "repository.refs",
         "repository.debt_origins",
         "repository.debt_installments",
     ]:
@@ -55,7 +57,7 @@ def create_debt(db_models, user_id: int, origin_id: int):
             responsible_id=None,
             debt_date=date.today(),
             description=None,
-            total_amount=300.0,
+            total_amount_cents=30000,
             installments=3,
             notes=None,
             paid=False,
@@ -214,3 +216,24 @@ def test_delete_installment(mods):
     assert len(lst) == 1
     assert lst[0].get_id() == i2.get_id()
 
+
+def test_delete_debt_removes_installments(mods):
+    users, origins, inst, users_repo, origins_repo, inst_repo, db_models = mods
+    if "repository.debts" in sys.modules:
+        del sys.modules["repository.debts"]
+    import repository.debts as debts_repo
+
+    owner = users_repo.UserRepository.create(
+        users.User(name="Owner8", cpf="20202020202", password_hash=b"pw")
+    )
+    origin = origins_repo.DebtOriginRepository.create(
+        origins.DebtOrigin(user_id=owner.get_id(), name="Y")
+    )
+    debt_id = create_debt(db_models, owner.get_id(), origin.get_id())
+    inst_repo.DebtInstallmentRepository.create(
+        inst.DebtInstallment(debt_id=debt_id, number=1, amount=10.0, due_on=date(2025, 7, 1))
+    )
+
+    debts_repo.DebtRepository.delete(debt_id)
+    assert debts_repo.DebtRepository.get_by_id(debt_id) is None
+    assert inst_repo.DebtInstallmentRepository.list_by_debt(debt_id) == []
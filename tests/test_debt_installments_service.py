@@ -26,7 +26,7 @@ def test_installment_to_entity_and_from_entity_roundtrip():
     ent = dto.to_entity()
     assert ent.debt_id == 1
     assert ent.number == 1
-    assert ent.amount == 50.0
+    assert ent.amount_cents == 5000
     assert ent.due_on == due
     assert ent.paid is False
     assert ent.paid_at is None
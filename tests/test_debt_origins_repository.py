@@ -22,6 +22,8 @@ def load_modules(db_path: str):
         "services.users",
         "services.debt_origins",
         "repository.users",
+        "repository.cache",
+        "repository.refs",
         "repository.debt_origins",
     ]:
         if mod in sys.modules:
@@ -26,6 +26,8 @@ def load_modules(db_path: str):
         "services.responsibles",
         "services.debts",
         "repository.users",
+        "repository.cache",
+        "repository.refs",
         "repository.debt_origins",
         "repository.categories",
         "repository.responsibles",
@@ -248,3 +250,53 @@ def test_filter_by_installments_range(mods):
     # Somente máximo (<=2)
     max_only = debts_repo.DebtRepository.list_by_filters(u.get_id(), installments_max=2)
     assert [x.get_id() for x in max_only] == [d1.get_id(), d2.get_id()]
+
+
+def test_list_page_by_filters_keyset(mods):
+    users, origins, categories, responsibles, debts, users_repo, origins_repo, categories_repo, responsibles_repo, debts_repo = mods
+    u = users_repo.UserRepository.create(users.User(name="Pager", cpf="45645645645", password_hash=b"pw"))
+    o = origins_repo.DebtOriginRepository.create(origins.DebtOrigin(user_id=u.get_id(), name="Card"))
+    for i in range(5):
+        debts_repo.DebtRepository.create(debts.Debt(user_id=u.get_id(), origin_id=o.get_id(), debt_date=date(2025, 1, 1 + i // 2), total_amount=10.0 + i, installments=1))
+
+    expected = [d.get_id() for d in debts_repo.DebtRepository.list_by_filters(u.get_id())]
+    first, cursor = debts_repo.DebtRepository.list_page_by_filters(u.get_id(), limit=2)
+    second, cursor = debts_repo.DebtRepository.list_page_by_filters(u.get_id(), limit=2, cursor=cursor)
+    third, cursor = debts_repo.DebtRepository.list_page_by_filters(u.get_id(), limit=2, cursor=cursor)
+    assert [d.get_id() for d in first + second + third] == expected
+    assert cursor is None
+
+
+def test_search_ranks_and_follows_writes(mods):
+    users, origins, categories, responsibles, debts, users_repo, origins_repo, categories_repo, responsibles_repo, debts_repo = mods
+    repo = debts_repo.DebtRepository
+    u = users_repo.UserRepository.create(users.User(name="Finder", cpf="78978978978", password_hash=b"pw"))
+    other = users_repo.UserRepository.create(users.User(name="Other", cpf="12312312312", password_hash=b"pw"))
+    o = origins_repo.DebtOriginRepository.create(origins.DebtOrigin(user_id=u.get_id(), name="Card"))
+    o2 = origins_repo.DebtOriginRepository.create(origins.DebtOrigin(user_id=other.get_id(), name="Card"))
+
+    def make(uid, origin, description, notes=None, paid=False):
+        return repo.create(debts.Debt(user_id=uid, origin_id=origin, debt_date=date(2025, 1, 1), description=description, notes=notes, total_amount=10.0, installments=1, paid=paid))
+
+    geladeira = make(u.get_id(), o.get_id(), "Geladeira nova", notes="loja do centro")
+    fogao = make(u.get_id(), o.get_id(), "Fogão", notes="Geladeira e fogão no mesmo carnê", paid=True)
+    make(u.get_id(), o.get_id(), "Notebook")
+    make(other.get_id(), o2.get_id(), "Geladeira")
+
+    found, cursor = repo.search(u.get_id(), "gelad")
+    assert [d.get_id() for d in found] == [geladeira.get_id(), fogao.get_id()] and cursor is None
+    assert [d.get_id() for d in repo.search(u.get_id(), "FOGAO")[0]] == [fogao.get_id()]  # sem acento/caixa
+    assert [d.get_id() for d in repo.search(u.get_id(), "geladeira", paid=False)[0]] == [geladeira.get_id()]
+    assert repo.search(u.get_id(), "  ") == ([], None)
+    assert repo.search(u.get_id(), 'gel" OR "') == repo.search(u.get_id(), "gel or")
+
+    first, cursor = repo.search(u.get_id(), "geladeira", limit=1)
+    second, cursor2 = repo.search(u.get_id(), "geladeira", limit=1, cursor=cursor)
+    assert [d.get_id() for d in first + second] == [geladeira.get_id(), fogao.get_id()] and cursor2 is None
+
+    geladeira.set_description("Freezer")
+    repo.update(geladeira)
+    assert [d.get_id() for d in repo.search(u.get_id(), "freezer")[0]] == [geladeira.get_id()]
+    assert [d.get_id() for d in repo.search(u.get_id(), "geladeira")[0]] == [fogao.get_id()]
+    repo.delete(fogao.get_id())
+    assert repo.search(u.get_id(), "carne") == ([], None)
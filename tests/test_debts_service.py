@@ -46,7 +46,7 @@ def test_debt_to_entity_and_from_entity_roundtrip():
     assert ent.category_id is None
     assert ent.responsible_id is None
     assert ent.debt_date == date(2025, 2, 1)
-    assert ent.total_amount == 50.0
+    assert ent.total_amount_cents == 5000
     assert ent.installments == 1
     assert ent.paid is False
 
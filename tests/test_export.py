@@ -0,0 +1,132 @@
+import csv
+import io
+import os
+import sys
+import zipfile
+from pathlib import Path
+from datetime import date, datetime, timezone
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def load_modules(db_path: str):
+    os.environ["DB_PATH"] = db_path
+    from sqlmodel import SQLModel
+    try:
+        SQLModel.metadata.clear()
+    except Exception:
+        pass
+    for mod in [
+        "db.session",
+        "db.models",
+        "services.users",
+        "services.transactions",
+        "services.debts",
+        "services.debt_origins",
+        "services.debt_installments",
+        "services.export",
+        "repository.bulk",
+        "repository.cache",
+        "repository.refs",
+        "repository.users",
+        "repository.rollups",
+        "repository.transactions",
+        "repository.debt_origins",
+        "repository.debts",
+        "repository.debt_installments",
+        "repository.export",
+    ]:
+        if mod in sys.modules:
+            del sys.modules[mod]
+
+    import db.session as db_session
+    import db.models as db_models
+    db_session.init_db()
+
+    import services.users as users
+    import services.transactions as transactions
+    import services.debts as debts
+    import services.debt_origins as origins
+    import services.export as export
+    import repository.users as users_repo
+    import repository.transactions as transactions_repo
+    import repository.debt_origins as origins_repo
+    import repository.debts as debts_repo
+    return users, transactions, debts, origins, export, users_repo, transactions_repo, origins_repo, debts_repo
+
+
+@pytest.fixture()
+def mods(tmp_path):
+    return load_modules(str(tmp_path / "test.db"))
+
+
+@pytest.fixture()
+def ledger(mods):
+    users, transactions, debts, origins, export, users_repo, tx_repo, origins_repo, debts_repo = mods
+    owner = users_repo.UserRepository.create(users.User(name="Exp", cpf="11122233344", password_hash=b"pw"))
+    other = users_repo.UserRepository.create(users.User(name="Outro", cpf="55566677788", password_hash=b"pw"))
+    for uid in (owner.get_id(), other.get_id()):
+        tx_repo.TransactionRepository.bulk_create([
+            transactions.Transaction(
+                user_id=uid, amount=1.5 + day, type="expense", description=f"Compra {day}",
+                occurred_at=datetime(2024, 1, day, tzinfo=timezone.utc),
+            )
+            for day in range(1, 6)
+        ])
+        o = origins_repo.DebtOriginRepository.create(origins.DebtOrigin(user_id=uid, name="Cartão"))
+        d = debts_repo.DebtRepository.create(debts.Debt(
+            user_id=uid, origin_id=o.get_id(), debt_date=date(2024, 1, 1), total_amount=90.0, installments=3,
+        ))
+        from services.debt_installments import DebtInstallment
+        from repository.debt_installments import DebtInstallmentRepository
+        DebtInstallmentRepository.bulk_create([
+            DebtInstallment(debt_id=d.get_id(), number=n, amount=30.0, due_on=date(2024, n, 1)) for n in (1, 2, 3)
+        ])
+    return owner
+
+
+def test_csv_export_streams_only_the_users_rows(mods, ledger, tmp_path):
+    export = mods[4]
+    result = export.LedgerExporter.export_dir(ledger.get_id(), str(tmp_path / "out"), chunk_size=2)
+    assert result.rows == {"transactions": 5, "debts": 1, "installments": 3}
+
+    with open(result.files["transactions"], newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [r["description"] for r in rows] == [f"Compra {d}" for d in range(1, 6)]
+    assert {r["user_id"] for r in rows} == {str(ledger.get_id())}
+    assert rows[0]["amount_cents"] == "250" and rows[0]["fixed"] == "0"
+    assert rows[0]["occurred_at"].startswith("2024-01-01")
+
+    with open(result.files["installments"], newline="", encoding="utf-8") as f:
+        assert [(r["number"], r["due_on"]) for r in csv.DictReader(f)] == [("1", "2024-01-01"), ("2", "2024-02-01"), ("3", "2024-03-01")]
+
+
+def test_zip_export_and_validation(mods, ledger):
+    export = mods[4]
+    buf = io.BytesIO()
+    result = export.LedgerExporter.export_zip(ledger.get_id(), buf, tables=["debts", "transactions"])
+    with zipfile.ZipFile(buf) as zf:
+        assert sorted(zf.namelist()) == ["debts.csv", "transactions.csv"]
+        debts = list(csv.DictReader(io.StringIO(zf.read("debts.csv").decode("utf-8"))))
+    assert [(d["debt_date"], d["total_amount_cents"], d["paid"]) for d in debts] == [("2024-01-01", "9000", "0")]
+    assert result.files == {"debts": "debts.csv", "transactions": "transactions.csv"}
+
+    with pytest.raises(ValueError):
+        export.LedgerExporter.export_dir(ledger.get_id(), "unused", tables=["users"])
+    if "parquet" not in export.available_formats():
+        with pytest.raises(ValueError, match="pyarrow"):
+            export.LedgerExporter.export_dir(ledger.get_id(), "unused", fmt="parquet")
+
+
+def test_parquet_export(mods, ledger, tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    export = mods[4]
+    result = export.LedgerExporter.export_dir(ledger.get_id(), str(tmp_path / "pq"), fmt="parquet", chunk_size=2)
+    table = pq.read_table(result.files["transactions"])
+    assert table.num_rows == 5
+    assert table.column("amount_cents").to_pylist()[0] == 250
+    assert table.column("fixed").to_pylist()[0] is False
@@ -0,0 +1,54 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# Módulos carregados por app.py e pela página de login (sem o streamlit)
+ENTRY_MODULES = ["db.session", "core.session", "core.auth", "repository.users"]
+
+# Só as páginas que mostram tabelas/gráficos precisam deles
+DEFERRED = ["pandas", "numpy", "repository.transactions", "repository.debts", "repository.reports"]
+
+# Orçamento total de importação (ms). Depende da máquina, então o teste só
+# roda quando o orçamento é informado (ex.: IMPORT_TIME_BUDGET_MS=3000)
+BUDGET_MS = os.getenv("IMPORT_TIME_BUDGET_MS")
+
+
+def _importtime(modules):
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=str(ROOT),
+        env={**os.environ, "DB_PATH": ":memory:"},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        rows.append((name.rstrip(), int(cumulative)))
+    return rows
+
+
+def test_entry_modules_do_not_load_deferred_dependencies():
+    loaded = {name.strip() for name, _ in _importtime(ENTRY_MODULES)}
+    assert set(ENTRY_MODULES) <= loaded
+    assert not [m for m in DEFERRED if m in loaded]
+
+
+@pytest.mark.skipif(not BUDGET_MS, reason="defina IMPORT_TIME_BUDGET_MS para medir o tempo de importação")
+def test_entry_import_time_within_budget():
+    rows = _importtime(ENTRY_MODULES)
+    # linhas sem indentação extra são importações de primeiro nível
+    total_us = sum(cumulative for name, cumulative in rows if not name.startswith("  "))
+    assert total_us / 1000 < int(BUDGET_MS)
@@ -0,0 +1,143 @@
+import io
+import os
+import sys
+from pathlib import Path
+from datetime import date, datetime, timezone
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def load_modules(db_path: str):
+    os.environ["DB_PATH"] = db_path
+    from sqlmodel import SQLModel
+    try:
+        SQLModel.metadata.clear()
+    except Exception:
+        pass
+    for mod in [
+        "db.session",
+        "db.models",
+        "services.users",
+        "services.transactions",
+        "services.importers",
+        "services.importers.base",
+        "services.importers.csv_reader",
+        "services.importers.ofx_reader",
+        "services.importers.importer",
+        "repository.bulk",
+        "repository.refs",
+        "repository.users",
+        "repository.rollups",
+        "repository.transactions",
+    ]:
+        if mod in sys.modules:
+            del sys.modules[mod]
+
+    import db.session as db_session
+    import db.models as db_models
+    db_session.init_db()
+
+    import services.users as users
+    import services.transactions as transactions
+    import services.importers as importers
+    import repository.users as users_repo
+    import repository.transactions as transactions_repo
+    return users, transactions, importers, users_repo, transactions_repo
+
+
+@pytest.fixture()
+def mods(tmp_path):
+    return load_modules(str(tmp_path / "test.db"))
+
+
+CSV_BR = (
+    "Data;Histórico;Valor\n"
+    "05/01/2024;Padaria  Pão Quente;-12,50\n"
+    "05/01/2024;Salário;3.500,00\n"
+    "\n"
+    "06/01/2024;Sem valor;\n"
+    "07/01/2024;Mercado;-1.234,56\n"
+).encode("utf-8")
+
+OFX_SGML = (
+    "OFXHEADER:100\nDATA:OFXSGML\nVERSION:102\nENCODING:USASCII\nCHARSET:1252\n\n"
+    "<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>"
+    "<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240110120000[-3:BRT]<TRNAMT>-45.90<FITID>1<MEMO>Farmácia\n</STMTTRN>"
+    "<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240111<TRNAMT>100,00<FITID>2<NAME>PIX recebido\n</STMTTRN>"
+    "<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240112<TRNAMT>-89.90<FITID>3<NAME>C&amp;A Modas<MEMO>Cart&#227;o\n</STMTTRN>"
+    "</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>\n"
+).encode("cp1252")
+
+
+def test_parse_amount_formats(mods):
+    parse_amount = mods[2].parse_amount
+    assert parse_amount("1.234,56") == 123456
+    assert parse_amount("1,234.56") == 123456
+    assert parse_amount("-12,3") == -1230
+    assert parse_amount("R$ 10") == 1000
+    assert parse_amount("(12.30)") == -1230
+    assert parse_amount("1.234.567") == 123456700
+    with pytest.raises(ValueError):
+        parse_amount("abc")
+
+
+def test_readers_stream_rows_and_report_bad_lines(mods, monkeypatch):
+    importers = mods[2]
+    rows = list(importers.read_csv(io.BytesIO(CSV_BR)))
+    ok = [r for r in rows if isinstance(r, importers.StatementRow)]
+    bad = [r for r in rows if isinstance(r, importers.RowError)]
+    assert [(r.occurred_on, r.amount_cents, r.type) for r in ok] == [
+        (date(2024, 1, 5), -1250, "expense"),
+        (date(2024, 1, 5), 350000, "income"),
+        (date(2024, 1, 7), -123456, "expense"),
+    ]
+    assert [(e.line, e.message) for e in bad] == [(5, "Valor inválido")]
+
+    # tags partidas entre blocos de leitura não podem perder lançamentos
+    monkeypatch.setattr(sys.modules["services.importers.ofx_reader"], "CHUNK_SIZE", 37)
+    rows = list(importers.read_ofx(io.BytesIO(OFX_SGML)))
+    assert [(r.occurred_on, r.amount_cents, r.description) for r in rows] == [
+        (date(2024, 1, 10), -4590, "Farmácia"),
+        (date(2024, 1, 11), 10000, "PIX recebido"),
+        (date(2024, 1, 12), -8990, "C&A Modas - Cartão"),
+    ]
+    assert importers.detect_format(None, OFX_SGML[:512]) == "ofx"
+
+
+def test_import_skips_existing_rows_by_count(mods, tmp_path):
+    users, transactions, importers, users_repo, tx_repo = mods
+    u = users_repo.UserRepository.create(users.User(name="Imp", cpf="11122233344", password_hash=b"pw"))
+    # lançado à mão antes: um dos dois cafés iguais do extrato
+    tx_repo.TransactionRepository.create(transactions.Transaction(
+        user_id=u.get_id(), amount=5.0, type="expense", description="café",
+        occurred_at=datetime(2024, 2, 1, 15, 30, tzinfo=timezone.utc),
+    ))
+    path = tmp_path / "extrato.csv"
+    path.write_text(
+        "date,description,amount\n"
+        "2024-02-01,Café,-5.00\n"
+        "2024-02-01,Café,-5.00\n"
+        "2024-02-02,Aluguel,-1500.00\n"
+        "2024-02-03,Reembolso,5.00\n",
+        encoding="utf-8",
+    )
+
+    first = importers.StatementImporter.run(u.get_id(), str(path), batch_size=2)
+    assert (first.read, first.imported, first.duplicates, first.failed) == (4, 3, 1, 0)
+    again = importers.StatementImporter.run(u.get_id(), str(path))
+    assert (again.imported, again.duplicates) == (0, 4)
+
+    rows = tx_repo.TransactionRepository.list_by_user(u.get_id(), limit=10)
+    assert sorted((t.get_description(), t.get_amount_cents(), t.get_type()) for t in rows) == [
+        ("Aluguel", 150000, "expense"),
+        ("Café", 500, "expense"),
+        ("Reembolso", 500, "income"),
+        ("café", 500, "expense"),
+    ]
+
+    with pytest.raises(ValueError, match="Categoria não encontrada"):
+        importers.StatementImporter.run(u.get_id(), io.BytesIO(b"data;valor\n01/03/2024;-1,00\n"), fmt="csv", category_id=999)
@@ -0,0 +1,132 @@
+import os
+import sys
+from pathlib import Path
+from datetime import date
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def load_modules(db_path: str):
+    os.environ["DB_PATH"] = db_path
+    from sqlmodel import SQLModel
+    try:
+        SQLModel.metadata.clear()
+    except Exception:
+        pass
+    for mod in [
+        "db.session",
+        "db.models",
+        "services.users",
+        "services.debt_origins",
+        "services.debts",
+        "services.debt_installments",
+        "services.installment_scheduler",
+        "repository.bulk",
+        "repository.users",
+        "repository.cache",
+        "repository.refs",
+        "repository.debt_origins",
+        "repository.debts",
+        "repository.debt_installments",
+    ]:
+        if mod in sys.modules:
+            del sys.modules[mod]
+
+    import db.session as db_session
+    import db.models as db_models
+    db_session.init_db()
+
+    import services.users as users
+    import services.debt_origins as origins
+    import services.debts as debts
+    import services.installment_scheduler as scheduler
+    import repository.users as users_repo
+    import repository.debt_origins as origins_repo
+    import repository.debts as debts_repo
+    import repository.debt_installments as inst_repo
+    return users, origins, debts, scheduler, users_repo, origins_repo, debts_repo, inst_repo
+
+
+@pytest.fixture()
+def mods(tmp_path):
+    return load_modules(str(tmp_path / "test.db"))
+
+
+@pytest.fixture()
+def debt(mods):
+    users, origins, debts, scheduler, users_repo, origins_repo, debts_repo, inst_repo = mods
+    owner = users_repo.UserRepository.create(users.User(name="Owner", cpf="11122233344", password_hash=b"pw"))
+    origin = origins_repo.DebtOriginRepository.create(origins.DebtOrigin(user_id=owner.get_id(), name="Card"))
+    return debts_repo.DebtRepository.create(
+        debts.Debt(
+            user_id=owner.get_id(),
+            origin_id=origin.get_id(),
+            debt_date=date(2025, 1, 31),
+            total_amount=100.0,
+            installments=3,
+        )
+    )
+
+
+def test_add_months_clamps_day():
+    from services.debts import add_months
+    assert add_months(date(2025, 1, 31), 1) == date(2025, 2, 28)
+    assert add_months(date(2024, 1, 31), 1) == date(2024, 2, 29)
+    assert add_months(date(2025, 11, 15), 3) == date(2026, 2, 15)
+
+
+def test_reconcile_creates_schedule_then_is_a_noop(mods, debt):
+    scheduler, inst_repo = mods[3], mods[7]
+    res = scheduler.InstallmentScheduler.reconcile(debt)
+    assert (res.created, res.updated, res.deleted) == (3, 0, 0)
+    insts = inst_repo.DebtInstallmentRepository.list_by_debt(debt.get_id())
+    assert [i.get_due_on() for i in insts] == [date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31)]
+
+    # Alterar só as notas não gera escrita nenhuma
+    debt.set_notes("nova nota")
+    assert not scheduler.InstallmentScheduler.reconcile(debt).changed
+
+
+def test_reconcile_diffs_by_number_and_keeps_paid_state(mods, debt):
+    scheduler, inst_repo = mods[3], mods[7]
+    repo = inst_repo.DebtInstallmentRepository
+    scheduler.InstallmentScheduler.reconcile(debt)
+    first = repo.list_by_debt(debt.get_id())[0]
+    first.set_paid(True)
+    paid_at = repo.update(first).get_paid_at()
+    ids_before = [i.get_id() for i in repo.list_by_debt(debt.get_id())]
+
+    debt.set_installments(5)
+    res = scheduler.InstallmentScheduler.reconcile(debt)
+    assert (res.created, res.updated, res.deleted) == (2, 0, 0)
+    insts = repo.list_by_debt(debt.get_id())
+    assert [i.get_id() for i in insts[:3]] == ids_before
+    assert insts[0].get_paid() and insts[0].get_paid_at() == paid_at
+    assert not any(i.get_paid() for i in insts[1:])
+
+    debt.set_installments(2)
+    debt.set_debt_date(date(2025, 2, 10))
+    res = scheduler.InstallmentScheduler.reconcile(debt)
+    assert (res.created, res.updated, res.deleted) == (0, 2, 3)
+    insts = repo.list_by_debt(debt.get_id())
+    assert [i.get_id() for i in insts] == ids_before[:2]
+    assert [i.get_due_on() for i in insts] == [date(2025, 2, 10), date(2025, 3, 10)]
+    assert insts[0].get_paid_at() == paid_at
+
+
+def test_reconcile_follows_debt_paid_flag(mods, debt):
+    scheduler, inst_repo = mods[3], mods[7]
+    repo = inst_repo.DebtInstallmentRepository
+    scheduler.InstallmentScheduler.reconcile(debt)
+
+    debt.set_paid(True)
+    assert scheduler.InstallmentScheduler.reconcile(debt).updated == 3
+    assert all(i.get_paid() and i.get_paid_at() for i in repo.list_by_debt(debt.get_id()))
+
+    debt.set_paid(False)
+    assert scheduler.InstallmentScheduler.reconcile(debt).updated == 3
+    assert not any(i.get_paid() for i in repo.list_by_debt(debt.get_id()))
@@ -0,0 +1,135 @@
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def load_modules(db_path: str):
+    os.environ["DB_PATH"] = db_path
+    from sqlmodel import SQLModel
+    try:
+        SQLModel.metadata.clear()
+    except Exception:
+        pass
+    for mod in [
+        "db.session",
+        "db.models",
+        "services.users",
+        "services.transactions",
+        "repository.bulk",
+        "repository.refs",
+        "repository.users",
+        "repository.rollups",
+        "repository.transactions",
+    ]:
+        if mod in sys.modules:
+            del sys.modules[mod]
+
+    import db.session as db_session
+    import db.models as db_models
+    db_session.init_db()
+
+    import db.instrumentation as instrumentation
+    import services.users as users
+    import services.transactions as transactions
+    import repository.users as users_repo
+    import repository.transactions as tx_repo
+    return db_session, instrumentation, users, transactions, users_repo, tx_repo
+
+
+@pytest.fixture()
+def mods(tmp_path):
+    return load_modules(str(tmp_path / "test.db"))
+
+
+def _seed(users, transactions, users_repo, tx_repo, n):
+    uid = users_repo.UserRepository.create(users.User(name="Owner", cpf="11122233344", password_hash=b"pw")).get_id()
+    tx_repo.TransactionRepository.bulk_create([
+        transactions.Transaction(user_id=uid, amount=1.0 + i, type="expense", description=f"tx {i}") for i in range(n)
+    ])
+    return uid
+
+
+def test_collect_counts_queries_and_rows(mods):
+    db_session, instrumentation, users, transactions, users_repo, tx_repo = mods
+    uid = _seed(users, transactions, users_repo, tx_repo, 3)
+    assert not instrumentation.is_enabled(db_session.engine)
+
+    with instrumentation.collect("listagem", engine=db_session.engine) as log:
+        tx_repo.TransactionRepository.list_by_filters(uid)
+    assert log.count == 1
+    assert log.queries[0].rows == 3 and log.queries[0].statement.startswith("SELECT")
+    assert log.summary()["statements"][0]["count"] == 1
+    assert not instrumentation.is_enabled(db_session.engine)
+
+    # Fora de um collect() nada é registrado
+    tx_repo.TransactionRepository.list_by_filters(uid)
+    assert log.count == 1
+
+
+def test_assert_max_queries_locks_in_bulk_update(mods):
+    db_session, instrumentation, users, transactions, users_repo, tx_repo = mods
+    repo = tx_repo.TransactionRepository
+    uid = _seed(users, transactions, users_repo, tx_repo, 60)
+
+    def update(n):
+        txs = repo.list_by_filters(uid, limit=n)
+        for tx in txs:
+            tx.set_description(tx.get_description() + "!")
+        with instrumentation.collect(engine=db_session.engine) as log:
+            assert repo.bulk_update(txs).ok_count == n
+        return log.count
+
+    # o número de consultas não cresce com o número de linhas
+    assert update(5) == update(60)
+    with instrumentation.assert_max_queries(1):
+        repo.get_by_id(1)
+    with pytest.raises(AssertionError, match="2 consultas"):
+        with instrumentation.assert_max_queries(1):
+            repo.get_by_id(1)
+            repo.get_by_id(2)
+
+
+def test_slow_log_and_jsonl_dump(mods, tmp_path, caplog):
+    db_session, instrumentation, users, transactions, users_repo, tx_repo = mods
+    uid = _seed(users, transactions, users_repo, tx_repo, 1)
+    with caplog.at_level(logging.WARNING, logger="pinanca.sql"):
+        with instrumentation.collect("página", engine=db_session.engine) as log:
+            log.slow_ms = 0
+            tx_repo.TransactionRepository.list_by_filters(uid)
+    assert len(log.slow) == 1
+    assert "Consulta lenta" in caplog.text
+
+    path = tmp_path / "queries.jsonl"
+    log.dump_jsonl(str(path))
+    log.dump_jsonl(str(path))
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len(lines) == 2 and lines[0]["label"] == "página" and lines[0]["queries"] == 1
+
+
+def test_failed_queries_are_recorded(mods, monkeypatch):
+    from sqlalchemy.exc import OperationalError
+    db_session, instrumentation, users, transactions, users_repo, tx_repo = mods
+    uid = _seed(users, transactions, users_repo, tx_repo, 2)
+    engine = db_session.engine
+    with instrumentation.collect(engine=engine) as log:
+        with engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql("SELECT * FROM missing_table")
+            conn.exec_driver_sql("SELECT 1").all()
+    assert [(q.failed, q.rows) for q in log.queries] == [(True, None), (False, 1)]
+    assert log.summary()["failed"] == 1
+
+    # sem a estratégia interna do SQLAlchemy as consultas seguem, só sem contar linhas
+    monkeypatch.setattr(instrumentation, "_CountingFetch", None)
+    with instrumentation.collect(engine=engine) as log:
+        assert len(tx_repo.TransactionRepository.list_by_filters(uid)) == 2
+    assert log.count == 1 and log.queries[0].rows is None
+
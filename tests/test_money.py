@@ -0,0 +1,40 @@
+import sys
+import pytest
+from decimal import Decimal
+from pathlib import Path
+
+import pandas as pd
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from services.money import cents_to_decimal, from_cents, series_to_cents, to_cents
+
+
+def test_to_cents_rounds_half_up():
+    assert to_cents(0.1) == 10
+    assert to_cents(0.1 + 0.2) == 30
+    assert to_cents(19.995) == 2000
+    assert to_cents(-1.005) == -101
+    assert to_cents("12.345") == 1235
+    assert to_cents(Decimal("7.5")) == 750
+    assert to_cents(3) == 300
+    assert to_cents(None) == 0
+    for bad in ("abc", "", float("inf"), "-inf"):
+        with pytest.raises(ValueError):
+            to_cents(bad)
+    assert to_cents(float("nan")) == 0
+
+
+def test_from_cents_and_decimal():
+    assert from_cents(1234) == 12.34
+    assert from_cents(None) == 0.0
+    assert cents_to_decimal(1) == Decimal("0.01")
+    assert cents_to_decimal(-250) == Decimal("-2.50")
+
+
+def test_series_to_cents_matches_scalar():
+    values = pd.Series([0.1, 0.2, 19.995, 2.675, -1.005, None, 100.0])
+    assert series_to_cents(values).tolist() == [to_cents(v) for v in values]
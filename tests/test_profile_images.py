@@ -0,0 +1,117 @@
+import base64
+import hashlib
+import io
+import os
+import sys
+from pathlib import Path
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture()
+def images():
+    if "services.profile_images" in sys.modules:
+        del sys.modules["services.profile_images"]
+    import services.profile_images as images
+    return images
+
+
+@pytest.fixture()
+def store(tmp_path, images):
+    os.environ["DB_PATH"] = str(tmp_path / "test.db")
+    from sqlmodel import SQLModel
+    try:
+        SQLModel.metadata.clear()
+    except Exception:
+        pass
+    for mod in ["db.session", "db.models", "services.users", "repository.users"]:
+        if mod in sys.modules:
+            del sys.modules[mod]
+
+    import db.session as db_session
+    import db.models as db_models
+    db_session.init_db()
+
+    import services.users as users
+    import repository.users as users_repo
+    return users, users_repo.UserRepository, tmp_path / "imgs"
+
+
+def test_data_uri_is_cached_until_file_changes(images, tmp_path):
+    path = tmp_path / "a.png"
+    path.write_bytes(b"one")
+    first = images.image_data_uri(str(path))
+    assert first == "data:image/png;base64," + base64.b64encode(b"one").decode()
+    assert images.image_data_uri(str(path)) == first
+    assert images.cache_info()[:2] == (1, 1)
+
+    path.write_bytes(b"other")
+    os.utime(path, ns=(1, 1))
+    assert images.image_data_uri(str(path)).endswith(base64.b64encode(b"other").decode())
+    assert images.cache_info()[1] == 2
+
+    assert images.image_data_uri(str(tmp_path / "missing.png")) == ""
+    assert images.image_data_uri(None) == ""
+
+
+def test_save_without_pillow_keeps_original(images, tmp_path, monkeypatch):
+    monkeypatch.setattr(images, "_pil", lambda: None)
+    dest = images.save_profile_image(b"raw-bytes", "foto.jpg", tmp_path / "imgs")
+    assert Path(dest).name == hashlib.sha256(b"raw-bytes").hexdigest() + ".jpg"
+    assert Path(dest).read_bytes() == b"raw-bytes"
+    assert images.save_profile_image(b"raw-bytes", "outra.JPG", tmp_path / "imgs") == dest
+    assert os.listdir(tmp_path / "imgs") == [Path(dest).name]
+
+
+def test_thumbnail_on_save_and_display(images, tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    buf = io.BytesIO()
+    Image.effect_noise((1600, 1200), 64).convert("RGB").save(buf, format="PNG")
+    data = buf.getvalue()
+
+    dest = images.save_profile_image(data, "foto.png", tmp_path)
+    assert dest.endswith(".webp")
+    with Image.open(dest) as img:
+        assert img.size == (images.THUMB_SIZE, images.THUMB_SIZE)
+
+    # arquivos antigos grandes são reduzidos na exibição
+    legacy = tmp_path / "legacy.png"
+    legacy.write_bytes(data)
+    assert len(data) > images.MAX_INLINE_BYTES
+    assert images.image_data_uri(str(legacy)).startswith("data:image/webp;base64,")
+
+    with pytest.raises(ValueError):
+        images.make_thumbnail(b"not an image")
+
+
+def test_release_and_gc_follow_user_references(images, store, monkeypatch):
+    users, Repo, directory = store
+    monkeypatch.setattr(images, "_pil", lambda: None)
+    shared = images.store_blob(b"shared", ".png", directory)
+    old = images.store_blob(b"old", ".png", directory)
+    a = Repo.create(users.User(name="A", cpf="11122233344", password_hash=b"pw", profile_image=shared))
+    Repo.create(users.User(name="B", cpf="55566677788", password_hash=b"pw", profile_image=shared))
+    assert Repo.count_profile_image_refs(shared) == 2
+
+    # recém-gravadas ficam protegidas pelo período de carência
+    assert images.release_profile_image(old, directory) is False
+    monkeypatch.setattr(images, "GC_GRACE_SECONDS", 0)
+    assert images.release_profile_image(shared, directory) is False  # ainda em uso
+    assert images.release_profile_image(old, directory) is True
+    assert not Path(old).exists()
+
+    legacy = directory / "0123abcd.png"
+    legacy.write_bytes(b"legacy")
+    (directory / ".tmp-abandoned").write_bytes(b"partial")
+    a.set_profile_image(None)
+    Repo.update(a)
+    assert images.collect_garbage(directory, grace_seconds=3600) == []
+    removed = images.collect_garbage(directory, grace_seconds=0, dry_run=True)
+    assert removed == sorted([str(legacy), str(directory / ".tmp-abandoned")])
+    assert legacy.exists()
+    assert images.collect_garbage(directory, grace_seconds=0) == removed
+    assert os.listdir(directory) == [Path(shared).name]
@@ -0,0 +1,136 @@
+import os
+import sys
+from pathlib import Path
+from datetime import date, datetime, timezone
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def load_modules(db_path: str):
+    os.environ["DB_PATH"] = db_path
+    from sqlmodel import SQLModel
+    try:
+        SQLModel.metadata.clear()
+    except Exception:
+        pass
+    for mod in [
+        "db.session",
+        "db.models",
+        "services.users",
+        "services.debts",
+        "services.transactions",
+        "services.recurrence",
+        "repository.bulk",
+        "repository.refs",
+        "repository.users",
+        "repository.rollups",
+        "repository.transactions",
+    ]:
+        if mod in sys.modules:
+            del sys.modules[mod]
+
+    import db.session as db_session
+    import db.models as db_models
+    db_session.init_db()
+
+    import services.users as users
+    import services.transactions as transactions
+    import services.recurrence as recurrence
+    import repository.users as users_repo
+    import repository.rollups as rollups
+    import repository.transactions as transactions_repo
+    return users, transactions, recurrence, users_repo, rollups, transactions_repo
+
+
+@pytest.fixture()
+def mods(tmp_path):
+    return load_modules(str(tmp_path / "test.db"))
+
+
+def rule(transactions, uid, periodicity, start, amount=10.0):
+    return transactions.Transaction(
+        user_id=uid,
+        amount=amount,
+        type="expense",
+        fixed=True,
+        periodicity=periodicity,
+        next_execution=start,
+        occurred_at=datetime(start.year, start.month, start.day, tzinfo=timezone.utc),
+        description=f"{periodicity} rule",
+    )
+
+
+def test_next_date_keeps_anchor_day(mods):
+    engine = mods[2].RecurrenceEngine
+    assert engine.next_date(date(2025, 1, 31), "monthly") == date(2025, 2, 28)
+    assert engine.next_date(date(2025, 2, 28), "monthly", anchor_day=31) == date(2025, 3, 31)
+    assert engine.next_date(date(2024, 2, 29), "yearly") == date(2025, 2, 28)
+    assert engine.next_date(date(2025, 2, 28), "yearly", anchor_day=29) == date(2026, 2, 28)
+    assert engine.next_date(date(2025, 12, 29), "weekly") == date(2026, 1, 5)
+    with pytest.raises(ValueError):
+        engine.next_date(date(2025, 1, 1), "none")
+
+
+def test_run_materializes_due_rules_and_is_idempotent(mods):
+    users, transactions, recurrence, users_repo, rollups, transactions_repo = mods
+    repo = transactions_repo.TransactionRepository
+    uid = users_repo.UserRepository.create(users.User(name="Owner", cpf="11122233344", password_hash=b"pw")).get_id()
+    monthly = repo.create(rule(transactions, uid, "monthly", date(2025, 1, 31)))
+    weekly = repo.create(rule(transactions, uid, "weekly", date(2025, 3, 1)))
+    future = repo.create(rule(transactions, uid, "yearly", date(2026, 1, 1)))
+    repo.create(transactions.Transaction(user_id=uid, amount=5.0, type="income", fixed=True, periodicity="monthly"))
+
+    res = recurrence.RecurrenceEngine.run(until=date(2025, 3, 31), chunk_size=1)
+    assert (res.rules, res.created) == (2, 3 + 5)
+
+    made = repo.list_by_filters(uid, fixed=False, limit=100)
+    monthly_dates = sorted(t.get_occurred_at().date() for t in made if t.get_description() == "monthly rule")
+    assert monthly_dates == [date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31)]
+    assert repo.get_by_id(monthly.get_id()).get_next_execution() == date(2025, 4, 30)
+    assert repo.get_by_id(weekly.get_id()).get_next_execution() == date(2025, 4, 5)
+    assert repo.get_by_id(future.get_id()).get_next_execution() == date(2026, 1, 1)
+    assert rollups.verify_rollups() == []
+
+    again = recurrence.RecurrenceEngine.run(until=date(2025, 3, 31))
+    assert (again.rules, again.created) == (0, 0)
+    assert len(repo.list_by_filters(uid, fixed=False, limit=100)) == 8
+
+
+def test_materialize_rejects_rules_advanced_elsewhere(mods):
+    users, transactions, recurrence, users_repo, rollups, transactions_repo = mods
+    repo = transactions_repo.TransactionRepository
+    uid = users_repo.UserRepository.create(users.User(name="Owner", cpf="11122233344", password_hash=b"pw")).get_id()
+    r = repo.create(rule(transactions, uid, "monthly", date(2025, 1, 10)))
+
+    stale = {"rule_id": r.get_id(), "old": date(2024, 12, 10), "new": date(2025, 2, 10)}
+    occurrence = {
+        "user_id": uid, "category_id": None, "amount_cents": 1000, "type": "expense",
+        "description": None, "notes": None, "occurred_at": datetime(2025, 1, 10, tzinfo=timezone.utc),
+    }
+    with pytest.raises(ValueError):
+        repo.materialize_occurrences([occurrence], [stale])
+    assert repo.list_by_filters(uid, fixed=False) == []
+    assert repo.get_by_id(r.get_id()).get_next_execution() == date(2025, 1, 10)
+
+
+def test_legacy_rule_without_next_execution_is_backfilled(mods):
+    users, transactions, recurrence, users_repo, rollups, transactions_repo = mods
+    repo = transactions_repo.TransactionRepository
+    db_session = sys.modules["db.session"]
+    uid = users_repo.UserRepository.create(users.User(name="Owner", cpf="11122233344", password_hash=b"pw")).get_id()
+    legacy = repo.create(rule(transactions, uid, "monthly", date(2025, 1, 10)))
+    # banco da versão 2: o formulário antigo não preenchia next_execution
+    with db_session.engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE \"transaction\" SET next_execution = NULL")
+        conn.exec_driver_sql("PRAGMA user_version = 2")
+    assert recurrence.RecurrenceEngine.run(until=date(2025, 3, 31)).rules == 0
+
+    db_session.init_db()
+    assert repo.get_by_id(legacy.get_id()).get_next_execution() == date(2025, 1, 10)
+    res = recurrence.RecurrenceEngine.run(until=date(2025, 3, 31))
+    assert (res.rules, res.created) == (1, 3)
+    assert repo.get_by_id(legacy.get_id()).get_next_execution() == date(2025, 4, 10)
@@ -0,0 +1,138 @@
+import os
+import sys
+from pathlib import Path
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def load_modules(db_path: str):
+    os.environ["DB_PATH"] = db_path
+    from sqlmodel import SQLModel
+    try:
+        SQLModel.metadata.clear()
+    except Exception:
+        pass
+    for mod in [
+        "db.session",
+        "db.models",
+        "services.users",
+        "services.categories",
+        "services.debt_origins",
+        "repository.bulk",
+        "repository.users",
+        "repository.cache",
+        "repository.refs",
+        "repository.categories",
+        "repository.debt_origins",
+    ]:
+        if mod in sys.modules:
+            del sys.modules[mod]
+
+    import db.session as db_session
+    import db.models as db_models
+    db_session.init_db()
+
+    import services.users as users
+    import services.categories as categories
+    import services.debt_origins as origins
+    import repository.users as users_repo
+    import repository.cache as cache
+    import repository.categories as categories_repo
+    import repository.debt_origins as origins_repo
+    return users, categories, origins, users_repo, cache, categories_repo, origins_repo
+
+
+@pytest.fixture()
+def mods(tmp_path):
+    return load_modules(str(tmp_path / "test.db"))
+
+
+def test_ref_cache_ttl_and_lru():
+    from repository.cache import RefCache
+    now = [0.0]
+    cache = RefCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    loads = []
+
+    def loader(v):
+        return lambda: loads.append(v) or v
+
+    assert cache.get_or_load("a", loader(1)) == 1
+    assert cache.get_or_load("a", loader(2)) == 1
+    cache.get_or_load("b", loader(3))
+    cache.get_or_load("a", loader(4))   # "a" passa a ser a mais recente
+    cache.get_or_load("c", loader(5))   # despeja "b"
+    assert cache.get_or_load("b", loader(6)) == 6
+    now[0] = 11.0
+    assert cache.get_or_load("b", loader(7)) == 7  # expirou
+    assert loads == [1, 3, 5, 6, 7]
+    assert cache.stats() == {"hits": 2, "misses": 5, "evictions": 2, "expired": 1, "invalidations": 0, "size": 2}
+
+
+def test_load_racing_an_invalidation_is_not_stored():
+    from repository.cache import RefCache
+    cache = RefCache(maxsize=4, ttl=300)
+
+    def stale_loader():
+        # uma escrita confirma e invalida enquanto a leitura ainda carrega
+        cache.invalidate([("category", 1)])
+        return ["antes da escrita"]
+
+    assert cache.get_or_load(("category", 1), stale_loader) == ["antes da escrita"]
+    assert cache.get_or_load(("category", 1), lambda: ["depois"]) == ["depois"]
+    assert cache.get_or_load(("category", 1), lambda: ["não recarrega"]) == ["depois"]
+
+    def cleared_loader():
+        cache.clear()
+        return ["antes do clear"]
+
+    cache.get_or_load(("category", 2), cleared_loader)
+    assert cache.get_or_load(("category", 2), lambda: ["novo"]) == ["novo"]
+
+def test_list_by_user_served_from_cache_and_invalidated_on_writes(mods):
+    from db.instrumentation import assert_max_queries
+    users, categories, origins, users_repo, cache, categories_repo, origins_repo = mods
+    repo = categories_repo.CategoryRepository
+    uid = users_repo.UserRepository.create(users.User(name="Owner", cpf="11122233344", password_hash=b"pw")).get_id()
+    other = users_repo.UserRepository.create(users.User(name="Other", cpf="55566677788", password_hash=b"pw")).get_id()
+    food = repo.create(categories.Category(user_id=uid, name="Food"))
+    repo.create(categories.Category(user_id=other, name="Other's"))
+
+    assert [c.get_name() for c in repo.list_by_user(uid)] == ["Food"]
+    with assert_max_queries(0):
+        listed = repo.list_by_user(uid)
+    # alterar o DTO devolvido não altera o cache
+    listed[0].set_name("Mutated")
+    assert [c.get_name() for c in repo.list_by_user(uid)] == ["Food"]
+
+    repo.list_by_user(other)
+    repo.create(categories.Category(user_id=uid, name="Rent"))
+    assert [c.get_name() for c in repo.list_by_user(uid)] == ["Food", "Rent"]
+    with assert_max_queries(0):
+        repo.list_by_user(other)  # escrita de outro usuário não invalida esta chave
+
+    food.set_name("Groceries")
+    repo.update(food)
+    assert [c.get_name() for c in repo.list_by_user(uid)][0] == "Groceries"
+    repo.bulk_update([food.__class__(id=food.get_id(), user_id=uid, name="Market")])
+    assert [c.get_name() for c in repo.list_by_user(uid)][0] == "Market"
+    repo.delete(food.get_id())
+    assert [c.get_name() for c in repo.list_by_user(uid)] == ["Rent"]
+    assert [c.get_name() for c in repo.list_by_user(uid, limit=1, offset=1)] == []
+
+    stats = cache.reference_cache.stats()
+    assert stats["hits"] >= 2 and stats["invalidations"] >= 4
+
+
+def test_bulk_delete_invalidates_owners(mods):
+    users, categories, origins, users_repo, cache, categories_repo, origins_repo = mods
+    repo = origins_repo.DebtOriginRepository
+    uid = users_repo.UserRepository.create(users.User(name="Owner", cpf="11122233344", password_hash=b"pw")).get_id()
+    created = repo.bulk_create([origins.DebtOrigin(user_id=uid, name=n) for n in ("Card", "Bank", "Store")])
+    assert len(repo.list_by_user(uid)) == 3
+    ids = [o.get_id() for o in created.results]
+    assert repo.bulk_delete(ids[:2]).ok_count == 2
+    assert [o.get_name() for o in repo.list_by_user(uid)] == ["Store"]
@@ -0,0 +1,146 @@
+import os
+import sys
+from pathlib import Path
+from datetime import datetime, timezone
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def load_modules(db_path: str):
+    os.environ["DB_PATH"] = db_path
+    from sqlmodel import SQLModel
+    try:
+        SQLModel.metadata.clear()
+    except Exception:
+        pass
+    for mod in [
+        "db.session",
+        "db.models",
+        "services.users",
+        "services.categories",
+        "services.transactions",
+        "repository.bulk",
+        "repository.users",
+        "repository.cache",
+        "repository.refs",
+        "repository.categories",
+        "repository.rollups",
+        "repository.transactions",
+        "repository.reports",
+    ]:
+        if mod in sys.modules:
+            del sys.modules[mod]
+
+    import db.session as db_session
+    import db.models as db_models
+    db_session.init_db()
+
+    import services.users as users
+    import services.categories as categories
+    import services.transactions as transactions
+    import repository.users as users_repo
+    import repository.categories as categories_repo
+    import repository.transactions as transactions_repo
+    import repository.reports as reports_repo
+    return users, categories, transactions, users_repo, categories_repo, transactions_repo, reports_repo
+
+
+def d(y, m, day):
+    return datetime(y, m, day, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def setup(tmp_path):
+    users, categories, transactions, users_repo, categories_repo, transactions_repo, reports_repo = load_modules(
+        str(tmp_path / "test.db")
+    )
+    owner = users_repo.UserRepository.create(users.User(name="Owner", cpf="11122233344", password_hash=b"pw"))
+    other = users_repo.UserRepository.create(users.User(name="Other", cpf="55566677788", password_hash=b"pw"))
+    food = categories_repo.CategoryRepository.create(categories.Category(user_id=owner.get_id(), name="Food"))
+    Tx = transactions.Transaction
+    uid = owner.get_id()
+    transactions_repo.TransactionRepository.bulk_create([
+        Tx(user_id=uid, amount=1000.0, type="income", occurred_at=d(2024, 12, 5)),
+        Tx(user_id=uid, amount=3000.0, type="income", occurred_at=d(2025, 1, 5)),
+        Tx(user_id=uid, amount=200.0, type="expense", category_id=food.get_id(), occurred_at=d(2025, 1, 10)),
+        Tx(user_id=uid, amount=50.0, type="expense", occurred_at=d(2025, 1, 20)),
+        Tx(user_id=uid, amount=100.0, type="expense", category_id=food.get_id(), occurred_at=d(2025, 2, 3)),
+        # Modelo de recorrência: não é movimentação
+        Tx(user_id=uid, amount=999.0, type="expense", fixed=True, periodicity="monthly", occurred_at=d(2025, 1, 1)),
+        Tx(user_id=other.get_id(), amount=777.0, type="income", occurred_at=d(2025, 1, 5)),
+    ])
+    return reports_repo.ReportRepository, uid
+
+
+def test_monthly_totals_groups_by_month(setup):
+    reports, uid = setup
+    df = reports.monthly_totals(uid, start=d(2025, 1, 1), end=d(2025, 2, 28))
+    assert df["mes"].tolist() == ["2025-01", "2025-02"]
+    assert df["entradas"].tolist() == [3000.0, 0.0]
+    assert df["saidas"].tolist() == [250.0, 100.0]
+    assert df["liquido"].tolist() == [2750.0, -100.0]
+
+
+def test_category_breakdown_and_balance_series(setup):
+    reports, uid = setup
+    cats = reports.category_breakdown(uid, start=d(2025, 1, 1))
+    assert cats[["categoria", "total"]].values.tolist() == [["Food", 300.0], ["Sem categoria", 50.0]]
+    with pytest.raises(ValueError):
+        reports.category_breakdown(uid, type="other")
+
+    bal = reports.balance_series(uid, start=d(2025, 1, 1))
+    assert bal["mes"].tolist() == ["2025-01", "2025-02"]
+    assert bal["saldo"].tolist() == [3750.0, 3650.0]
+
+
+def test_reports_empty_for_unknown_user(setup):
+    reports, _ = setup
+    assert reports.monthly_totals(424242).empty
+    assert reports.balance_series(424242).empty
+
+
+def test_rollups_follow_every_write_path(setup):
+    reports, uid = setup
+    import repository.rollups as rollups
+    from repository.transactions import TransactionRepository
+    from services.transactions import Transaction
+
+    assert rollups.verify_rollups() == []
+
+    tx = TransactionRepository.create(Transaction(user_id=uid, amount=40.0, type="expense", occurred_at=d(2025, 2, 10)))
+    tx.set_occurred_at(d(2025, 3, 1))
+    tx.set_amount(60.0)
+    TransactionRepository.update(tx)
+    assert reports.monthly_totals(uid, start=d(2025, 3, 1))["saidas"].tolist() == [60.0]
+
+    jan = [t for t in TransactionRepository.list_by_user(uid) if t.get_occurred_at().month == 1 and not t.get_fixed()]
+    for t in jan:
+        t.set_type("income")
+    TransactionRepository.bulk_update(jan)
+    TransactionRepository.bulk_delete([t.get_id() for t in jan[:1]])
+    TransactionRepository.delete(tx.get_id())
+    assert rollups.verify_rollups() == []
+    assert reports.monthly_totals(uid, start=d(2025, 3, 1)).empty
+
+
+def test_rebuild_rollups_restores_summary(setup):
+    reports, uid = setup
+    import repository.rollups as rollups
+    from sqlmodel import Session, delete
+    from db.session import engine
+    from db.models import MonthlySummary
+
+    with Session(engine) as s:
+        s.exec(delete(MonthlySummary))
+        s.commit()
+    assert rollups.verify_rollups(uid) != []
+    assert rollups.rebuild_rollups(uid) == 5
+    assert rollups.verify_rollups(uid) == []
+    assert rollups.verify_rollups() != []
+    rollups.rebuild_rollups()
+    assert rollups.verify_rollups() == []
+    assert reports.monthly_totals(uid)["mes"].tolist() == ["2024-12", "2025-01", "2025-02"]
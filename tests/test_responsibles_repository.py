@@ -22,6 +22,8 @@ def load_modules(db_path: str):
         "services.users",
         "services.responsibles",
         "repository.users",
+        "repository.cache",
+        "repository.refs",
         "repository.responsibles",
     ]:
         if mod in sys.modules:
@@ -155,3 +157,27 @@ def test_delete_responsible(mods):
     assert len(lst) == 1
     assert lst[0].get_id() == r2.get_id()
 
+
+def test_related_user_only_needs_to_exist(mods):
+    users, responsibles, users_repo, resp_repo = mods
+    Repo = resp_repo.ResponsibleRepository
+    owner = users_repo.UserRepository.create(users.User(name="Owner9", cpf="30303030303", password_hash=b"pw"))
+    other = users_repo.UserRepository.create(users.User(name="Other", cpf="40404040404", password_hash=b"pw"))
+
+    # o usuário relacionado é de outra conta e não precisa ter o mesmo dono
+    r = Repo.create(responsibles.Responsible(user_id=owner.get_id(), name="Par", related_user_id=other.get_id()))
+    assert r.get_related_user_id() == other.get_id()
+
+    with pytest.raises(ValueError, match="Usuário relacionado não encontrado"):
+        Repo.create(responsibles.Responsible(user_id=owner.get_id(), name="X", related_user_id=999999))
+    r.set_related_user_id(999999)
+    with pytest.raises(ValueError, match="Usuário relacionado não encontrado"):
+        Repo.update(r)
+
+    result = Repo.bulk_create([
+        responsibles.Responsible(user_id=owner.get_id(), name="A", related_user_id=other.get_id()),
+        responsibles.Responsible(user_id=owner.get_id(), name="B", related_user_id=999999),
+        responsibles.Responsible(user_id=999999, name="C"),
+    ])
+    assert result.ok_count == 1
+    assert result.errors == {1: "Usuário relacionado não encontrado", 2: "Usuário não encontrado"}
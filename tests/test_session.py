@@ -1,8 +1,8 @@
 import os
 import sys
+from types import SimpleNamespace
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
-import json
 import pytest
 
 # Ensure project root is on sys.path
@@ -14,7 +14,7 @@ if str(ROOT) not in sys.path:
 def setup_env(tmpdir: Path):
     os.environ["DB_PATH"] = str(tmpdir / "test.db")
     os.environ["AUTH_SECRET"] = "test-secret"
-    os.environ["SESSION_FILE"] = str(tmpdir / "session.json")
+    os.environ.pop("SESSION_STORE", None)
 
 
 def load_modules():
@@ -28,7 +28,10 @@ def load_modules():
         "db.models",
         "services.users",
         "repository.users",
+        "repository.sessions",
         "core.config",
+        "core.kdf",
+        "core.ratelimit",
         "core.auth",
         "core.session",
     ]:
@@ -65,15 +68,12 @@ def test_login_persist_and_current_user(mods):
     assert current is not None
     assert current.get_id() == u.get_id()
 
-    # file exists with token
-    sess_path = Path(os.environ["SESSION_FILE"])    
-    assert sess_path.exists()
-    data = json.loads(sess_path.read_text())
-    assert isinstance(data.get("token"), str)
+    # token guardado na sessão em memória
+    assert isinstance(session.load_token(), str)
 
-    # logout clears file and current_user
+    # logout clears token and current_user
     session.logout()
-    assert not sess_path.exists()
+    assert session.load_token() is None
     assert session.current_user() is None
 
 
@@ -90,4 +90,140 @@ def test_current_user_clears_expired(mods, tmp_path):
 
     # current_user should clear invalid token and return None
     assert session.current_user() is None
-    assert not Path(os.environ["SESSION_FILE"]).exists()
+    assert session.load_token() is None
+    assert session.resolver_stats()["sessions"] == 0
+
+
+def test_current_user_is_cached_until_update_or_logout(mods, monkeypatch):
+    users, users_repo, auth, session = mods
+    u = users_repo.UserRepository.create(
+        users.User(name="Cached", cpf="22233344455", password_hash=auth.hash_password("pw"))
+    )
+    session.login_and_persist("22233344455", "pw")
+    session.reset_resolver_cache()
+
+    calls = {"verify": 0}
+    real_verify = session.verify_session
+
+    def counting_verify(token):
+        calls["verify"] += 1
+        return real_verify(token)
+
+    monkeypatch.setattr(session, "verify_session", counting_verify)
+    for _ in range(5):
+        assert session.current_user().get_id() == u.get_id()
+    assert calls["verify"] == 1
+    stats = session.resolver_stats()
+    assert (stats["hits"], stats["misses"]) == (4, 1)
+
+    # UserRepository.update invalida a entrada e a próxima leitura vê o novo nome
+    current = session.current_user()
+    current.set_name("Renamed")
+    users_repo.UserRepository.update(current)
+    assert session.current_user().get_name() == "Renamed"
+    assert calls["verify"] == 2
+
+    session.logout()
+    assert session.current_user() is None
+    assert session.resolver_stats()["cached"] == 0
+    assert auth.token_cache_stats()["size"] == 0  # logout tira o token do cache de verificação
+
+
+def test_sessions_are_per_browser_and_bounded(mods):
+    users, users_repo, auth, session = mods
+    a = users_repo.UserRepository.create(users.User(name="A", cpf="33344455566", password_hash=b"pw"))
+    b = users_repo.UserRepository.create(users.User(name="B", cpf="44455566677", password_hash=b"pw"))
+    session.save_token(auth.issue_session(a.get_id()), key="st:tab-a")
+    session.save_token(auth.issue_session(b.get_id()), key="st:tab-b")
+    assert auth.verify_session(session.load_token("st:tab-a"))["sub"] == a.get_id()
+    assert auth.verify_session(session.load_token("st:tab-b"))["sub"] == b.get_id()
+    assert session.load_token() is None  # chave "local" não foi usada
+
+    session.clear_token("st:tab-a")
+    assert session.load_token("st:tab-a") is None
+    assert session.load_token("st:tab-b") is not None
+
+    store = session.SessionStore(maxsize=3, clock=lambda: 100.0)
+    for i in range(5):
+        store.put(f"k{i}", f"t{i}", 1, exp=200 if i != 4 else 50)
+    assert store.get("k0") is None and store.get("k1") is None  # descartadas pelo LRU
+    assert store.get("k4") is None  # expirada
+    assert store.stats()["evictions"] == 2 and len(store) == 2
+
+
+def test_sqlite_store_survives_restart_and_revokes(mods, monkeypatch):
+    users, users_repo, auth, session = mods
+    monkeypatch.setattr(session.config, "SESSION_STORE", "sqlite")
+    u = users_repo.UserRepository.create(users.User(name="Db", cpf="55566677788", password_hash=b"pw"))
+    token = auth.issue_session(u.get_id())
+    session.save_token(token, key="cookie:abc")
+    session.save_token(token, key="cookie:def")
+
+    session._store.clear()  # reinício do processo
+    assert session.load_token("cookie:abc") == token
+
+    assert session.revoke_user(u.get_id()) == 2
+    session._store.clear()
+    assert session.load_token("cookie:abc") is None
+    assert session.load_token("cookie:def") is None
+
+
+def test_sqlite_store_requires_a_persistent_key(mods, monkeypatch):
+    _users, _users_repo, _auth, session = mods
+    fake_st = SimpleNamespace(context=SimpleNamespace(cookies={"pinanca_sid": "abc"}))
+    monkeypatch.setitem(sys.modules, "streamlit", fake_st)
+    monkeypatch.setattr(session.config, "SESSION_STORE", "sqlite")
+    monkeypatch.setattr(session.config, "SESSION_COOKIE", "")
+    monkeypatch.setattr(session.config, "SESSION_QUERY_PARAM", "")
+    with pytest.raises(ValueError, match="SESSION_COOKIE"):
+        session._browser_key()
+
+    monkeypatch.setattr(session.config, "SESSION_COOKIE", "pinanca_sid")
+    assert session._browser_key() == "cookie:abc"
+
+
+def test_url_session_id_survives_reload_and_rotates_on_login(mods, monkeypatch):
+    users, users_repo, auth, session = mods
+    fake_st = SimpleNamespace(query_params={}, session_state={})
+    monkeypatch.setitem(sys.modules, "streamlit", fake_st)
+    users_repo.UserRepository.create(
+        users.User(name="Url", cpf="12312312399", password_hash=auth.hash_password("pw123"))
+    )
+
+    before = session._browser_key()
+    assert before.startswith("url:") and fake_st.query_params["sid"] == before[4:]
+    uid = session.login_and_persist("12312312399", "pw123")
+    sid = fake_st.query_params["sid"]
+    assert "url:" + sid != before  # o link de antes do login não vale
+
+    # st.switch_page limpa a URL: o id volta de st.session_state
+    fake_st.query_params.clear()
+    assert session.current_user().get_id() == uid
+    assert fake_st.query_params["sid"] == sid
+
+    # recarga: nova sessão do Streamlit, mesma URL
+    fake_st.session_state = {}
+    assert session.current_user().get_id() == uid
+
+    # ids fora do formato são trocados por um novo
+    fake_st.query_params["sid"] = "x"
+    fake_st.session_state = {}
+    assert session.current_user() is None and fake_st.query_params["sid"] != "x"
+
+
+def test_client_key_uses_trusted_proxy_header_and_never_the_session(mods, monkeypatch):
+    _users, _users_repo, _auth, session = mods
+    ctx = SimpleNamespace(ip_address="10.0.0.1", headers={"X-Forwarded-For": "6.6.6.6, 203.0.113.7"})
+    monkeypatch.setitem(sys.modules, "streamlit", SimpleNamespace(context=ctx))
+    assert session._client_key() == "ip:10.0.0.1"
+
+    # o primeiro IP vem do cliente; o último foi acrescentado pelo proxy
+    monkeypatch.setattr(session.config, "TRUSTED_PROXY_HEADER", "X-Forwarded-For")
+    assert session._client_key() == "ip:203.0.113.7"
+
+    # sem IP conhecido não há chave de cliente (só o limite por CPF)
+    ctx.headers = {}
+    assert session._client_key() is None
+    monkeypatch.setattr(session.config, "TRUSTED_PROXY_HEADER", "")
+    ctx.ip_address = None
+    assert session._client_key() is None
@@ -0,0 +1,67 @@
+import sys
+from datetime import date
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Ensure project root is on sys.path
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from ui.table_diff import diff_frames
+
+
+COLUMNS = {"tipo": "text", "descricao": "text", "valor": "money", "data": "date", "parcelas": "int", "pago": "bool"}
+
+
+def frame(rows):
+    return pd.DataFrame(rows).set_index("id", drop=True)
+
+
+def test_diff_reports_only_changed_fields():
+    base = frame([
+        {"id": 1, "sel": False, "tipo": "Entrada", "descricao": "Salário", "valor": 10.0, "data": date(2025, 1, 1), "parcelas": 1, "pago": False},
+        {"id": 2, "sel": False, "tipo": "Saída", "descricao": None, "valor": 0.1 + 0.2, "data": date(2025, 1, 2), "parcelas": 2, "pago": True},
+        {"id": 3, "sel": False, "tipo": "Saída", "descricao": "Luz", "valor": 5.0, "data": None, "parcelas": 1, "pago": False},
+    ])
+    edited = base.copy()
+    edited.loc[1, "sel"] = True                 # coluna fora da comparação
+    edited.loc[1, "descricao"] = " Salário  "   # só espaços
+    edited.loc[2, "valor"] = 0.3                # mesmo valor em centavos
+    edited.loc[2, "descricao"] = ""             # None -> "" não é alteração
+    edited.loc[3, "valor"] = 5.5
+    edited.loc[3, "data"] = date(2025, 3, 1)
+    edited.loc[3, "pago"] = True
+
+    diff = diff_frames(base, edited, COLUMNS)
+    assert diff.changed_ids == [3]
+    assert diff.patches == {3: {"valor": 550, "data": date(2025, 3, 1), "pago": True}}
+
+
+def test_diff_aligns_on_index_not_position():
+    base = frame([{"id": 10, "nome": "A"}, {"id": 20, "nome": "B"}])
+    edited = frame([{"id": 20, "nome": "B"}, {"id": 10, "nome": "Z"}, {"id": 30, "nome": "novo"}])
+    diff = diff_frames(base, edited, {"nome": "text"})
+    assert diff.patches == {10: {"nome": "Z"}}
+    assert not diff_frames(base, base.copy(), {"nome": "text"})
+
+
+def test_diff_rejects_unknown_kind():
+    base = frame([{"id": 1, "nome": "A"}])
+    with pytest.raises(ValueError):
+        diff_frames(base, base, {"nome": "texto"})
+
+
+def test_diff_on_large_tables():
+    n = 5000
+    base = frame([
+        {"id": i, "tipo": "Saída", "descricao": f"item {i}", "valor": i / 100, "data": date(2025, 1, 1), "parcelas": 1, "pago": False}
+        for i in range(1, n + 1)
+    ])
+    edited = base.copy()
+    edited.loc[edited.index % 10 == 0, "valor"] = 1.0
+    # o tempo fica em benchmarks/test_save_paths.py::test_table_diff
+    diff = diff_frames(base, edited, COLUMNS)
+    assert len(diff) == n // 10 - 1  # id 100 já valia 1.0
@@ -24,7 +24,10 @@ def load_modules(db_path: str):
         "services.categories",
         "services.transactions",
         "repository.users",
+        "repository.cache",
+        "repository.refs",
         "repository.categories",
+        "repository.rollups",
         "repository.transactions",
     ]:
         if mod in sys.modules:
@@ -124,3 +127,44 @@ def test_validations(mods):
     with pytest.raises(ValueError):
         tx_repo.TransactionRepository.create(transactions.Transaction(user_id=None, amount=10, type="income"))
 
+
+def test_list_page_by_filters_keyset(mods):
+    users, categories, transactions, users_repo, categories_repo, tx_repo = mods
+    u = users_repo.UserRepository.create(users.User(name="Pager", cpf="45645645645", password_hash=b"pw"))
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    created = []
+    for i in range(7):
+        # dois registros por instante para exercitar o desempate por id
+        occ = base + timedelta(days=i // 2)
+        created.append(tx_repo.TransactionRepository.create(
+            transactions.Transaction(user_id=u.get_id(), amount=1.0 + i, type="expense", occurred_at=occ)
+        ))
+
+    expected = [t.get_id() for t in tx_repo.TransactionRepository.list_by_filters(u.get_id(), fixed=False)]
+    seen, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = tx_repo.TransactionRepository.list_page_by_filters(u.get_id(), fixed=False, limit=3, cursor=cursor)
+        seen.extend(t.get_id() for t in rows)
+        pages += 1
+        if cursor is None:
+            break
+    assert seen == expected
+    assert pages == 3
+
+    with pytest.raises(ValueError):
+        tx_repo.TransactionRepository.list_page_by_filters(u.get_id(), cursor="not-a-cursor")
+
+
+def test_search_by_description_and_notes(mods):
+    users, categories, transactions, users_repo, categories_repo, tx_repo = mods
+    repo = tx_repo.TransactionRepository
+    u = users_repo.UserRepository.create(users.User(name="Finder", cpf="78978978978", password_hash=b"pw"))
+    agua = repo.create(transactions.Transaction(user_id=u.get_id(), amount=80.0, type="expense", description="Conta de água"))
+    pix = repo.create(transactions.Transaction(user_id=u.get_id(), amount=20.0, type="expense", description="Padaria", notes="pago no pix"))
+    fixa = repo.create(transactions.Transaction(user_id=u.get_id(), amount=80.0, type="expense", fixed=True, periodicity="monthly", description="Água (fixa)"))
+
+    assert {t.get_id() for t in repo.search(u.get_id(), "agua")[0]} == {agua.get_id(), fixa.get_id()}
+    assert [t.get_id() for t in repo.search(u.get_id(), "agua", fixed=False)[0]] == [agua.get_id()]
+    assert [t.get_id() for t in repo.search(u.get_id(), "pix")[0]] == [pix.get_id()]
+    repo.bulk_delete([pix.get_id()])
+    assert repo.search(u.get_id(), "pix") == ([], None)
@@ -37,7 +37,7 @@ def test_transaction_to_entity_and_from_entity_roundtrip():
 
     assert ent.user_id == 1
     assert ent.category_id is None
-    assert ent.amount == 10.0
+    assert ent.amount_cents == 1000
     assert ent.type == "income"
     assert ent.fixed is False
     assert ent.periodicity == "none"
@@ -0,0 +1,44 @@
+from __future__ import annotations
+import os
+from typing import Callable
+
+import streamlit as st
+
+
+def run_page(render: Callable[[], None], label: str) -> None:
+    """Executa o render da página. Com DB_INSTRUMENT ligado, registra as
+    consultas SQL do rerun, grava o resumo em DB_QUERY_LOG (JSONL) e mostra um
+    expander de depuração no fim da página.
+    """
+    from db import instrumentation
+    from db.session import engine
+
+    if not instrumentation.is_enabled(engine):
+        render()
+        return
+    with instrumentation.collect(label) as log:
+        try:
+            render()
+        finally:
+            # st.rerun/st.stop interrompem o render com exceção; o resumo é gravado mesmo assim
+            path = os.getenv("DB_QUERY_LOG")
+            if path:
+                log.dump_jsonl(path)
+    with st.expander(f"Consultas SQL: {log.count} em {log.total_time * 1000:.1f} ms ({len(log.slow)} lenta(s))"):
+        rows = [
+            {"vezes": g["count"], "ms": round(g["time"] * 1000, 2), "linhas": g["rows"], "sql": g["statement"]}
+            for g in log.by_statement()
+        ]
+        st.dataframe(rows, hide_index=True, width='stretch')
+        from repository.cache import reference_cache
+        cache = reference_cache.stats()
+        st.caption(
+            f"Cache de referência: {cache['hits']} acerto(s), {cache['misses']} falta(s), "
+            f"{cache['size']} chave(s)"
+        )
+        from core.auth import token_cache_stats
+        tokens = token_cache_stats()
+        st.caption(
+            f"Cache de tokens: {tokens['hits']} acerto(s), {tokens['misses']} falta(s), "
+            f"{tokens['hit_rate']:.0%} de acerto"
+        )
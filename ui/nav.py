@@ -1,20 +1,7 @@
 from __future__ import annotations
-import base64
-import mimetypes
 import streamlit as st
-import os
 from core.session import logout
-
-
-def _img_data_uri(path: str) -> str:
-    try:
-        mime, _ = mimetypes.guess_type(path)
-        mime = mime or "image/png"
-        with open(path, "rb") as f:
-            b64 = base64.b64encode(f.read()).decode("ascii")
-        return f"data:{mime};base64,{b64}"
-    except Exception:
-        return ""
+from services.profile_images import image_data_uri
 
 
 def _do_rerun():
@@ -27,15 +14,13 @@ def render_sidebar(user) -> None:
     """Renders left navigation with default avatar and buttons.
     Expects to run only on authenticated pages.
     """
-    default_src = _img_data_uri("utils/assets/imgs/profile.png")
+    default_src = image_data_uri("utils/assets/imgs/profile.png")
     user_img_path = None
     try:
         user_img_path = getattr(user, "get_profile_image", lambda: None)()  # type: ignore[attr-defined]
     except Exception:
         user_img_path = None
-    avatar_src = (
-        _img_data_uri(user_img_path) if user_img_path and os.path.exists(str(user_img_path)) else default_src
-    )
+    avatar_src = image_data_uri(user_img_path) or default_src
     st.sidebar.markdown(
         f"""
         <div style="display:flex;justify-content:center;margin-bottom:70px;margin-top:30px;">
@@ -60,6 +45,11 @@ def render_sidebar(user) -> None:
             st.switch_page("pages/transacoes.py")
         else:
             st.session_state["menu"] = "Transações"; _do_rerun(); return
+    if st.sidebar.button("Importar extrato", width='stretch'):
+        if hasattr(st, "switch_page"):
+            st.switch_page("pages/importar.py")
+        else:
+            st.session_state["menu"] = "Importar"; _do_rerun(); return
     if st.sidebar.button("Débitos", width='stretch'):
         if hasattr(st, "switch_page"):
             st.switch_page("pages/debitos.py")
@@ -0,0 +1,43 @@
+from __future__ import annotations
+from typing import Optional
+import streamlit as st
+
+
+PAGE_SIZE = 200
+
+
+def _do_rerun():
+    fn = getattr(st, "rerun", None) or getattr(st, "experimental_rerun", None)
+    if fn:
+        fn()
+
+
+def current_cursor(key: str, signature: object = None) -> Optional[str]:
+    """Cursor da página atual da tabela `key`.
+    Guarda a pilha de cursores visitados em session_state; se `signature`
+    (ex.: os filtros ativos) mudar, volta para a primeira página.
+    """
+    sig_key = f"{key}_signature"
+    if st.session_state.get(sig_key) != signature:
+        st.session_state[sig_key] = signature
+        st.session_state[key] = [None]
+    stack = st.session_state.setdefault(key, [None])
+    return stack[-1]
+
+
+def render_pager(key: str, next_cursor: Optional[str]) -> None:
+    """Botões Anterior/Próxima para a tabela paginada por `current_cursor`."""
+    stack = st.session_state.setdefault(key, [None])
+    if len(stack) <= 1 and next_cursor is None:
+        return
+    c_prev, c_label, c_next = st.columns([1, 2, 1])
+    with c_prev:
+        if st.button("← Anterior", disabled=len(stack) <= 1, key=f"{key}_prev", width='stretch'):
+            stack.pop()
+            _do_rerun()
+    with c_label:
+        st.caption(f"Página {len(stack)}")
+    with c_next:
+        if st.button("Próxima →", disabled=next_cursor is None, key=f"{key}_next", width='stretch'):
+            stack.append(next_cursor)
+            _do_rerun()
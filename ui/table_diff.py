@@ -0,0 +1,92 @@
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping
+
+import numpy as np
+import pandas as pd
+
+from services.money import series_to_cents
+
+
+# Detecção de alterações entre o DataFrame exibido e o devolvido pelo
+# st.data_editor. Os dois quadros são alinhados pelo índice (o id do registro)
+# e cada coluna é comparada de uma vez, sem iterrows nem buscas por linha.
+#
+# Tipos de coluna aceitos em `columns`:
+# - "text":  str sem espaços nas pontas; vazio/NaN -> ""
+# - "money": reais comparados em centavos (int)
+# - "date":  datetime.date; vazio -> None
+# - "int":   inteiro; vazio -> 0
+# - "bool":  booleano; vazio -> False
+
+COLUMN_KINDS = ("text", "money", "date", "int", "bool")
+
+
+@dataclass
+class TableDiff:
+    changed_ids: List[int] = field(default_factory=list)
+    # id -> {coluna: novo valor normalizado} só com as colunas alteradas
+    patches: Dict[int, Dict[str, Any]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.changed_ids)
+
+    def __bool__(self) -> bool:
+        return bool(self.changed_ids)
+
+
+def _normalize(values: pd.Series, kind: str) -> pd.Series:
+    if kind == "text":
+        return values.fillna("").astype(str).str.strip()
+    if kind == "money":
+        return series_to_cents(values)
+    if kind == "date":
+        return pd.to_datetime(values, errors="coerce").dt.normalize()
+    if kind == "int":
+        return pd.to_numeric(values, errors="coerce").fillna(0).astype(np.int64)
+    if kind == "bool":
+        return values.fillna(False).astype(bool)
+    raise ValueError(f"Tipo de coluna inválido: {kind!r} (use {', '.join(COLUMN_KINDS)})")
+
+
+def _to_python(value: Any, kind: str) -> Any:
+    if kind == "date":
+        return None if pd.isna(value) else pd.Timestamp(value).date()
+    if kind in ("money", "int"):
+        return int(value)
+    if kind == "bool":
+        return bool(value)
+    return value
+
+
+def diff_frames(original: pd.DataFrame, edited: pd.DataFrame, columns: Mapping[str, str]) -> TableDiff:
+    """Compara `edited` com `original` (mesmo índice de ids) nas `columns`
+    informadas ({coluna: tipo}). Linhas que só existem em um dos quadros são
+    ignoradas; colunas fora de `columns` (ex.: "sel") também.
+    """
+    common = original.index.intersection(edited.index)
+    if common.empty or not columns:
+        return TableDiff()
+    base = original.loc[common]
+    curr = edited.loc[common]
+
+    any_changed = np.zeros(len(common), dtype=bool)
+    per_column = {}
+    for col, kind in columns.items():
+        old = _normalize(base[col], kind)
+        new = _normalize(curr[col], kind)
+        changed = old != new
+        if kind == "date":
+            changed &= ~(old.isna() & new.isna())
+        mask = changed.to_numpy()
+        if mask.any():
+            per_column[col] = (mask, new, kind)
+            any_changed |= mask
+
+    ids = common.to_numpy()
+    result = TableDiff(changed_ids=[int(i) for i in ids[any_changed]])
+    result.patches = {rid: {} for rid in result.changed_ids}
+    for col, (mask, new, kind) in per_column.items():
+        for rid, value in zip(ids[mask], new.to_numpy()[mask]):
+            result.patches[int(rid)][col] = _to_python(value, kind)
+    return result